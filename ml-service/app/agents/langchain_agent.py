@@ -1,6 +1,11 @@
 """Lightweight chat orchestration - mock tools; pluggable to LangChain later"""
 from __future__ import annotations
-from typing import Tuple, List, Dict
+import json
+import threading
+from typing import Tuple, List, Dict, Any
+from ..services.recommender import DATA_PATH
+from ..services.metrics import stage
+from ..services.text_index import InvertedIndex, tokenize
 
 DATASETS = {
     'careers': [
@@ -9,22 +14,70 @@ DATASETS = {
     ]
 }
 
-def career_search(query: str) -> List[Dict]:
-    q = query.lower()
-    return [c for c in DATASETS['careers'] if q in c['title'].lower() or any(q in s for s in c['skills'])]
+class AgentIndex:
+    """Careers and courses indexed by title, skill and description tokens.
 
-def course_lookup(skill: str) -> List[str]:
-    for c in DATASETS['careers']:
-        if skill in c['skills']:
-            return c['courses']
-    return []
+    Built once from the careers catalog merged with DATASETS (which contributes the courses); a
+    course is indexed under its own title and the skills of every career that lists it.
+    """
+
+    def __init__(self, careers: List[Dict[str, Any]]):
+        merged: Dict[str, Dict[str, Any]] = {}
+        for c in careers:
+            entry = merged.setdefault(c['title'].lower(), {'title': c['title'], 'skills': [], 'courses': []})
+            entry['skills'] += [s for s in c.get('skills', []) if s not in entry['skills']]
+            entry['courses'] += [s for s in c.get('courses', []) if s not in entry['courses']]
+            if c.get('description'):
+                entry.setdefault('description', c['description'])
+        self.careers = list(merged.values())
+        self.career_index = InvertedIndex(
+            [{'title': [c['title']], 'skills': c['skills'], 'description': [c.get('description', '')]} for c in self.careers],
+            {'title': 3.0, 'skills': 2.0, 'description': 1.0},
+        )
+        course_skills: Dict[str, List[str]] = {}
+        for c in self.careers:
+            for course in c['courses']:
+                course_skills.setdefault(course, []).extend(c['skills'])
+        self.courses = list(course_skills)
+        self.course_index = InvertedIndex(
+            [{'title': [course], 'skills': skills} for course, skills in course_skills.items()],
+            {'title': 1.0, 'skills': 2.0},
+        )
+
+    def search_careers(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        with stage('text_search'):
+            return [self.careers[i] for i, _ in self.career_index.search(query, k)]
+
+    def search_courses(self, query: str, k: int = 5) -> List[str]:
+        with stage('text_search'):
+            return [self.courses[i] for i, _ in self.course_index.search(query, k)]
+
+_index: AgentIndex | None = None
+_lock = threading.Lock()
+
+def agent_index() -> AgentIndex:
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                with open(DATA_PATH, 'r', encoding='utf-8') as f:
+                    catalog = json.load(f)
+                _index = AgentIndex(catalog + DATASETS['careers'])
+    return _index
+
+def career_search(query: str, k: int = 5) -> List[Dict]:
+    """Careers ranked by how many (and how rare) of the query's words appear in title, skills or description."""
+    return agent_index().search_careers(query, k)
+
+def course_lookup(skill: str, k: int = 5) -> List[str]:
+    return agent_index().search_courses(skill, k)
 
 def chat_reply(message: str, lang: str | None = None) -> Tuple[str, List[Dict]]:
-    hits = career_search(message)
+    hits = career_search(message, k=3)
     if hits:
         reply = f"You might explore: {', '.join(h['title'] for h in hits)}."
         return reply, hits
-    if 'course' in message.lower():
+    if 'course' in tokenize(message):
         reply = f"Consider starting with fundamentals and taking an intro course."
         return reply, []
     return "I can help recommend careers, roadmaps, and courses. Ask me about Data Science or ML!", []
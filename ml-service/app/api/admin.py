@@ -0,0 +1,57 @@
+"""Admin endpoints: catalog reload and inspection, LLM gateway and response cache stats, worker memory"""
+from fastapi import APIRouter, Header, HTTPException
+from typing import Optional
+import hmac
+import os
+import signal
+from ..services.recommender import catalog
+from ..services.chat_sessions import chat_sessions
+from ..services.llm import llm_gateway
+from ..services.process_memory import MASTER_PID_ENV, process_group
+from ..services.response_cache import response_cache
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+def _check_token(token: Optional[str]):
+    # Fail closed: without a configured token the admin API (reloads start a full re-embed) is off
+    expected = os.getenv('ADMIN_TOKEN')
+    if not expected:
+        raise HTTPException(status_code=503, detail="Admin API disabled: set ADMIN_TOKEN")
+    if token is None or not hmac.compare_digest(token.encode('utf-8'), expected.encode('utf-8')):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@router.get("/catalog")
+def catalog_info(x_admin_token: Optional[str] = Header(default=None)):
+    _check_token(x_admin_token)
+    snap = catalog.snapshot()
+    return {"version": snap.version, "sha256": snap.sha256, "count": len(snap.data)}
+
+@router.post("/catalog/reload")
+def catalog_reload(force: bool = False, x_admin_token: Optional[str] = Header(default=None)):
+    _check_token(x_admin_token)
+    master = os.getenv(MASTER_PID_ENV)
+    if master:
+        # Pre-fork server: reloading here would update this worker alone, into private memory. The
+        # master reloads once (always forced) and replaces every worker with one sharing the new catalog.
+        os.kill(int(master), signal.SIGHUP)
+        return {"scheduled": True, "master": int(master)}
+    try:
+        return catalog.reload(force=force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Catalog reload failed: {str(e)}")
+
+@router.get("/llm")
+def llm_stats(x_admin_token: Optional[str] = Header(default=None)):
+    _check_token(x_admin_token)
+    return {"gateway": llm_gateway.stats(), "response_cache": response_cache.stats(), "chat_sessions": chat_sessions.stats()}
+
+@router.get("/workers")
+def workers(x_admin_token: Optional[str] = Header(default=None)):
+    _check_token(x_admin_token)
+    # Whichever worker answers reports the whole group; PSS adds up to what the host really spends
+    group = process_group()
+    return {
+        "processes": group,
+        "total_rss_bytes": sum(p.get("rss_bytes", 0) for p in group),
+        "total_pss_bytes": sum(p.get("pss_bytes", 0) for p in group),
+    }
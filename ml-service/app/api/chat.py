@@ -1,58 +1,82 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
+import asyncio
 import os
-import google.generativeai as genai
+from ..services.chat_sessions import ChatSession, chat_sessions, profile_context
+from ..services.llm import UPSTREAM_UNAVAILABLE, LLMGateway, budget_for, latency_budget, llm_gateway
+from ..services.metrics import record_answer
+from .streaming import ClosingStreamingResponse, sse_event
 
 router = APIRouter(prefix="", tags=["chat"])
 
 class ChatRequest(BaseModel):
     message: str
-    user_profile: Optional[Dict[str, Any]] = {}
+    user_profile: Optional[Dict[str, Any]] = None  # omitted keeps the session's profile; {} clears it
     lang: str = "en"
     user_id: str
+    session_id: Optional[str] = None  # returned by the previous turn; omitted starts a new conversation
+    reset: bool = False  # start a fresh conversation even if session_id is given
 
 class GeminiAdapter:
-    def __init__(self):
-        api_key = os.getenv('GEMINI_API_KEY')
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-pro')
-        else:
-            self.model = None
+    def __init__(self, llm: LLMGateway = llm_gateway):
+        self.llm = llm
     
-    def chat_reply(self, message: str, user_profile: Dict[str, Any], lang: str = "en") -> tuple[str, List[str]]:
-        if not self.model:
-            raise Exception("Gemini API key not configured")
-        
-        # Build context from user profile
-        context = ""
-        if user_profile:
-            context = f"""
-            User Context:
-            - Name: {user_profile.get('name', 'User')}
-            - Age: {user_profile.get('age', 'Unknown')}
-            - Education: {user_profile.get('degree', 'Unknown')} at {user_profile.get('college', 'Unknown')}
-            - Interests: {', '.join(user_profile.get('interests', []))}
-            """
+    def _build_prompt(self, message: str, user_profile: Dict[str, Any], lang: str, history: str = "") -> str:
+        # Profile context is rendered once per distinct profile; history is the session's bounded window
+        context = profile_context(user_profile)
+        conversation = f"""
+        Conversation so far:
+        {history}
+        """ if history else ""
         
         prompt = f"""
         You are a helpful career counselor AI assistant. Respond to the user's question in {lang}.
         
         {context}
-        
+        {conversation}
         User Question: {message}
         
         Provide helpful, personalized career advice. Be encouraging and specific.
         If the user asks about careers, skills, or professional development, provide actionable guidance.
         """
+        return prompt
+    
+    async def chat_reply(self, message: str, user_profile: Dict[str, Any], lang: str = "en", history: str = "") -> tuple[str, List[str]]:
+        if not self.llm.available:
+            raise Exception("Gemini API key not configured")
         
+        prompt = self._build_prompt(message, user_profile, lang, history)
         try:
-            response = self.model.generate_content(prompt)
-            return response.text, []
+            text = await self.llm.generate(prompt)
+        except UPSTREAM_UNAVAILABLE:
+            # Breaker open or budget spent: let the router serve the mock answer right away
+            raise
         except Exception as e:
             print(f"Gemini chat error: {e}")
+            record_answer('chat', 'fallback', e)
             return self._get_fallback_response(message, user_profile, lang), []
+        record_answer('chat', 'gemini')
+        return text, []
+    
+    async def stream_reply(self, message: str, user_profile: Dict[str, Any], lang: str = "en", history: str = "") -> AsyncIterator[str]:
+        if not self.llm.available:
+            raise Exception("Gemini API key not configured")
+        
+        started = False
+        try:
+            async for chunk in self.llm.stream(self._build_prompt(message, user_profile, lang, history)):
+                if not started:
+                    started = True
+                    record_answer('chat_stream', 'gemini')
+                yield chunk
+        except Exception as e:
+            # Once text has been sent there is nothing sensible to fall back to
+            if started:
+                raise
+            print(f"Gemini chat stream error: {e}")
+            record_answer('chat_stream', 'fallback', e)
+            yield self._get_fallback_response(message, user_profile, lang)
     
     def _get_fallback_response(self, message: str, user_profile: Dict[str, Any], lang: str) -> str:
         name = user_profile.get('name', 'there')
@@ -109,24 +133,87 @@ class MockAdapter:
             else:
                 return f"Hi {name}! I'm your AI career counselor. I can help you with career planning, skill development, interview preparation, resume reviews, and more. What would you like guidance on today?", []
 
+    async def stream_reply(self, message: str, user_profile: Dict[str, Any], lang: str = "en") -> AsyncIterator[str]:
+        # Word-sized chunks so the streaming path behaves like Gemini's offline
+        reply, _ = self.chat_reply(message, user_profile, lang)
+        for i, word in enumerate(reply.split(' ')):
+            yield word if i == 0 else ' ' + word
+            await asyncio.sleep(0)
+
 # Initialize adapters
 gemini_adapter = GeminiAdapter()
 mock_adapter = MockAdapter()
 
+async def _session(body: ChatRequest) -> ChatSession:
+    # Call with chat_sessions.lock(body.session_id) held for the whole turn
+    session = chat_sessions.create(body.user_id) if body.reset else await chat_sessions.load(body.session_id, body.user_id)
+    # Clients only need to send the profile when it changes
+    if body.user_profile is not None:
+        session.profile = body.user_profile
+    return session
+
+async def _record(session: ChatSession, message: str, reply: str) -> None:
+    session.add("user", message)
+    session.add("assistant", reply)
+    await chat_sessions.save(session)
+
 @router.post("/chat")
-def chat(body: ChatRequest):
+async def chat(body: ChatRequest):
     try:
-        # Try Gemini first, fallback to Mock
-        if os.getenv('GEMINI_API_KEY'):
-            try:
-                reply, sources = gemini_adapter.chat_reply(body.message, body.user_profile, body.lang)
-            except Exception as e:
-                print(f"Gemini failed, using mock: {e}")
-                reply, sources = mock_adapter.chat_reply(body.message, body.user_profile, body.lang)
-        else:
-            reply, sources = mock_adapter.chat_reply(body.message, body.user_profile, body.lang)
-        
-        return {"reply": reply, "sources": sources}
+        async with chat_sessions.lock(body.session_id):
+            session = await _session(body)
+            profile = session.profile
+            # Try Gemini first, fallback to Mock
+            if os.getenv('GEMINI_API_KEY'):
+                try:
+                    with latency_budget(budget_for('chat')):
+                        reply, sources = await gemini_adapter.chat_reply(body.message, profile, body.lang, session.history())
+                except Exception as e:
+                    print(f"Gemini failed, using mock: {e}")
+                    record_answer('chat', 'fallback', e)
+                    reply, sources = mock_adapter.chat_reply(body.message, profile, body.lang)
+            else:
+                record_answer('chat', 'mock')
+                reply, sources = mock_adapter.chat_reply(body.message, profile, body.lang)
+            
+            await _record(session, body.message, reply)
+        return {"reply": reply, "sources": sources, "session_id": session.session_id}
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat processing failed: {str(e)}")
+
+@router.post("/chat/stream")
+async def chat_stream(body: ChatRequest):
+    """Server-Sent Events: `data: {"delta": ...}` per chunk, then `event: done` with the session_id
+    (or `event: error`)."""
+    
+    async def events() -> AsyncIterator[str]:
+        # The session lock is taken inside the generator, so it is held for the whole reply and
+        # released when the stream ends or the client disconnects
+        async with chat_sessions.lock(body.session_id):
+            session = await _session(body)
+            profile = session.profile
+            if os.getenv('GEMINI_API_KEY'):
+                chunks = gemini_adapter.stream_reply(body.message, profile, body.lang, session.history())
+            else:
+                record_answer('chat_stream', 'mock')
+                chunks = mock_adapter.stream_reply(body.message, profile, body.lang)
+            parts = []
+            try:
+                async for delta in chunks:
+                    parts.append(delta)
+                    yield sse_event({"delta": delta})
+                await _record(session, body.message, "".join(parts))
+                yield sse_event({"sources": [], "session_id": session.session_id}, event="done")
+            except Exception as e:
+                print(f"Chat stream failed: {e}")
+                yield sse_event({"detail": f"Chat processing failed: {str(e)}"}, event="error")
+            finally:
+                # Runs on client disconnect too: closing the chain cancels the upstream Gemini stream
+                await chunks.aclose()
+    
+    return ClosingStreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
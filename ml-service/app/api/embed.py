@@ -1,13 +1,40 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, HTTPException
 from pydantic import BaseModel
-from ..services.embeddings import embed_text
+from typing import List, Optional
+import asyncio
+from ..services import embeddings
+from ..services.embeddings import embed_texts, embed_text_async, embed_batcher, MAX_BATCH_SIZE
+from .serialization import Dtype, Encoding, embedding_response, wants_binary
 
 router = APIRouter(prefix="", tags=["embed"])
 
 class EmbedIn(BaseModel):
     text: str
+    dtype: Dtype = "float32"
+    encoding: Encoding = "float"
+
+class EmbedBatchIn(BaseModel):
+    texts: List[str]
+    dtype: Dtype = "float32"
+    encoding: Encoding = "float"
+
+# `Accept: application/octet-stream` returns raw little-endian rows instead of JSON (see serialization.py)
 
 @router.post("/embed")
-def embed(inb: EmbedIn):
-    vec = embed_text(inb.text)
-    return {"embedding": vec.tolist()}
+async def embed(inb: EmbedIn, accept: Optional[str] = Header(default=None)):
+    vec = await embed_text_async(inb.text)
+    return embedding_response(vec[None, :], inb.dtype, inb.encoding, wants_binary(accept), single=True)
+
+@router.post("/embed/batch")
+async def embed_batch(inb: EmbedBatchIn, accept: Optional[str] = Header(default=None)):
+    if len(inb.texts) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch too large: {len(inb.texts)} > {MAX_BATCH_SIZE}")
+    mat = await asyncio.to_thread(embed_texts, inb.texts)
+    return embedding_response(mat, inb.dtype, inb.encoding, wants_binary(accept), single=False)
+
+@router.get("/embed/stats")
+def embed_stats():
+    return {
+        "microbatch": embed_batcher.snapshot(),
+        "cache": embeddings.embed_cache.stats() if embeddings.embed_cache is not None else None,
+    }
@@ -0,0 +1,86 @@
+"""Prometheus /metrics: request timing middleware and scrape-time collectors over the existing stats() snapshots"""
+import time
+from typing import Iterable
+from fastapi import APIRouter, Response
+from ..services import embeddings, roadmap_templates
+from ..services.chat_sessions import chat_sessions
+from ..services.llm import llm_gateway
+from ..services.metrics import IN_FLIGHT, REQUEST_LATENCY, Family, registry
+from ..services.process_memory import process_group
+from ..services.response_cache import response_cache
+
+router = APIRouter(prefix="", tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (BaseHTTPMiddleware would buffer streams and read the request body).
+
+    Latency is labelled with the route template ('/roadmap', not '/roadmap?career=...') once the
+    router has matched it, and runs until the last body chunk is sent, so streams count in full.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            route = scope.get("route")
+            # Unmatched paths share one label so scanners cannot blow up the series count
+            path = getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.observe(time.perf_counter() - start, scope["method"], path, str(status))
+
+def _cache_families() -> Iterable[Family]:
+    samples = []
+    rc = response_cache.stats()
+    samples += [(("response", r), rc[k]) for r, k in (("hit", "hits"), ("shared_hit", "shared_hits"), ("miss", "misses"), ("coalesced", "coalesced"))]
+    if embeddings.embed_cache is not None:
+        ec = embeddings.embed_cache.stats()
+        samples += [(("embedding", r), ec[k]) for r, k in (("hit", "hits"), ("disk_hit", "disk_hits"), ("miss", "misses"))]
+    if roadmap_templates._templates is not None:
+        info = roadmap_templates._templates.cache_info()
+        samples += [(("roadmap", "hit"), info.hits), (("roadmap", "miss"), info.misses)]
+    cs = chat_sessions.stats()
+    samples += [(("chat_session", r), cs[k]) for r, k in (("hit", "hits"), ("shared_hit", "shared_hits"), ("miss", "created"))]
+    yield ("prismiq_cache_requests_total", "counter", "Cache lookups by cache and result", ("cache", "result"), samples)
+
+    gw = llm_gateway.stats()
+    yield ("prismiq_llm_in_flight", "gauge", "Gemini calls currently holding a concurrency slot", (), [((), gw["in_flight"])])
+    yield ("prismiq_llm_calls_total", "counter", "Gemini calls started (including retries)", (), [((), gw["calls"])])
+    yield ("prismiq_llm_failures_total", "counter", "Gemini calls that failed after retries", (), [((), gw["failures"])])
+    yield ("prismiq_llm_breaker_open", "gauge", "1 while the Gemini circuit breaker is open", (), [((), float(gw["breaker"]["state"] == "open"))])
+
+def _process_families() -> Iterable[Family]:
+    # Every other series is per worker (a scrape lands on one of them); memory is reported for the
+    # whole pre-fork group, labelled by pid, so any scrape shows all workers
+    group = process_group()
+    for key, name, help_text in (
+        ("rss_bytes", "prismiq_process_resident_memory_bytes", "Resident memory per serving process, shared pages counted in full"),
+        ("pss_bytes", "prismiq_process_proportional_memory_bytes", "Proportional set size per serving process (shared pages split)"),
+    ):
+        samples = [((str(p["pid"]), p["role"]), p[key]) for p in group if key in p]
+        if samples:
+            yield (name, "gauge", help_text, ("pid", "role"), samples)
+
+registry.register_collector(_cache_families)
+registry.register_collector(_process_families)
+
+@router.get("/metrics")
+def metrics():
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
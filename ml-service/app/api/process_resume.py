@@ -1,9 +1,15 @@
 """Resume processing endpoint with Gemini/Mock adapters"""
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, ConfigDict
 import os
-from typing import List, Dict, Any
-import google.generativeai as genai
+from typing import Any, AsyncIterator, Dict, List
+from ..services.llm import UPSTREAM_UNAVAILABLE, LLMGateway, budget_for, latency_budget, llm_gateway
+from ..services.metrics import record_answer
+from ..services.response_cache import Uncached, response_cache
+from ..services.resume_analysis import UploadTooLarge, analyze_resume, analyze_upload
+from ..services.resume_batch import process_stream
+from ..services.skill_extractor import skill_extractor
+from .streaming import DuplexStreamingResponse
 
 router = APIRouter()
 
@@ -15,17 +21,17 @@ class ResumeResponse(BaseModel):
     skills: List[str]
     analysis: Dict[str, Any]
 
+class ResumeAnalysisOut(BaseModel):
+    """Shape checked on Gemini output; only the skills are required, other fields pass through"""
+    model_config = ConfigDict(extra='allow')
+    skills: List[str]
+
 class GeminiAdapter:
-    def __init__(self):
-        api_key = os.getenv('GEMINI_API_KEY')
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-pro')
-        else:
-            self.model = None
+    def __init__(self, llm: LLMGateway = llm_gateway):
+        self.llm = llm
     
-    def process_resume(self, resume_text: str, user_id: str) -> Dict[str, Any]:
-        if not self.model:
+    async def process_resume(self, resume_text: str, user_id: str) -> Dict[str, Any]:
+        if not self.llm.available:
             raise Exception("Gemini API key not configured")
         
         prompt = f"""
@@ -47,33 +53,26 @@ class GeminiAdapter:
         }}
         """
         
+        async def _ask() -> Dict[str, Any]:
+            result = await self.llm.generate_json(prompt, ResumeAnalysisOut)
+            # An analysis cut short (token limit or latency budget) is served once but never cached
+            return result.data if result.complete else Uncached(result.data)
+        
         try:
-            response = self.model.generate_content(prompt)
-            # Extract JSON from response
-            import json
-            import re
-            
-            text = response.text
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            else:
-                # Fallback parsing
-                return self._extract_skills_fallback(resume_text)
+            analysis = await response_cache.get_or_compute('resume', prompt, _ask)
+        except UPSTREAM_UNAVAILABLE:
+            # Breaker open or budget spent: let the router serve the mock answer right away
+            raise
         except Exception as e:
             print(f"Gemini processing error: {e}")
+            record_answer('resume', 'fallback', e)
             return self._extract_skills_fallback(resume_text)
+        record_answer('resume', 'gemini')
+        return analysis
     
     def _extract_skills_fallback(self, resume_text: str) -> Dict[str, Any]:
-        # Simple keyword extraction as fallback
-        common_skills = [
-            'python', 'javascript', 'java', 'react', 'node.js', 'sql', 'html', 'css',
-            'machine learning', 'data analysis', 'project management', 'communication',
-            'leadership', 'problem solving', 'teamwork', 'git', 'docker', 'aws'
-        ]
-        
-        text_lower = resume_text.lower()
-        found_skills = [skill for skill in common_skills if skill in text_lower]
+        # Single-pass taxonomy scan as fallback
+        found_skills = skill_extractor().skills(resume_text)
         
         return {
             "skills": found_skills[:10],  # Limit to top 10
@@ -89,49 +88,7 @@ class GeminiAdapter:
 class MockAdapter:
     def process_resume(self, resume_text: str, user_id: str) -> Dict[str, Any]:
         # Deterministic mock response based on text length and content
-        text_lower = resume_text.lower()
-        
-        # Extract skills based on keywords
-        skill_keywords = {
-            'python': 'Python',
-            'javascript': 'JavaScript',
-            'react': 'React',
-            'node': 'Node.js',
-            'sql': 'SQL',
-            'java': 'Java',
-            'html': 'HTML',
-            'css': 'CSS',
-            'machine learning': 'Machine Learning',
-            'data': 'Data Analysis',
-            'project management': 'Project Management',
-            'leadership': 'Leadership',
-            'git': 'Git',
-            'docker': 'Docker',
-            'aws': 'AWS'
-        }
-        
-        found_skills = []
-        for keyword, skill in skill_keywords.items():
-            if keyword in text_lower:
-                found_skills.append(skill)
-        
-        # Default skills if none found
-        if not found_skills:
-            found_skills = ['Communication', 'Problem Solving', 'Teamwork']
-        
-        # Calculate score based on resume length and skills
-        score = min(90, max(50, len(resume_text) // 20 + len(found_skills) * 5))
-        
-        return {
-            "skills": found_skills[:8],
-            "experience_years": 3,
-            "education_level": "Bachelor's Degree",
-            "key_strengths": found_skills[:3] if found_skills else ["Communication"],
-            "improvement_areas": ["Portfolio development", "Industry certifications"],
-            "career_level": "mid" if len(found_skills) > 5 else "entry",
-            "industries": ["Technology", "Software Development"],
-            "score": score
-        }
+        return analyze_resume(resume_text)
 
 # Initialize adapters
 gemini_adapter = GeminiAdapter()
@@ -143,11 +100,14 @@ async def process_resume(request: ResumeRequest):
         # Try Gemini first, fallback to Mock
         if os.getenv('GEMINI_API_KEY'):
             try:
-                analysis = gemini_adapter.process_resume(request.resume_text, request.user_id)
+                with latency_budget(budget_for('resume')):
+                    analysis = await gemini_adapter.process_resume(request.resume_text, request.user_id)
             except Exception as e:
                 print(f"Gemini failed, using mock: {e}")
+                record_answer('resume', 'fallback', e)
                 analysis = mock_adapter.process_resume(request.resume_text, request.user_id)
         else:
+            record_answer('resume', 'mock')
             analysis = mock_adapter.process_resume(request.resume_text, request.user_id)
         
         return ResumeResponse(
@@ -157,3 +117,43 @@ async def process_resume(request: ResumeRequest):
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Resume processing failed: {str(e)}")
+
+async def _upload_chunks(upload: Any, size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await upload.read(size)
+        if not chunk:
+            break
+        yield chunk
+
+@router.post("/process_resume/upload", response_model=ResumeResponse)
+async def process_resume_upload(request: Request, user_id: str):
+    """Resume text as the raw UTF-8 request body, or as a `file` part of a multipart form.
+
+    The text is scanned chunk by chunk as it streams in instead of being parsed into one JSON
+    string; the result matches the local (mock) analysis of /process_resume for the same text.
+    Multipart needs the optional `python-multipart` package (Starlette spools the part to disk).
+    """
+    try:
+        if request.headers.get('content-type', '').startswith('multipart/'):
+            try:
+                form = await request.form(max_files=1)
+            except AssertionError:
+                raise HTTPException(status_code=415, detail="Multipart uploads need python-multipart; send the raw text body instead")
+            upload = form.get('file')
+            if upload is None or isinstance(upload, str):
+                raise HTTPException(status_code=422, detail="Expected a 'file' part")
+            analysis = await analyze_upload(_upload_chunks(upload))
+        else:
+            analysis = await analyze_upload(request.stream())
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return ResumeResponse(skills=analysis.get('skills', []), analysis=analysis)
+
+@router.post("/process_resume/batch")
+async def process_resume_batch(request: Request):
+    """NDJSON in (one {"resume_text", "user_id"} object per line), NDJSON out in input order.
+
+    Each output line carries the input line `index` and either `skills`/`analysis` or `error`.
+    Analysis is the local extraction and scoring (no Gemini), run on a process pool.
+    """
+    return DuplexStreamingResponse(process_stream(request.stream()), media_type="application/x-ndjson")
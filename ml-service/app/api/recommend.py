@@ -1,8 +1,10 @@
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Dict, Any, List
 import os
-import google.generativeai as genai
+from ..services.llm import UPSTREAM_UNAVAILABLE, LLMGateway, budget_for, latency_budget, llm_gateway
+from ..services.metrics import record_answer
+from ..services.response_cache import Uncached, response_cache
 
 router = APIRouter(prefix="", tags=["recommend"])
 
@@ -10,17 +12,21 @@ class RecommendRequest(BaseModel):
     user_profile: Dict[str, Any]
     user_id: str
 
+class Recommendation(BaseModel):
+    """Shape checked on Gemini output; only the title is required, other fields pass through"""
+    model_config = ConfigDict(extra='allow')
+    title: str
+
+class RecommendationsOut(BaseModel):
+    model_config = ConfigDict(extra='allow')
+    recommendations: List[Recommendation] = Field(min_length=1)
+
 class GeminiAdapter:
-    def __init__(self):
-        api_key = os.getenv('GEMINI_API_KEY')
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-pro')
-        else:
-            self.model = None
+    def __init__(self, llm: LLMGateway = llm_gateway):
+        self.llm = llm
     
-    def recommend_careers(self, profile: Dict[str, Any]) -> List[Dict[str, Any]]:
-        if not self.model:
+    async def recommend_careers(self, profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if not self.llm.available:
             raise Exception("Gemini API key not configured")
         
         prompt = f"""
@@ -44,21 +50,23 @@ class GeminiAdapter:
         }}
         """
         
+        async def _ask() -> List[Dict[str, Any]]:
+            result = await self.llm.generate_json(prompt, RecommendationsOut)
+            recommendations = result.data['recommendations']
+            # A list cut short (token limit or latency budget) is served once but never cached
+            return recommendations if result.complete else Uncached(recommendations)
+        
         try:
-            response = self.model.generate_content(prompt)
-            import json
-            import re
-            
-            text = response.text
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                data = json.loads(json_match.group())
-                return data.get('recommendations', [])
-            else:
-                return self._get_fallback_recommendations(profile)
+            recommendations = await response_cache.get_or_compute('recommend', prompt, _ask)
+        except UPSTREAM_UNAVAILABLE:
+            # Breaker open or budget spent: let the router serve the mock answer right away
+            raise
         except Exception as e:
             print(f"Gemini error: {e}")
+            record_answer('recommend', 'fallback', e)
             return self._get_fallback_recommendations(profile)
+        record_answer('recommend', 'gemini')
+        return recommendations
     
     def _get_fallback_recommendations(self, profile: Dict[str, Any]) -> List[Dict[str, Any]]:
         interests = profile.get('interests', [])
@@ -156,16 +164,19 @@ gemini_adapter = GeminiAdapter()
 mock_adapter = MockAdapter()
 
 @router.post("/recommend")
-def recommend(body: RecommendRequest):
+async def recommend(body: RecommendRequest):
     try:
         # Try Gemini first, fallback to Mock
         if os.getenv('GEMINI_API_KEY'):
             try:
-                recommendations = gemini_adapter.recommend_careers(body.user_profile)
+                with latency_budget(budget_for('recommend')):
+                    recommendations = await gemini_adapter.recommend_careers(body.user_profile)
             except Exception as e:
                 print(f"Gemini failed, using mock: {e}")
+                record_answer('recommend', 'fallback', e)
                 recommendations = mock_adapter.recommend_careers(body.user_profile)
         else:
+            record_answer('recommend', 'mock')
             recommendations = mock_adapter.recommend_careers(body.user_profile)
         
         return {"recommendations": recommendations}
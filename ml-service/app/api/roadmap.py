@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Response
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Dict, Any, List
 import os
-import google.generativeai as genai
+from ..services.llm import UPSTREAM_UNAVAILABLE, LLMGateway, budget_for, latency_budget, llm_gateway
+from ..services.metrics import record_answer
+from ..services.response_cache import Uncached, response_cache
+from ..services.roadmap_templates import roadmap_templates
 
 router = APIRouter(prefix="", tags=["roadmap"])
 
@@ -10,17 +13,21 @@ class RoadmapRequest(BaseModel):
     career_name: str
     user_id: str
 
+class Phase(BaseModel):
+    """Shape checked on Gemini output; only the title is required, other fields pass through"""
+    model_config = ConfigDict(extra='allow')
+    title: str
+
+class RoadmapOut(BaseModel):
+    model_config = ConfigDict(extra='allow')
+    phases: List[Phase] = Field(min_length=1)
+
 class GeminiAdapter:
-    def __init__(self):
-        api_key = os.getenv('GEMINI_API_KEY')
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-pro')
-        else:
-            self.model = None
+    def __init__(self, llm: LLMGateway = llm_gateway):
+        self.llm = llm
     
-    def generate_roadmap(self, career_name: str) -> Dict[str, Any]:
-        if not self.model:
+    async def generate_roadmap(self, career_name: str) -> Dict[str, Any]:
+        if not self.llm.available:
             raise Exception("Gemini API key not configured")
         
         prompt = f"""
@@ -44,20 +51,23 @@ class GeminiAdapter:
         }}
         """
         
+        async def _ask() -> Dict[str, Any]:
+            result = await self.llm.generate_json(prompt, RoadmapOut)
+            # A roadmap cut short (token limit or latency budget) is served once but never cached
+            return result.data if result.complete else Uncached(result.data)
+        
         try:
-            response = self.model.generate_content(prompt)
-            import json
-            import re
-            
-            text = response.text
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            else:
-                return self._get_fallback_roadmap(career_name)
+            # The prompt depends only on career_name, so popular careers are served from cache
+            roadmap = await response_cache.get_or_compute('roadmap', prompt, _ask)
+        except UPSTREAM_UNAVAILABLE:
+            # Breaker open or budget spent: let the router serve the mock answer right away
+            raise
         except Exception as e:
             print(f"Gemini error: {e}")
+            record_answer('roadmap', 'fallback', e)
             return self._get_fallback_roadmap(career_name)
+        record_answer('roadmap', 'gemini')
+        return roadmap
     
     def _get_fallback_roadmap(self, career_name: str) -> Dict[str, Any]:
         return {
@@ -77,137 +87,31 @@ class GeminiAdapter:
 
 class MockAdapter:
     def generate_roadmap(self, career_name: str) -> Dict[str, Any]:
-        career_lower = career_name.lower()
-        
-        if 'software' in career_lower or 'developer' in career_lower:
-            return {
-                "career": career_name,
-                "total_duration": "8-12 months",
-                "phases": [
-                    {
-                        "phase": 1,
-                        "title": "Programming Fundamentals",
-                        "duration": "2-3 months",
-                        "skills": ["Python/JavaScript", "Data Structures", "Algorithms", "Git"],
-                        "projects": ["Calculator App", "Todo List", "Simple Website"],
-                        "resources": ["FreeCodeCamp", "Codecademy", "LeetCode"]
-                    },
-                    {
-                        "phase": 2,
-                        "title": "Web Development",
-                        "duration": "3-4 months",
-                        "skills": ["HTML/CSS", "React/Vue", "Node.js", "Databases"],
-                        "projects": ["Portfolio Website", "Blog Platform", "E-commerce Site"],
-                        "resources": ["MDN Docs", "React Documentation", "MongoDB University"]
-                    },
-                    {
-                        "phase": 3,
-                        "title": "Advanced Concepts",
-                        "duration": "2-3 months",
-                        "skills": ["System Design", "Testing", "DevOps", "Cloud Services"],
-                        "projects": ["Scalable Web App", "API Design", "Deployment Pipeline"],
-                        "resources": ["AWS Documentation", "System Design Primer", "Docker Docs"]
-                    },
-                    {
-                        "phase": 4,
-                        "title": "Job Preparation",
-                        "duration": "1-2 months",
-                        "skills": ["Interview Prep", "Portfolio Polish", "Networking"],
-                        "projects": ["Capstone Project", "Open Source Contributions"],
-                        "resources": ["Cracking the Coding Interview", "GitHub", "LinkedIn"]
-                    }
-                ]
-            }
-        
-        elif 'data' in career_lower or 'analyst' in career_lower:
-            return {
-                "career": career_name,
-                "total_duration": "6-10 months",
-                "phases": [
-                    {
-                        "phase": 1,
-                        "title": "Data Fundamentals",
-                        "duration": "2-3 months",
-                        "skills": ["SQL", "Excel", "Statistics", "Python/R"],
-                        "projects": ["Sales Analysis", "Survey Data Analysis"],
-                        "resources": ["Khan Academy Statistics", "SQLBolt", "Pandas Documentation"]
-                    },
-                    {
-                        "phase": 2,
-                        "title": "Visualization & Tools",
-                        "duration": "2-3 months",
-                        "skills": ["Tableau/Power BI", "Data Visualization", "Business Intelligence"],
-                        "projects": ["Dashboard Creation", "Business Report"],
-                        "resources": ["Tableau Public", "Power BI Learning Path"]
-                    },
-                    {
-                        "phase": 3,
-                        "title": "Advanced Analytics",
-                        "duration": "2-3 months",
-                        "skills": ["Machine Learning Basics", "A/B Testing", "Predictive Analytics"],
-                        "projects": ["Predictive Model", "A/B Test Analysis"],
-                        "resources": ["Coursera ML Course", "Kaggle Learn"]
-                    },
-                    {
-                        "phase": 4,
-                        "title": "Portfolio & Job Search",
-                        "duration": "1 month",
-                        "skills": ["Portfolio Development", "Interview Skills"],
-                        "projects": ["Complete Portfolio", "Case Study Presentations"],
-                        "resources": ["GitHub Portfolio", "Mock Interviews"]
-                    }
-                ]
-            }
-        
-        else:
-            # Generic roadmap
-            return {
-                "career": career_name,
-                "total_duration": "6-9 months",
-                "phases": [
-                    {
-                        "phase": 1,
-                        "title": "Foundation Building",
-                        "duration": "2-3 months",
-                        "skills": ["Industry Knowledge", "Core Skills", "Tools & Software"],
-                        "projects": ["Beginner Project", "Skill Practice"],
-                        "resources": ["Online Courses", "Industry Publications"]
-                    },
-                    {
-                        "phase": 2,
-                        "title": "Skill Development",
-                        "duration": "2-3 months",
-                        "skills": ["Advanced Techniques", "Best Practices", "Problem Solving"],
-                        "projects": ["Intermediate Project", "Real-world Application"],
-                        "resources": ["Specialized Training", "Mentorship"]
-                    },
-                    {
-                        "phase": 3,
-                        "title": "Professional Preparation",
-                        "duration": "2-3 months",
-                        "skills": ["Portfolio Development", "Networking", "Interview Skills"],
-                        "projects": ["Capstone Project", "Professional Portfolio"],
-                        "resources": ["Industry Events", "Professional Networks"]
-                    }
-                ]
-            }
+        return roadmap_templates().roadmap(career_name)
+    
+    def roadmap_response(self, career_name: str) -> Response:
+        # Pre-encoded body cached per (template, career): no dict building or JSON encoding per request
+        return Response(content=roadmap_templates().response_body(career_name), media_type="application/json")
 
 # Initialize adapters
 gemini_adapter = GeminiAdapter()
 mock_adapter = MockAdapter()
 
 @router.post("/roadmap")
-def roadmap(body: RoadmapRequest):
+async def roadmap(body: RoadmapRequest):
     try:
         # Try Gemini first, fallback to Mock
         if os.getenv('GEMINI_API_KEY'):
             try:
-                roadmap_data = gemini_adapter.generate_roadmap(body.career_name)
+                with latency_budget(budget_for('roadmap')):
+                    roadmap_data = await gemini_adapter.generate_roadmap(body.career_name)
             except Exception as e:
                 print(f"Gemini failed, using mock: {e}")
+                record_answer('roadmap', 'fallback', e)
                 roadmap_data = mock_adapter.generate_roadmap(body.career_name)
         else:
-            roadmap_data = mock_adapter.generate_roadmap(body.career_name)
+            record_answer('roadmap', 'mock')
+            return mock_adapter.roadmap_response(body.career_name)
         
         return {
             "roadmap": roadmap_data,
@@ -219,5 +123,5 @@ def roadmap(body: RoadmapRequest):
 
 # Legacy GET endpoint for backward compatibility
 @router.get("/roadmap")
-def roadmap_get(career: str, userId: str = "demo-user"):
-    return roadmap(RoadmapRequest(career_name=career, user_id=userId))
+async def roadmap_get(career: str, userId: str = "demo-user"):
+    return await roadmap(RoadmapRequest(career_name=career, user_id=userId))
@@ -0,0 +1,69 @@
+"""Response encoding: a faster JSON renderer for every router and compact wire formats for embeddings"""
+import base64
+from typing import Any, Dict, Literal, Optional
+import numpy as np
+from starlette.responses import JSONResponse, Response
+from ..services.metrics import stage
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BINARY_MEDIA_TYPE = "application/octet-stream"
+
+Dtype = Literal["float32", "float16", "int8"]
+Encoding = Literal["float", "base64"]
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson when it is installed (NumPy arrays and scalars included),
+    otherwise by the standard library exactly as before."""
+
+    def render(self, content: Any) -> bytes:
+        with stage('serialization'):
+            if orjson is None:
+                return super().render(content)
+            return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+def quantize(mat: np.ndarray, dtype: str) -> tuple[np.ndarray, Optional[np.ndarray]]:
+    """Cast rows to the wire dtype. int8 is symmetric per row: value ~= q * scale, scale = max|row| / 127."""
+    if dtype == "float16":
+        return mat.astype("<f2"), None
+    if dtype == "int8":
+        scales = np.abs(mat).max(axis=1) / 127.0
+        safe = np.where(scales > 0, scales, 1.0)
+        q = np.clip(np.rint(mat / safe[:, None]), -127, 127).astype(np.int8)
+        return q, scales.astype(np.float32)
+    return mat.astype("<f4", copy=False), None
+
+def wants_binary(accept: Optional[str]) -> bool:
+    return bool(accept) and BINARY_MEDIA_TYPE in accept and "application/json" not in accept
+
+def embedding_response(mat: np.ndarray, dtype: str, encoding: str, binary: bool, single: bool) -> Response:
+    """Encode a (n, dim) float32 matrix as JSON floats, base64 inside JSON, or raw little-endian bytes.
+
+    Raw bytes are the rows back to back; shape and dtype travel in X-Embedding-* headers. For int8
+    the body starts with X-Embedding-Count little-endian float32 scales, one per row, so the headers
+    stay the same size however large the batch is.
+    """
+    data, scales = quantize(mat, dtype)
+    n, dim = data.shape
+    if binary:
+        with stage('serialization'):
+            headers = {"X-Embedding-Dtype": dtype, "X-Embedding-Dim": str(dim), "X-Embedding-Count": str(n)}
+            content = data.tobytes() if scales is None else scales.astype("<f4").tobytes() + data.tobytes()
+            return Response(content=content, media_type=BINARY_MEDIA_TYPE, headers=headers)
+
+    if encoding == "base64":
+        rows: Any = [base64.b64encode(row.tobytes()).decode("ascii") for row in data]
+    elif orjson is not None:
+        rows = data if dtype != "float16" else data.astype(np.float32)  # orjson has no float16
+    else:
+        rows = data.tolist()
+    key = "embedding" if single else "embeddings"
+    body: Dict[str, Any] = {key: rows[0] if single else rows}
+    if dtype != "float32" or encoding != "float":
+        body.update({"dtype": dtype, "encoding": encoding, "dim": dim})
+    if scales is not None:
+        body["scale" if single else "scales"] = float(scales[0]) if single else scales.tolist()
+    return FastJSONResponse(body)
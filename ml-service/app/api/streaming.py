@@ -0,0 +1,42 @@
+"""Streaming response helpers shared by the SSE and NDJSON endpoints"""
+import json
+from typing import Any, Dict, Optional
+from starlette.responses import StreamingResponse
+
+class ClosingStreamingResponse(StreamingResponse):
+    """StreamingResponse that always closes its body generator when the response ends.
+
+    Starlette cancels the send loop when the client disconnects but leaves the generator for the
+    garbage collector; closing it here runs its `finally` blocks right away, which is what tears
+    down upstream work (LLM streams, worker pools) for abandoned requests.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            aclose = getattr(self.body_iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+class DuplexStreamingResponse(ClosingStreamingResponse):
+    """Streams a response while the body iterator is still reading the request body.
+
+    Starlette normally runs a task that reads `receive` to detect disconnects, which would steal
+    the request body chunks. Here the body iterator owns `receive` (through `request.stream()`), and
+    a disconnect surfaces there as ClientDisconnect.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        finally:
+            aclose = getattr(self.body_iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        if self.background is not None:
+            await self.background()
+
+def sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
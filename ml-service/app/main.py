@@ -1,15 +1,43 @@
 """FastAPI entrypoint mounting all routers and health checks"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from .api.embed import router as embed_router
 from .api.recommend import router as recommend_router
 from .api.roadmap import router as roadmap_router
 from .api.chat import router as chat_router
 from .api.process_resume import router as process_resume_router
+from .api.admin import router as admin_router
+from .api.metrics import MetricsMiddleware, router as metrics_router
+from .api.serialization import FastJSONResponse
+from .services.process_memory import MASTER_PID_ENV
+from .services.recommender import catalog
+from .services.resume_batch import shutdown_pool
+from .services.warmup import warmup_state, STARTUP_MODE
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # CATALOG_WATCH_INTERVAL > 0 polls data/careers.json and hot-reloads it on change; under the
+    # pre-fork server (app/serve.py) the master watches instead and replaces the workers
+    interval = float(os.getenv("CATALOG_WATCH_INTERVAL", "0"))
+    if interval > 0 and not os.getenv(MASTER_PID_ENV):
+        catalog.start_watcher(interval)
+    if STARTUP_MODE == "eager":
+        await asyncio.to_thread(warmup_state.run)
+    elif STARTUP_MODE == "background":
+        # Loads in a worker thread; startup returns at once so the port is bound and /health answers meanwhile
+        asyncio.get_running_loop().run_in_executor(None, warmup_state.run)
+    yield
+    catalog.stop_watcher()
+    shutdown_pool()
 
 app = FastAPI(
     title="Prismiq ML Service",
     description="AI-powered career recommendations and guidance",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # Register routers
@@ -18,6 +46,11 @@ app.include_router(recommend_router)
 app.include_router(roadmap_router)
 app.include_router(chat_router)
 app.include_router(process_resume_router)
+app.include_router(admin_router)
+app.include_router(metrics_router)
+
+# Per-route latency and in-flight requests for /metrics
+app.add_middleware(MetricsMiddleware)
 
 @app.get("/")
 def read_root():
@@ -25,8 +58,16 @@ def read_root():
 
 @app.get("/health")
 def health_check():
+    # Liveness: the process is up and serving, whether or not models have finished loading
     return {
         "status": "healthy",
         "service": "prismiq-ml-service",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "ready": warmup_state.ready
     }
+
+@app.get("/health/ready")
+def readiness_check():
+    # Readiness: 503 until warmup has loaded the embedding model, catalog and LLM client
+    state = warmup_state.snapshot()
+    return FastJSONResponse(status_code=200 if state["ready"] else 503, content=state)
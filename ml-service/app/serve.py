@@ -0,0 +1,197 @@
+"""Pre-fork multi-worker server: load models and the catalog once, then fork workers that share them.
+
+Run from ml-service/:
+  python -m app.serve --host 0.0.0.0 --port 8000 --workers 4
+
+`uvicorn --workers N` spawns fresh interpreters, so each worker loads its own copy of the embedding
+model, catalog matrix and index. Here the master imports the app and runs the fork-safe warmup
+steps (warmup.PRELOAD_STEPS), freezes the GC and only then forks: workers start with those objects
+in copy-on-write pages shared with the master. Each worker runs the remaining warmup (first
+inference, Gemini client) after the fork. The master binds the listening socket, restarts workers
+that die and forwards SIGTERM/SIGINT for a graceful shutdown.
+
+Catalog reloads happen in the master, so all workers serve one version and share its pages: on
+SIGHUP (sent by POST /admin/catalog/reload) or, with CATALOG_WATCH_INTERVAL set, when
+data/careers.json changes, the master reloads the catalog and replaces the workers one generation
+at a time (new ones are forked before the old ones are told to drain).
+
+Per-worker thread pools are capped so N workers do not each start one thread per core:
+OMP/MKL/OpenBLAS/torch intra-op threads default to cores // workers (--threads overrides), and so
+does the resume batch pool. GET /admin/workers and the prismiq_process_*_memory_bytes gauges
+report RSS and PSS for every process in the group.
+"""
+from __future__ import annotations
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Set
+
+_THREAD_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+def _limit_threads(threads: int) -> None:
+    # Read by the BLAS/OpenMP runtimes when they load, so this must run before numpy or torch is imported
+    for var in _THREAD_VARS:
+        os.environ.setdefault(var, str(threads))
+    os.environ.setdefault("RESUME_POOL_WORKERS", str(threads))
+    # HF tokenizers would otherwise warn and fall back to one thread in every forked worker
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+def _torch_threads(threads: int, load: bool = False) -> None:
+    torch = sys.modules.get("torch")
+    if torch is None and load:
+        try:
+            import torch
+        except ImportError:
+            return
+    if torch is not None:
+        torch.set_num_threads(threads)
+
+def _bind(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+def _run_worker(app, sock: socket.socket, args: argparse.Namespace) -> None:
+    import uvicorn
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGHUP, signal.SIG_DFL)
+    _torch_threads(args.threads)
+    config = uvicorn.Config(app, log_level=args.log_level, timeout_graceful_shutdown=args.graceful_timeout)
+    uvicorn.Server(config).run(sockets=[sock])
+
+def _spawn(app, sock: socket.socket, args: argparse.Namespace) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(app, sock, args)
+        except BaseException as e:
+            print(f"Worker {os.getpid()} crashed: {e}")
+            code = 1
+        finally:
+            # Never fall back into the master's loop, and skip the atexit handlers inherited from it
+            os._exit(code)
+    return pid
+
+def serve(args: argparse.Namespace) -> None:
+    sock = _bind(args.host, args.port, args.backlog)
+    from .services.process_memory import MASTER_PID_ENV
+    os.environ[MASTER_PID_ENV] = str(os.getpid())
+
+    from .main import app
+    from .services.recommender import catalog
+    from .services.warmup import PRELOAD_STEPS, warmup_state
+    if args.preload:
+        t0 = time.perf_counter()
+        # One thread while the master loads: an OpenMP pool started before fork() is unusable in the
+        # children. torch is imported here (sentence-transformers would import it during warmup anyway)
+        # so the limit is in place before the model loads; the hashing backend never needs it.
+        if os.getenv("EMBED_BACKEND", "auto") != "hashing":
+            _torch_threads(1, load=True)
+        warmup_state.run(only=PRELOAD_STEPS)
+        print(f"Preloaded {', '.join(n for n, s in warmup_state.steps.items() if s['ok'])} in {time.perf_counter() - t0:.1f}s")
+    # Move everything loaded so far out of the collector's reach: a collection in a worker would
+    # otherwise write to the GC headers of shared objects and copy their pages
+    gc.collect()
+    gc.freeze()
+
+    workers: Dict[int, float] = {}  # pid -> start time
+    retiring: Set[int] = set()  # previous generation, draining after a reload
+    stopping = False
+    reload_requested = False
+
+    def _terminate(pids) -> None:
+        for pid in list(pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        _terminate(workers)
+        _terminate(retiring)
+
+    def _hup(signum, frame):
+        nonlocal reload_requested
+        reload_requested = True
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGHUP, _hup)
+    for _ in range(args.workers):
+        workers[_spawn(app, sock, args)] = time.monotonic()
+    print(f"Serving on {args.host}:{args.port} with {args.workers} workers x {args.threads} threads (master {os.getpid()})")
+
+    interval = float(os.getenv("CATALOG_WATCH_INTERVAL", "0"))
+    next_check = time.monotonic() + interval
+    while workers or retiring:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            retiring.discard(pid)
+            started = workers.pop(pid, None)
+            if started is not None and not stopping:
+                print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; restarting")
+                # A worker dying straight after start would otherwise be restarted in a tight loop
+                if time.monotonic() - started < 1.0:
+                    time.sleep(1.0)
+                if not stopping:
+                    workers[_spawn(app, sock, args)] = time.monotonic()
+            continue
+
+        watch_due = interval > 0 and time.monotonic() >= next_check
+        if not stopping and (reload_requested or watch_due):
+            force, reload_requested = reload_requested, False
+            if watch_due:
+                next_check = time.monotonic() + interval
+            try:
+                result = catalog.reload(force=True) if force or catalog.changed() else None
+            except Exception as e:
+                print(f"Catalog reload failed, keeping previous version: {e}")
+                result = None
+            if result is not None and result["changed"]:
+                print(f"Catalog reloaded: {result}; replacing workers")
+                gc.collect()
+                gc.freeze()
+                old = list(workers)
+                for _ in range(args.workers):
+                    workers[_spawn(app, sock, args)] = time.monotonic()
+                for pid in old:
+                    workers.pop(pid, None)
+                    retiring.add(pid)
+                _terminate(old)
+        time.sleep(0.2)
+    sock.close()
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    ap.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")))
+    ap.add_argument("--threads", type=int, default=int(os.getenv("SERVE_THREADS", "0")),
+                    help="intra-op threads per worker (default: cores // workers)")
+    ap.add_argument("--no-preload", dest="preload", action="store_false", help="load everything in the workers instead")
+    ap.add_argument("--backlog", type=int, default=2048)
+    ap.add_argument("--graceful-timeout", type=int, default=30)
+    ap.add_argument("--log-level", default="info")
+    args = ap.parse_args()
+    args.workers = max(1, args.workers)
+    args.threads = args.threads or max(1, (os.cpu_count() or 1) // args.workers)
+    _limit_threads(args.threads)
+    serve(args)
+
+if __name__ == "__main__":
+    main()
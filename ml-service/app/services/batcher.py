@@ -0,0 +1,123 @@
+"""Dynamic micro-batching: coalesce concurrent single-item calls into one batched call"""
+from __future__ import annotations
+import asyncio
+import bisect
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Sequence, Tuple
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+WAIT_MS_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250)
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.n += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [str(b) for b in self.buckets] + ["+Inf"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.n,
+            "sum": round(self.total, 4),
+            "mean": round(self.total / self.n, 4) if self.n else 0.0,
+        }
+
+class MicroBatcher:
+    """Collect concurrent `submit` calls for up to `max_wait_ms` or `max_batch` items,
+    run `batch_fn` once on the combined batch in a worker thread and fan results back.
+
+    `batch_fn` takes a list of items and returns a sequence of results in the same order.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], Sequence[Any]], max_batch: int = 64, max_wait_ms: float = 5.0):
+        self._batch_fn = batch_fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._pending: Deque[Tuple[Any, asyncio.Future, float]] = deque()
+        self._wakeup: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._worker: asyncio.Task | None = None
+        self.batch_sizes = _Histogram(BATCH_SIZE_BUCKETS)
+        self.wait_ms = _Histogram(WAIT_MS_BUCKETS)
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            # (Re)bind to the current loop; futures from a dead loop can never complete
+            self._loop = loop
+            self._pending.clear()
+            self._wakeup = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        self._ensure_worker()
+        fut = self._loop.create_future()
+        self._pending.append((item, fut, time.perf_counter()))
+        self._wakeup.set()
+        return await fut
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future, float]]:
+        while not self._pending:
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        deadline = self._loop.time() + self.max_wait
+        while len(self._pending) < self.max_batch:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        n = min(len(self._pending), self.max_batch)
+        return [self._pending.popleft() for _ in range(n)]
+
+    async def _run(self) -> None:
+        while True:
+            batch = [entry for entry in await self._collect() if not entry[1].done()]
+            if not batch:
+                continue
+            now = time.perf_counter()
+            for _, _, enqueued in batch:
+                self.wait_ms.observe((now - enqueued) * 1000.0)
+            self.batch_sizes.observe(len(batch))
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                results = await self._loop.run_in_executor(None, self._batch_fn, [item for item, _, _ in batch])
+                # zip() would leave the surplus futures unresolved and their requests waiting forever
+                if len(results) != len(batch):
+                    raise RuntimeError(f"batch function returned {len(results)} results for {len(batch)} inputs")
+            except Exception as e:
+                self.errors += 1
+                for _, fut, _ in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            for (_, fut, _), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": len(self._pending),
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "items": self.items,
+            "errors": self.errors,
+            "batch_size": self.batch_sizes.snapshot(),
+            "wait_ms": self.wait_ms.snapshot(),
+        }
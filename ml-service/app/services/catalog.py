@@ -0,0 +1,156 @@
+"""Career catalog manager: incremental re-embedding keyed by content hash, atomic snapshot swaps"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+import numpy as np
+from .embeddings import embed_texts, memory_map, model_name, embed_dim
+from .vector_index import COMPRESSED_KINDS, build_index, file_backed, index_kind, normalize_rows
+
+def career_text(c: Dict[str, Any]) -> str:
+    return f"{c['title']} {c['description']} {' '.join(c.get('skills', []))}"
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+class CatalogSnapshot(NamedTuple):
+    """Immutable view of one catalog version; requests hold a reference for their whole lifetime."""
+    version: int
+    sha256: str
+    data: List[Dict[str, Any]]
+    texts: List[str]
+    hashes: List[str]
+    emb: np.ndarray
+    index: Any
+
+class CatalogManager:
+    """Owns the current CatalogSnapshot.
+
+    `reload()` re-reads the data file, embeds only entries whose text hash is new, builds the index
+    off to the side and then swaps the snapshot reference in one assignment. A precomputed matrix
+    (see `build_embeddings_file`) is memory-mapped on first load when its metadata matches.
+    """
+
+    def __init__(self, data_path: Path, emb_path: Optional[Path] = None):
+        self.data_path = Path(data_path)
+        self.emb_path = Path(emb_path) if emb_path else self.data_path.with_suffix('.emb.npy')
+        self.meta_path = self.emb_path.with_suffix('.meta.json')
+        self._snap: CatalogSnapshot | None = None
+        self._lock = threading.Lock()
+        self._file_sig: tuple | None = None
+        self._watcher: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def snapshot(self) -> CatalogSnapshot:
+        snap = self._snap
+        if snap is None:
+            self.reload()
+            snap = self._snap
+        return snap
+
+    def _signature(self) -> tuple:
+        st = self.data_path.stat()
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load_precomputed(self, sha256: str, count: int) -> np.ndarray | None:
+        if not (self.emb_path.exists() and self.meta_path.exists()):
+            return None
+        meta = json.loads(self.meta_path.read_text())
+        if meta.get('model') != model_name() or meta.get('sha256') != sha256:
+            print(f"Stale career embeddings at {self.emb_path} (model/catalog changed); re-embedding in process")
+            return None
+        # mmap keeps the matrix in the page cache, shared by every worker on the host
+        mat = np.load(self.emb_path, mmap_mode='r')
+        return mat if mat.shape[0] == count else None
+
+    def reload(self, force: bool = False) -> Dict[str, Any]:
+        with self._lock:
+            sig = self._signature()
+            prev = self._snap
+            if prev is not None and not force and sig == self._file_sig:
+                return {'version': prev.version, 'changed': False}
+            raw = self.data_path.read_bytes()
+            sha256 = hashlib.sha256(raw).hexdigest()
+            data = json.loads(raw)
+            texts = [career_text(c) for c in data]
+            hashes = [_text_hash(t) for t in texts]
+
+            emb = self._load_precomputed(sha256, len(texts)) if prev is None else None
+            embedded = 0
+            if emb is None:
+                old_rows = {h: i for i, h in enumerate(prev.hashes)} if prev is not None else {}
+                emb = np.empty((len(texts), embed_dim()), dtype=np.float32)
+                todo = []
+                for i, h in enumerate(hashes):
+                    if h in old_rows:
+                        emb[i] = prev.emb[old_rows[h]]
+                    else:
+                        todo.append(i)
+                if todo:
+                    emb[todo] = normalize_rows(embed_texts([texts[i] for i in todo]))
+                embedded = len(todo)
+            if index_kind() in COMPRESSED_KINDS and not file_backed(emb):
+                emb = self._spill(emb)
+
+            snap = CatalogSnapshot(
+                version=(prev.version + 1) if prev is not None else 1,
+                sha256=sha256, data=data, texts=texts, hashes=hashes, emb=emb, index=build_index(emb),
+            )
+            self._snap = snap
+            self._file_sig = sig
+            return {
+                'version': snap.version,
+                'changed': True,
+                'count': len(texts),
+                'embedded': embedded,
+                'reused': len(texts) - embedded,
+                'removed': len(set(prev.hashes) - set(hashes)) if prev is not None else 0,
+            }
+
+    def _spill(self, emb: np.ndarray) -> np.ndarray:
+        # Compressed indexes read float rows only to re-rank; keep them in a mapped file beside the
+        # catalog (not /tmp, which may be RAM-backed) so they do not stay on the heap
+        try:
+            return memory_map(emb, self.emb_path.parent)
+        except OSError as e:
+            print(f"Could not memory-map career embeddings ({e}); keeping them in memory")
+            return emb
+
+    def build_embeddings_file(self) -> Dict[str, Any]:
+        """Embed the whole catalog and write the row-normalized matrix plus its metadata for mmap loading."""
+        raw = self.data_path.read_bytes()
+        texts = [career_text(c) for c in json.loads(raw)]
+        mat = normalize_rows(embed_texts(texts))
+        meta = {'model': model_name(), 'sha256': hashlib.sha256(raw).hexdigest(), 'count': int(mat.shape[0]), 'dim': int(mat.shape[1])}
+        tmp = self.emb_path.with_suffix('.tmp.npy')
+        np.save(tmp, mat)
+        os.replace(tmp, self.emb_path)
+        self.meta_path.write_text(json.dumps(meta, indent=2))
+        return meta
+
+    def changed(self) -> bool:
+        """True if the data file changed since the current snapshot was loaded."""
+        return self._snap is not None and self._signature() != self._file_sig
+
+    def start_watcher(self, interval: float) -> None:
+        """Poll the data file every `interval` seconds and reload when it changes."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+
+        def _watch():
+            while not self._stop.wait(interval):
+                try:
+                    if self.changed():
+                        print(f"Catalog reloaded: {self.reload()}")
+                except Exception as e:
+                    print(f"Catalog reload failed, keeping previous version: {e}")
+
+        self._watcher = threading.Thread(target=_watch, name='catalog-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stop.set()
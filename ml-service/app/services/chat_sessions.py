@@ -0,0 +1,221 @@
+"""Chat sessions keyed by server-issued session ids: token-budgeted rolling window, summarized older turns, cached profile context"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import os
+import re
+import secrets
+import time
+import weakref
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Deque, Dict, Optional
+from .response_cache import RedisBackend
+
+HISTORY_TOKENS = int(os.getenv("CHAT_HISTORY_TOKENS", "1024"))
+SUMMARY_TOKENS = int(os.getenv("CHAT_SUMMARY_TOKENS", "256"))
+_SENTENCE = re.compile(r"(?<=[.!?])\s")
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English; only used for budgeting, so no tokenizer is loaded
+    return max(1, len(text) // 4)
+
+def _gist(role: str, text: str, max_chars: int = 160) -> str:
+    first = _SENTENCE.split(text.strip(), 1)[0]
+    if len(first) > max_chars:
+        first = first[:max_chars].rstrip() + "..."
+    return f"{role}: {first}"
+
+@lru_cache(maxsize=4096)
+def _render_profile(profile_json: str) -> str:
+    user_profile = json.loads(profile_json)
+    if not user_profile:
+        return ""
+    return f"""
+            User Context:
+            - Name: {user_profile.get('name', 'User')}
+            - Age: {user_profile.get('age', 'Unknown')}
+            - Education: {user_profile.get('degree', 'Unknown')} at {user_profile.get('college', 'Unknown')}
+            - Interests: {', '.join(user_profile.get('interests', []))}
+            """
+
+def profile_context(user_profile: Dict[str, Any]) -> str:
+    """Prompt block for a profile, rendered once per distinct profile."""
+    return _render_profile(json.dumps(user_profile or {}, sort_keys=True, default=str))
+
+@dataclass
+class Turn:
+    role: str
+    text: str
+    tokens: int
+
+@dataclass
+class ChatSession:
+    """One user's conversation.
+
+    Recent turns are kept verbatim while they fit in `history_tokens`; older ones are folded into
+    one-line gists in `summary`, itself capped at `max_summary_tokens` (oldest gists dropped first).
+    The prompt built from a session therefore stays bounded however long the chat runs.
+    """
+    user_id: str
+    session_id: str = ""
+    profile: Dict[str, Any] = field(default_factory=dict)
+    turns: Deque[Turn] = field(default_factory=deque)
+    summary: Deque[str] = field(default_factory=deque)
+    window_tokens: int = 0
+    summary_tokens: int = 0
+    history_tokens: int = HISTORY_TOKENS
+    max_summary_tokens: int = SUMMARY_TOKENS
+
+    def add(self, role: str, text: str) -> None:
+        max_chars = self.history_tokens * 4
+        if len(text) > max_chars:
+            text = text[:max_chars]
+        turn = Turn(role, text, estimate_tokens(text))
+        self.turns.append(turn)
+        self.window_tokens += turn.tokens
+        while self.window_tokens > self.history_tokens and len(self.turns) > 1:
+            old = self.turns.popleft()
+            self.window_tokens -= old.tokens
+            self._summarize(old)
+
+    def _summarize(self, turn: Turn) -> None:
+        gist = _gist(turn.role, turn.text)
+        self.summary.append(gist)
+        self.summary_tokens += estimate_tokens(gist)
+        while self.summary_tokens > self.max_summary_tokens and len(self.summary) > 1:
+            self.summary_tokens -= estimate_tokens(self.summary.popleft())
+
+    def history(self) -> str:
+        parts = []
+        if self.summary:
+            parts.append("Earlier in this conversation:\n" + "\n".join(self.summary))
+        if self.turns:
+            parts.append("Recent messages:\n" + "\n".join(f"{t.role}: {t.text}" for t in self.turns))
+        return "\n\n".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "user_id": self.user_id,
+            "session_id": self.session_id,
+            "profile": self.profile,
+            "turns": [[t.role, t.text] for t in self.turns],
+            "summary": list(self.summary),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ChatSession":
+        session = cls(data["user_id"], session_id=data.get("session_id", ""), profile=data.get("profile") or {})
+        for gist in data.get("summary", []):
+            session.summary.append(gist)
+            session.summary_tokens += estimate_tokens(gist)
+        for role, text in data.get("turns", []):
+            session.add(role, text)
+        return session
+
+class SessionStore:
+    """In-process LRU of sessions with idle expiry, in front of an optional shared backend
+    (same get/set interface as the response cache's RedisBackend) so any worker can resume a chat.
+
+    Sessions are found by an unguessable id issued here, never by user_id alone, and a session only
+    opens for the user_id it was created for: knowing someone's user_id gives no access to their chat.
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl: float = 86400.0, backend: Any = None):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.backend = backend
+        self._sessions: "OrderedDict[str, tuple[float, ChatSession]]" = OrderedDict()
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self.hits = 0
+        self.shared_hits = 0
+        self.created = 0
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return "chat:session:" + hashlib.sha256(session_id.encode("utf-8")).hexdigest()
+
+    def lock(self, session_id: Optional[str]) -> asyncio.Lock:
+        """Lock to hold across one turn (load, reply, save) so concurrent turns of a session cannot
+        interleave and drop each other's messages. Per process: workers sharing a backend can still race."""
+        if not session_id:
+            return asyncio.Lock()  # a new session nobody else can name yet
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        return lock
+
+    async def load(self, session_id: Optional[str], user_id: str) -> ChatSession:
+        """The session `session_id` if it exists and belongs to `user_id`, else a new one with a fresh id."""
+        if session_id:
+            entry = self._sessions.get(session_id)
+            if entry is not None and entry[0] >= time.monotonic():
+                if entry[1].user_id == user_id:
+                    self._sessions.move_to_end(session_id)
+                    self.hits += 1
+                    return entry[1]
+            else:
+                data = await self._backend_get(self._key(session_id))
+                if data is not None and data.get("user_id") == user_id and data.get("session_id") == session_id:
+                    self.shared_hits += 1
+                    session = ChatSession.from_dict(data)
+                    self._remember(session)
+                    return session
+        return self.create(user_id)
+
+    def create(self, user_id: str) -> ChatSession:
+        self.created += 1
+        session = ChatSession(user_id, session_id=secrets.token_urlsafe(24))
+        self._remember(session)
+        return session
+
+    async def save(self, session: ChatSession) -> None:
+        self._remember(session)
+        if self.backend is not None:
+            try:
+                await self.backend.set(self._key(session.session_id), session.to_dict(), self.ttl)
+            except Exception as e:
+                print(f"Shared chat session write failed: {e}")
+
+    def _remember(self, session: ChatSession) -> None:
+        self._sessions[session.session_id] = (time.monotonic() + self.ttl, session)
+        self._sessions.move_to_end(session.session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    async def _backend_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.backend is None:
+            return None
+        try:
+            return await self.backend.get(key)
+        except Exception as e:
+            print(f"Shared chat session read failed: {e}")
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "created": self.created,
+            "backend": type(self.backend).__name__ if self.backend is not None else None,
+        }
+
+def _shared_backend() -> Any:
+    url = os.getenv("CHAT_SESSION_REDIS_URL")
+    if not url:
+        return None
+    try:
+        return RedisBackend(url)
+    except Exception as e:
+        print(f"Shared chat session store unavailable, using in-process store only: {e}")
+        return None
+
+chat_sessions = SessionStore(
+    max_sessions=int(os.getenv("CHAT_SESSION_MAX", "10000")),
+    ttl=float(os.getenv("CHAT_SESSION_TTL", "86400")),
+    backend=_shared_backend(),
+)
@@ -0,0 +1,121 @@
+"""Circuit breaker over a rolling window of upstream outcomes (errors and slow calls)"""
+from __future__ import annotations
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that the breaker considers unhealthy."""
+
+class CircuitBreaker:
+    """Trips when the failure rate over the last `window` calls reaches `failure_rate`.
+
+    A call counts as a failure if it raised or took longer than `slow_call_seconds`. While open,
+    `allow()` is False so callers go straight to their fallback. After `open_seconds` a background
+    `probe()` is run (one at a time); success closes the breaker, failure re-opens it. Without a
+    probe the breaker goes half-open and lets a single real call through as the trial.
+    """
+
+    def __init__(self, name: str, window: int = 20, min_calls: int = 5, failure_rate: float = 0.5,
+                 slow_call_seconds: float = 10.0, open_seconds: float = 30.0,
+                 probe: Optional[Callable[[], Awaitable[Any]]] = None):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.probe = probe
+        self._outcomes: Deque[Tuple[bool, float]] = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_task: asyncio.Task | None = None
+        self._trial_in_flight = False
+        self.trips = 0
+        self.short_circuited = 0
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        if self._state == CLOSED:
+            return True
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            if self.probe is not None:
+                self._start_probe()
+            else:
+                self._state = HALF_OPEN
+        if self._state == HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        self.short_circuited += 1
+        return False
+
+    def record(self, ok: bool, latency: float) -> None:
+        ok = ok and latency <= self.slow_call_seconds
+        if self._state == HALF_OPEN:
+            self._trial_in_flight = False
+            if ok:
+                self._close()
+            else:
+                self._open()
+            return
+        self._outcomes.append((ok, latency))
+        if self._state == CLOSED and len(self._outcomes) >= self.min_calls:
+            failures = sum(1 for good, _ in self._outcomes if not good)
+            if failures / len(self._outcomes) >= self.failure_rate:
+                self._open()
+
+    def _open(self) -> None:
+        if self._state != OPEN:
+            self.trips += 1
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+
+    def _close(self) -> None:
+        self._state = CLOSED
+        self._outcomes.clear()
+
+    def _start_probe(self) -> None:
+        if self._probing:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._probing = True
+
+        async def _run():
+            start = time.monotonic()
+            try:
+                await self.probe()
+                ok = time.monotonic() - start <= self.slow_call_seconds
+            except Exception as e:
+                print(f"Circuit {self.name} probe failed: {e}")
+                ok = False
+            finally:
+                self._probing = False
+            if ok:
+                self._close()
+            else:
+                self._open()
+
+        self._probe_task = loop.create_task(_run())
+
+    def snapshot(self) -> Dict[str, Any]:
+        failures = sum(1 for good, _ in self._outcomes if not good)
+        latencies = [lat for _, lat in self._outcomes]
+        return {
+            "name": self.name,
+            "state": self._state,
+            "window_calls": len(self._outcomes),
+            "window_failure_rate": round(failures / len(self._outcomes), 4) if self._outcomes else 0.0,
+            "window_mean_latency": round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+            "trips": self.trips,
+            "short_circuited": self.short_circuited,
+        }
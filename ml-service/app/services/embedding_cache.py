@@ -0,0 +1,132 @@
+"""Content-addressed embedding cache: bounded in-memory LRU with an optional memory-mapped disk tier"""
+from __future__ import annotations
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+import numpy as np
+
+_WS = re.compile(r"\s+")
+KEY_BYTES = 20  # sha1 digest
+
+def cache_key(model_name: str, text: str) -> bytes:
+    """Hash of (model name, normalized text); whitespace and unicode form do not change the key."""
+    norm = _WS.sub(" ", unicodedata.normalize("NFC", text)).strip()
+    return hashlib.sha1(f"{model_name}\x00{norm}".encode("utf-8")).digest()
+
+class DiskTier:
+    """Fixed-capacity ring of float32 vectors in a memory-mapped file that survives restarts.
+
+    Rows are overwritten oldest-first once `max_bytes` worth of rows are written. Writes are
+    not coordinated across processes, so point at most one writer process at a directory.
+    """
+
+    def __init__(self, directory: str | Path, model_name: str, dim: int, max_bytes: int):
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.path = Path(directory) / f"{slug}-{dim}"
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.capacity = max(1, max_bytes // (dim * 4 + KEY_BYTES))
+        meta = {"model": model_name, "dim": dim, "capacity": self.capacity}
+        meta_file = self.path / "meta.json"
+        fresh = not meta_file.exists() or json.loads(meta_file.read_text()) != meta
+        mode = "w+" if fresh else "r+"
+        self._vecs = np.memmap(self.path / "vecs.f32", dtype=np.float32, mode=mode, shape=(self.capacity, dim))
+        self._keys = np.memmap(self.path / "keys.u8", dtype=np.uint8, mode=mode, shape=(self.capacity, KEY_BYTES))
+        self._cursor = np.memmap(self.path / "cursor.u64", dtype=np.uint64, mode=mode, shape=(1,))
+        if fresh:
+            meta_file.write_text(json.dumps(meta))
+        used = min(int(self._cursor[0]), self.capacity)
+        self._rows: Dict[bytes, int] = {self._keys[i].tobytes(): i for i in range(used)}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._rows) * (self.dim * 4 + KEY_BYTES)
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        row = self._rows.get(key)
+        return None if row is None else np.array(self._vecs[row])
+
+    def put(self, key: bytes, vec: np.ndarray) -> None:
+        if key in self._rows:
+            return
+        row = int(self._cursor[0]) % self.capacity
+        self._rows.pop(self._keys[row].tobytes(), None)
+        self._vecs[row] = vec
+        self._keys[row] = np.frombuffer(key, dtype=np.uint8)
+        self._cursor[0] += 1
+        self._rows[key] = row
+
+class EmbeddingCache:
+    """Thread-safe LRU capped by total vector bytes, backed by an optional DiskTier."""
+
+    def __init__(self, model_name: str, dim: int, max_bytes: int, disk_dir: str | None = None, disk_max_bytes: int = 0):
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self._disk = DiskTier(disk_dir, model_name, dim, disk_max_bytes) if disk_dir and disk_max_bytes > 0 else None
+        self._mem: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes_used = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remember(self, key: bytes, vec: np.ndarray) -> None:
+        if vec.nbytes > self.max_bytes:
+            return
+        self._mem[key] = vec
+        self.bytes_used += vec.nbytes
+        while self.bytes_used > self.max_bytes:
+            _, old = self._mem.popitem(last=False)
+            self.bytes_used -= old.nbytes
+            self.evictions += 1
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        key = cache_key(self.model_name, text)
+        with self._lock:
+            vec = self._mem.get(key)
+            if vec is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return vec
+            vec = self._disk.get(key) if self._disk is not None else None
+            if vec is not None:
+                self.disk_hits += 1
+                vec.setflags(write=False)
+                self._remember(key, vec)
+                return vec
+            self.misses += 1
+            return None
+
+    def put(self, text: str, vec: np.ndarray) -> None:
+        key = cache_key(self.model_name, text)
+        vec = np.array(vec, dtype=np.float32)
+        vec.setflags(write=False)
+        with self._lock:
+            if key not in self._mem:
+                self._remember(key, vec)
+            if self._disk is not None:
+                self._disk.put(key, vec)
+
+    def stats(self) -> Dict[str, int | str | None]:
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "entries": len(self._mem),
+                "bytes": self.bytes_used,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_entries": len(self._disk) if self._disk is not None else None,
+                "disk_bytes": self._disk.nbytes if self._disk is not None else None,
+            }
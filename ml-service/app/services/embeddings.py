@@ -1,23 +1,139 @@
-"""Embeddings with optional sentence-transformers fallback to TF-IDF hashing"""
+"""Embeddings with optional sentence-transformers fallback to TF-IDF hashing
+
+The SentenceTransformer (torch) and scikit-learn are imported on first use or by `load_backend()`
+during warmup, so importing this module stays cheap.
+"""
 from __future__ import annotations
+import asyncio
 import os
+import tempfile
+import threading
+from typing import Any, Sequence
 import numpy as np
+from .batcher import MicroBatcher
+from .embedding_cache import EmbeddingCache
+from .metrics import stage
 
-try:
-    from sentence_transformers import SentenceTransformer
-    _MODEL: SentenceTransformer | None = SentenceTransformer(os.getenv("EMBED_MODEL","all-MiniLM-L6-v2"))
-except Exception:
-    _MODEL = None
+_HASH_FEATURES = 512
+_vec: Any = None
+_MODEL: Any = None
+MODEL_NAME: str | None = None
+EMBED_DIM: int | None = None
+embed_cache: EmbeddingCache | None = None
+_load_lock = threading.Lock()
 
-from sklearn.feature_extraction.text import HashingVectorizer
-from sklearn.preprocessing import normalize
-_vec = HashingVectorizer(n_features=512, alternate_sign=False)
+# Largest batch handed to a single encode/transform call (and accepted by /embed/batch)
+MAX_BATCH_SIZE = int(os.getenv("EMBED_MAX_BATCH", "256"))
+# Set EMBED_CACHE_MAX_BYTES=0 to disable; EMBED_CACHE_DIR enables the on-disk tier
+_CACHE_MAX_BYTES = int(os.getenv("EMBED_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
 
-def embed_text(text: str) -> np.ndarray:
+def load_backend() -> str:
+    """Load the embedding model once and set MODEL_NAME, EMBED_DIM and embed_cache; returns MODEL_NAME."""
+    global _vec, _MODEL, MODEL_NAME, EMBED_DIM, embed_cache
+    if MODEL_NAME is not None:
+        return MODEL_NAME
+    with _load_lock:
+        if MODEL_NAME is not None:
+            return MODEL_NAME
+        # EMBED_BACKEND=auto (default) tries sentence-transformers first; hashing or sentence-transformers pins one
+        backend = os.getenv("EMBED_BACKEND", "auto")
+        try:
+            if backend == "hashing":
+                raise ImportError("hashing backend requested")
+            from sentence_transformers import SentenceTransformer
+            _MODEL = SentenceTransformer(os.getenv("EMBED_MODEL","all-MiniLM-L6-v2"))
+        except Exception:
+            if backend == "sentence-transformers":
+                raise
+            _MODEL = None
+            from sklearn.feature_extraction.text import HashingVectorizer
+            _vec = HashingVectorizer(n_features=_HASH_FEATURES, alternate_sign=False)
+        name = os.getenv("EMBED_MODEL","all-MiniLM-L6-v2") if _MODEL is not None else f"hashing-{_HASH_FEATURES}"
+        EMBED_DIM = _MODEL.get_sentence_embedding_dimension() if _MODEL is not None else _HASH_FEATURES
+        embed_cache = EmbeddingCache(
+            name,
+            EMBED_DIM,
+            max_bytes=_CACHE_MAX_BYTES,
+            disk_dir=os.getenv("EMBED_CACHE_DIR"),
+            disk_max_bytes=int(os.getenv("EMBED_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024))),
+        ) if _CACHE_MAX_BYTES > 0 else None
+        # Published last: other threads treat a non-None MODEL_NAME as "fully loaded"
+        MODEL_NAME = name
+        return MODEL_NAME
+
+def model_name() -> str:
+    return load_backend()
+
+def embed_dim() -> int:
+    load_backend()
+    return EMBED_DIM
+
+def _encode(texts: list[str]) -> np.ndarray:
     if _MODEL is not None:
-        v = _MODEL.encode([text])[0]
-        return np.asarray(v, dtype=np.float32)
-    mat = _vec.transform([text])
-    arr = mat.toarray().astype(np.float32)
-    arr = normalize(arr)
-    return arr[0]
+        mat = _MODEL.encode(texts, batch_size=min(len(texts), MAX_BATCH_SIZE))
+        return np.asarray(mat, dtype=np.float32)
+    mat = _vec.transform(texts).toarray().astype(np.float32)
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    return mat / np.where(norms > 0, norms, 1.0)
+
+def embed_texts(texts: Sequence[str]) -> np.ndarray:
+    """Embed many texts at once; returns a (len(texts), dim) float32 matrix.
+
+    Cached texts are served from embed_cache; the remaining unique texts go through one encode call.
+    """
+    load_backend()
+    with stage('embedding'):
+        return _embed_texts(list(texts))
+
+def _embed_texts(texts: list[str]) -> np.ndarray:
+    out = np.empty((len(texts), EMBED_DIM), dtype=np.float32)
+    if embed_cache is None:
+        if texts:
+            out[:] = _encode(texts)
+        return out
+    missing: dict[str, list[int]] = {}
+    for i, t in enumerate(texts):
+        vec = embed_cache.get(t)
+        if vec is None:
+            missing.setdefault(t, []).append(i)
+        else:
+            out[i] = vec
+    if missing:
+        mat = _encode(list(missing))
+        for vec, (t, rows) in zip(mat, missing.items()):
+            out[rows] = vec
+            embed_cache.put(t, vec)
+    return out
+
+def embed_text(text: str) -> np.ndarray:
+    return embed_texts([text])[0]
+
+# Coalesces concurrent single-text requests into one embed_texts call
+MICROBATCH_ENABLED = os.getenv("EMBED_MICROBATCH", "1") not in ("0", "false", "False")
+embed_batcher = MicroBatcher(
+    embed_texts,
+    max_batch=int(os.getenv("EMBED_MICROBATCH_MAX_ITEMS", "64")),
+    max_wait_ms=float(os.getenv("EMBED_MICROBATCH_WAIT_MS", "5")),
+)
+
+def memory_map(mat: np.ndarray, directory: str | os.PathLike | None = None) -> np.ndarray:
+    """Move float rows out of the heap: write them to a file in `directory` and return a read-only
+    mmap, so they sit in the (evictable, shareable) page cache and only the rows touched stay resident.
+
+    The file is unlinked straight away; the mapping keeps its data alive until it is dropped.
+    """
+    fd, path = tempfile.mkstemp(prefix='.emb-', suffix='.npy', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, np.ascontiguousarray(mat, dtype=np.float32))
+        return np.load(path, mmap_mode='r')
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass  # Windows cannot unlink a mapped file; it stays in `directory`
+
+async def embed_text_async(text: str) -> np.ndarray:
+    if MICROBATCH_ENABLED:
+        return await embed_batcher.submit(text)
+    return await asyncio.to_thread(embed_text, text)
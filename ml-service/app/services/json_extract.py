@@ -0,0 +1,176 @@
+"""Incremental JSON object extraction from LLM output: brace-aware scanning, early completion,
+repair of truncated objects and validation against a pydantic schema"""
+from __future__ import annotations
+import json
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple, Tuple, Type
+from pydantic import BaseModel, ValidationError
+from .metrics import registry, stage
+
+# Characters that change scanner state outside strings, and inside them
+_STRUCTURAL = re.compile(r'[{}\[\]",]')
+_IN_STRING = re.compile(r'["\\]')
+_CLOSERS = {'{': '}', '[': ']'}
+# Cut points kept for repair; older ones are never needed once this many later ones exist
+_MAX_CUTS = 256
+
+JSON_EXTRACTIONS = registry.counter(
+    'prismiq_llm_json_extractions_total', 'JSON objects extracted from LLM output: complete, partial (repaired) or failed',
+    ('outcome',))
+
+class JSONExtractionError(ValueError):
+    """The model output held no object that validates against the expected schema."""
+
+class Extracted(NamedTuple):
+    data: Dict[str, Any]
+    # False when the object was repaired from a truncated one: usable for this request, but not a
+    # full answer to cache or share
+    complete: bool
+
+class JSONObjectScanner:
+    """Finds the first top-level JSON object in text fed chunk by chunk.
+
+    String and escape state is tracked across chunks, so braces inside strings, code fences and
+    trailing prose ('... } hope that helps }') are handled, unlike a greedy `\\{.*\\}` match.
+    `feed` returns True once the object's closing brace arrives, which is the caller's cue to stop
+    generation. For a truncated object, `candidates()` offers closed-off prefixes, longest first:
+    the text with its open containers closed, then the text cut back to each earlier comma, so a
+    half-received string, number or dangling key is dropped rather than kept truncated.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._base = 0  # index of the object's first character in the current chunk
+        self._size = 0  # characters of the object seen so far
+        # (offset of a comma in the object, container stack at that point)
+        self._cuts: List[Tuple[int, str]] = []
+        self.started = False
+        self.complete = False
+
+    def feed(self, chunk: str) -> bool:
+        if self.complete or not chunk:
+            return self.complete
+        pos = 0
+        if not self.started:
+            pos = chunk.find('{')
+            if pos < 0:
+                return False
+            self.started = True
+        self._base = pos
+        end = self._scan(chunk, pos)
+        piece = chunk[pos:end]
+        self._parts.append(piece)
+        self._size += len(piece)
+        return self.complete
+
+    def _scan(self, chunk: str, pos: int) -> int:
+        n = len(chunk)
+        while pos < n:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    pos += 1
+                    continue
+                m = _IN_STRING.search(chunk, pos)
+                if m is None:
+                    return n
+                pos = m.end()
+                if m.group() == '\\':
+                    self._escape = True
+                else:
+                    self._in_string = False
+                continue
+            m = _STRUCTURAL.search(chunk, pos)
+            if m is None:
+                return n
+            ch, pos = m.group(), m.end()
+            if ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                self._stack.append(ch)
+            elif ch in '}]':
+                if self._stack:
+                    self._stack.pop()
+                if not self._stack:
+                    self.complete = True
+                    return pos
+            elif ch == ',':
+                # Offset within the object: chunks before this one contributed _size characters
+                self._cuts.append((self._size + m.start() - self._base, ''.join(self._stack)))
+                if len(self._cuts) > _MAX_CUTS:
+                    del self._cuts[0]
+        return n
+
+    def text(self) -> str:
+        return ''.join(self._parts)
+
+    def candidates(self) -> Iterator[str]:
+        """The object text if it closed, else closed-off prefixes of it, longest first."""
+        if not self.started:
+            return
+        text = self.text()
+        if self.complete:
+            yield text
+            return
+        # A trailing string, number or literal may itself be cut short, so the text is only used as is
+        # when it ends on a closing quote or bracket; otherwise the last complete value is at a comma
+        if not self._in_string and text.rstrip()[-1:] in ('"', '}', ']'):
+            yield text + ''.join(_CLOSERS[c] for c in reversed(self._stack))
+        for offset, stack in reversed(self._cuts):
+            yield text[:offset] + ''.join(_CLOSERS[c] for c in reversed(stack))
+
+def _drop_invalid_items(data: Any, errors: List[Dict[str, Any]]) -> bool:
+    """Remove the list elements that validation errors point into (e.g. a half-received last item);
+    True if anything was removed."""
+    targets: Dict[int, Tuple[list, set]] = {}
+    for err in errors:
+        node, innermost = data, None
+        for key in err.get('loc', ()):
+            if isinstance(key, int) and isinstance(node, list) and key < len(node):
+                innermost = (node, key)
+            try:
+                node = node[key]
+            except (KeyError, IndexError, TypeError):
+                break
+        if innermost is not None:
+            lst, index = innermost
+            targets.setdefault(id(lst), (lst, set()))[1].add(index)
+    for lst, indexes in targets.values():
+        for index in sorted(indexes, reverse=True):
+            del lst[index]
+    return bool(targets)
+
+def validate(data: Any, schema: Type[BaseModel]) -> Dict[str, Any]:
+    """`data` validated against `schema` (extra keys kept if the schema allows them); list items that
+    fail validation are dropped rather than failing the whole object."""
+    while True:
+        try:
+            return schema.model_validate(data).model_dump()
+        except ValidationError as e:
+            if not _drop_invalid_items(data, e.errors()):
+                raise JSONExtractionError(f"Model output does not match {schema.__name__}: {e}") from e
+
+def parse_object(scanner: JSONObjectScanner, schema: Type[BaseModel]) -> Extracted:
+    """Validated object from a scanner: the complete object when it closed, else the longest repaired
+    prefix that both parses and validates."""
+    with stage('json_extract'):
+        error: Exception = JSONExtractionError("No JSON object in model output")
+        for candidate in scanner.candidates():
+            try:
+                result = validate(json.loads(candidate), schema)
+            except (ValueError, JSONExtractionError) as e:
+                error = e
+                continue
+            JSON_EXTRACTIONS.inc('complete' if scanner.complete else 'partial')
+            return Extracted(result, scanner.complete)
+        JSON_EXTRACTIONS.inc('failed')
+        raise error if isinstance(error, JSONExtractionError) else JSONExtractionError(f"Invalid JSON in model output: {error}")
+
+def extract_json(text: str, schema: Type[BaseModel]) -> Extracted:
+    """One-shot form for text that has already arrived in full."""
+    scanner = JSONObjectScanner()
+    scanner.feed(text)
+    return parse_object(scanner, schema)
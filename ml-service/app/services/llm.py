@@ -0,0 +1,292 @@
+"""Shared LLM gateway: one Gemini client per process with a concurrency cap, timeouts, retries,
+a circuit breaker and per-request latency budgets"""
+from __future__ import annotations
+import asyncio
+import os
+import random
+import threading
+import time
+from contextlib import aclosing, contextmanager
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, Type
+from pydantic import BaseModel
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .json_extract import Extracted, JSONExtractionError, JSONObjectScanner, parse_object
+from .metrics import STAGE_LATENCY
+
+# google.api_core exception names worth retrying (matched by name so the SDK stays a lazy import)
+_RETRYABLE = {'ResourceExhausted', 'ServiceUnavailable', 'DeadlineExceeded', 'InternalServerError', 'TooManyRequests'}
+
+def _is_retryable(e: Exception) -> bool:
+    return isinstance(e, (TimeoutError, ConnectionError)) or type(e).__name__ in _RETRYABLE
+
+class LatencyBudgetExceeded(TimeoutError):
+    """The request's latency budget ran out before the upstream answered."""
+
+# Errors meaning "serve the fallback now"; adapters re-raise these instead of swallowing them
+UPSTREAM_UNAVAILABLE = (CircuitOpenError, LatencyBudgetExceeded)
+
+_deadline: ContextVar[Optional[float]] = ContextVar('llm_deadline', default=None)
+
+def budget_for(endpoint: str) -> float:
+    """Seconds an endpoint may spend waiting on the LLM: LLM_BUDGET_<ENDPOINT>, else LLM_BUDGET_DEFAULT."""
+    return float(os.getenv(f'LLM_BUDGET_{endpoint.upper()}', os.getenv('LLM_BUDGET_DEFAULT', '12')))
+
+@contextmanager
+def latency_budget(seconds: float) -> Iterator[None]:
+    """Bound every gateway call made inside the block (including retries) by one shared deadline."""
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def _remaining() -> Optional[float]:
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def _cancel_upstream(response: Any) -> None:
+    # The SDK keeps the raw stream on a private attribute: a grpc aio call (cancel) or, for REST, a
+    # generator over the HTTP body (close). Both are no-ops once the stream has completed.
+    upstream = getattr(response, '_iterator', None)
+    stop = getattr(upstream, 'cancel', None) or getattr(upstream, 'close', None)
+    if callable(stop):
+        try:
+            stop()
+        except Exception:
+            pass
+
+class LLMGateway:
+    """Owns client setup for every router.
+
+    The SDK is configured and the GenerativeModel (and its underlying channel) built once, on first
+    use. Calls are non-blocking: with the default grpc transport they use `generate_content_async`
+    on the event loop; with GEMINI_TRANSPORT=rest (no async client) the blocking call runs on the
+    gateway's own thread pool so Starlette's shared pool is never pinned. Outbound calls share one
+    semaphore, get a per-call timeout and are retried with jittered exponential backoff on
+    transient errors. A circuit breaker short-circuits calls (CircuitOpenError) while the upstream
+    is failing or slow and probes it in the background; a `latency_budget` set by the caller caps
+    the total time spent including retries (LatencyBudgetExceeded).
+    """
+
+    def __init__(self, model_name: str | None = None, max_concurrency: int | None = None,
+                 timeout: float | None = None, retries: int | None = None, backoff: float | None = None):
+        self.model_name = model_name or os.getenv('GEMINI_MODEL', 'gemini-pro')
+        self.transport = os.getenv('GEMINI_TRANSPORT') or None
+        self.max_concurrency = max_concurrency or int(os.getenv('LLM_MAX_CONCURRENCY', '64'))
+        self.timeout = timeout or float(os.getenv('LLM_TIMEOUT', '30'))
+        self.retries = retries if retries is not None else int(os.getenv('LLM_RETRIES', '2'))
+        self.backoff = backoff if backoff is not None else float(os.getenv('LLM_BACKOFF', '0.5'))
+        self._model: Any = None
+        self._lock = threading.Lock()
+        self._sem: asyncio.Semaphore | None = None
+        self._sem_loop: asyncio.AbstractEventLoop | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self.in_flight = 0
+        self.calls = 0
+        self.retried = 0
+        self.failures = 0
+        self.breaker = CircuitBreaker(
+            'gemini',
+            window=int(os.getenv('LLM_BREAKER_WINDOW', '20')),
+            min_calls=int(os.getenv('LLM_BREAKER_MIN_CALLS', '5')),
+            failure_rate=float(os.getenv('LLM_BREAKER_FAILURE_RATE', '0.5')),
+            slow_call_seconds=float(os.getenv('LLM_BREAKER_SLOW_SECONDS', '10')),
+            open_seconds=float(os.getenv('LLM_BREAKER_OPEN_SECONDS', '30')),
+            probe=self._probe,
+        )
+
+    @property
+    def available(self) -> bool:
+        return self._model is not None or bool(os.getenv('GEMINI_API_KEY'))
+
+    def client(self) -> Any:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    api_key = os.getenv('GEMINI_API_KEY')
+                    if not api_key:
+                        raise Exception("Gemini API key not configured")
+                    import google.generativeai as genai
+                    # GEMINI_API_ENDPOINT redirects the SDK, e.g. to benchmarks/fake_gemini.py (REST transport only)
+                    endpoint = os.getenv('GEMINI_API_ENDPOINT')
+                    genai.configure(api_key=api_key, transport=self.transport,
+                                    client_options={'api_endpoint': endpoint} if endpoint else None)
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives bind to one loop; rebuild if the gateway is used from a new one
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._sem_loop is not loop:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+            self._sem_loop = loop
+        return self._sem
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='llm')
+        return self._executor
+
+    async def _call(self, model: Any, prompt: str, timeout: float) -> str:
+        # retry=None: the SDK's own retry policy would otherwise retry 5xx inside one attempt until the timeout
+        options = {'timeout': timeout, 'retry': None}
+        if self.transport == 'rest':
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                self._pool(), lambda: model.generate_content(prompt, request_options=options))
+        else:
+            response = await model.generate_content_async(prompt, request_options=options)
+        return response.text
+
+    async def _chunks(self, model: Any, prompt: str, options: Dict[str, Any]) -> AsyncIterator[str]:
+        """Streamed completion text; closing the generator cancels generation upstream."""
+        response = None
+        try:
+            if self.transport == 'rest':
+                loop = asyncio.get_running_loop()
+                response = await loop.run_in_executor(
+                    self._pool(), lambda: model.generate_content(prompt, stream=True, request_options=options))
+                chunks = iter(response)
+                while True:
+                    chunk = await loop.run_in_executor(self._pool(), next, chunks, None)
+                    if chunk is None:
+                        break
+                    yield chunk.text
+            else:
+                response = await model.generate_content_async(prompt, stream=True, request_options=options)
+                async for chunk in response:
+                    yield chunk.text
+        finally:
+            _cancel_upstream(response)
+
+    async def _call_json(self, model: Any, prompt: str, timeout: float, schema: Type[BaseModel]) -> Extracted:
+        scanner = JSONObjectScanner()
+        try:
+            async with asyncio.timeout(timeout):
+                async with aclosing(self._chunks(model, prompt, {'timeout': timeout, 'retry': None})) as chunks:
+                    async for text in chunks:
+                        if scanner.feed(text):
+                            break  # object closed: leaving the block stops generation
+        except TimeoutError:
+            # Out of time mid-object: keep what arrived if it still validates
+            if not scanner.started:
+                raise
+            try:
+                return parse_object(scanner, schema)
+            except JSONExtractionError:
+                raise TimeoutError(f"Incomplete JSON after {timeout:.2f}s") from None
+        return parse_object(scanner, schema)
+
+    async def _probe(self) -> None:
+        """Cheap reachability check used by the breaker while open (no generation)."""
+        model = self.client()
+        if self.transport == 'rest':
+            loop = asyncio.get_running_loop()
+            await asyncio.wait_for(loop.run_in_executor(self._pool(), model.count_tokens, 'ping'), self.timeout)
+        else:
+            await asyncio.wait_for(model.count_tokens_async('ping'), self.timeout)
+
+    async def _with_retries(self, model: Any, call: Callable[[Any, float], Awaitable[Any]]) -> Any:
+        for attempt in range(self.retries + 1):
+            remaining = _remaining()
+            if remaining is not None and remaining <= 0:
+                raise LatencyBudgetExceeded("Latency budget exhausted")
+            limit = self.timeout if remaining is None else min(self.timeout, remaining)
+            self.calls += 1
+            try:
+                return await call(model, limit)
+            except Exception as e:
+                if isinstance(e, TimeoutError) and limit < self.timeout:
+                    raise LatencyBudgetExceeded(f"No answer within the {limit:.2f}s left in the latency budget") from e
+                if attempt >= self.retries or not _is_retryable(e):
+                    raise
+                self.retried += 1
+            delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+            remaining = _remaining()
+            if remaining is not None and remaining <= delay:
+                raise LatencyBudgetExceeded("Latency budget exhausted before retry")
+            await asyncio.sleep(delay)
+
+    async def generate(self, prompt: str) -> str:
+        """Completion text for `prompt`; raises after the last retry, when the breaker is open or
+        when the latency budget runs out."""
+        return await self._guarded(lambda model, limit: asyncio.wait_for(self._call(model, prompt, limit), limit))
+
+    async def generate_json(self, prompt: str, schema: Type[BaseModel]) -> Extracted:
+        """The first JSON object in the completion, validated against `schema` (see json_extract).
+
+        The completion is streamed and parsed as it arrives; generation is cancelled upstream as
+        soon as the object closes, so trailing prose is never paid for. A stream that ends (or runs
+        out of time) mid-object yields the longest repaired prefix that still validates, with
+        `complete=False` so callers do not cache it. Raises
+        JSONExtractionError when nothing usable came back, with the same retry, breaker and budget
+        handling as `generate` otherwise.
+        """
+        return await self._guarded(lambda model, limit: self._call_json(model, prompt, limit, schema))
+
+    async def _guarded(self, call: Callable[[Any, float], Awaitable[Any]]) -> Any:
+        model = self.client()
+        if not self.breaker.allow():
+            raise CircuitOpenError("Gemini circuit open")
+        async with self._semaphore():
+            self.in_flight += 1
+            start = time.monotonic()
+            try:
+                result = await self._with_retries(model, call)
+            except (asyncio.CancelledError, JSONExtractionError):
+                # The caller went away, or the model answered with unusable output: either way only
+                # the latency observed says anything about upstream health
+                self.breaker.record(True, time.monotonic() - start)
+                raise
+            except Exception:
+                self.failures += 1
+                self.breaker.record(False, time.monotonic() - start)
+                raise
+            finally:
+                self.in_flight -= 1
+                STAGE_LATENCY.observe(time.monotonic() - start, 'llm')
+            self.breaker.record(True, time.monotonic() - start)
+            return result
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield completion text chunks as they arrive. Holds a concurrency slot until exhausted or closed;
+        closing the generator early (e.g. on client disconnect) cancels the upstream call."""
+        model = self.client()
+        options = {'timeout': self.timeout, 'retry': None}
+        if not self.breaker.allow():
+            raise CircuitOpenError("Gemini circuit open")
+        async with self._semaphore():
+            self.in_flight += 1
+            self.calls += 1
+            start = time.monotonic()
+            first_chunk_at = None
+            try:
+                async with aclosing(self._chunks(model, prompt, options)) as chunks:
+                    async for text in chunks:
+                        first_chunk_at = first_chunk_at or time.monotonic()
+                        yield text
+                # Time to first chunk is what users feel, so that is what the breaker tracks
+                self.breaker.record(True, (first_chunk_at or time.monotonic()) - start)
+            except Exception:
+                self.failures += 1
+                self.breaker.record(False, time.monotonic() - start)
+                raise
+            finally:
+                # Leaving the `aclosing` block above stopped generation upstream if the consumer went away early
+                self.in_flight -= 1
+                STAGE_LATENCY.observe(time.monotonic() - start, 'llm_stream')
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'model': self.model_name,
+            'max_concurrency': self.max_concurrency,
+            'in_flight': self.in_flight,
+            'calls': self.calls,
+            'retried': self.retried,
+            'failures': self.failures,
+            'breaker': self.breaker.snapshot(),
+        }
+
+llm_gateway = LLMGateway()
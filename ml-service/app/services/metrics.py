@@ -0,0 +1,184 @@
+"""Prometheus metrics: per-route request latency, per-stage timings, LLM answer sources, in-flight requests
+
+Rendered in the text exposition format (version 0.0.4) by `registry.render()`, so no client library is
+needed. Stage names used across the service: embedding, search, text_search, llm, llm_stream,
+json_extract, serialization.
+"""
+from __future__ import annotations
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .batcher import _Histogram
+from .circuit_breaker import CircuitOpenError
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+Labels = Tuple[str, ...]
+# (metric name, type, help, label names, [(label values, value)]) as produced by a collector
+Family = Tuple[str, str, str, Sequence[str], List[Tuple[Labels, float]]]
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in [*zip(names, values), *extra]]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+def _render_family(family: Family) -> List[str]:
+    name, kind, help_text, label_names, samples = family
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    lines += [f'{name}{_labels(label_names, values)} {_number(v)}' for values, v in samples]
+    return lines
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.label_names = name, help_text, tuple(labels)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            samples = sorted(self._values.items())
+        return _render_family((self.name, self.kind, self.help, self.label_names, samples))
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    @contextmanager
+    def track(self, *labels: str) -> Iterator[None]:
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+class Histogram:
+    """Labelled histograms over fixed `le` buckets; counts are kept per bucket and summed on render."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.label_names = name, help_text, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Labels, _Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = _Histogram(self.buckets)
+            series.observe(value)
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series.n if series is not None else 0
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((labels, list(h.counts), h.total, h.n) for labels, h in self._series.items())
+        for labels, counts, total, n in series:
+            cumulative = 0
+            for bound, c in zip((*self.buckets, math.inf), counts):
+                cumulative += c
+                le = _number(bound)
+                lines.append(f'{self.name}_bucket{_labels(self.label_names, labels, [("le", le)])} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(self.label_names, labels)} {n}')
+        return lines
+
+class Registry:
+    """Metrics owned here plus collectors that turn existing stats() snapshots into families at scrape time."""
+
+    def __init__(self):
+        self._metrics: List[Counter | Histogram] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+        metric = Gauge(name, help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for collector in self._collectors:
+            try:
+                for family in collector():
+                    lines += _render_family(family)
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.histogram(
+    'prismiq_http_request_duration_seconds', 'Request latency until the last body byte is sent, by route template',
+    ('method', 'route', 'status'))
+IN_FLIGHT = registry.gauge('prismiq_http_requests_in_flight', 'HTTP requests currently being served')
+STAGE_LATENCY = registry.histogram(
+    'prismiq_stage_duration_seconds', 'Time spent in one processing stage of a request', ('stage',), STAGE_BUCKETS)
+LLM_ANSWERS = registry.counter(
+    'prismiq_llm_answers_total', 'Answers by source: gemini, fallback (Gemini configured but failed) or mock (no API key)',
+    ('endpoint', 'source'))
+LLM_FALLBACKS = registry.counter(
+    'prismiq_llm_fallbacks_total', 'Fallback answers served instead of Gemini, by reason', ('endpoint', 'reason'))
+
+def stage(name: str):
+    """`with stage('embedding'): ...` records the block's duration."""
+    return STAGE_LATENCY.time(name)
+
+def fallback_reason(error: Optional[BaseException]) -> str:
+    if isinstance(error, CircuitOpenError):
+        return 'circuit_open'
+    if isinstance(error, TimeoutError):
+        # Includes LatencyBudgetExceeded
+        return 'timeout'
+    return 'error'
+
+def record_answer(endpoint: str, source: str, error: Optional[BaseException] = None) -> None:
+    """Count who answered a request; called exactly once per LLM-backed request."""
+    LLM_ANSWERS.inc(endpoint, source)
+    if source == 'fallback':
+        LLM_FALLBACKS.inc(endpoint, fallback_reason(error))
@@ -0,0 +1,70 @@
+"""Resident memory of this process and of its pre-fork siblings, read from /proc (Linux; empty elsewhere)"""
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Set by app/serve.py in the master before forking, so every worker can find the rest of its group
+MASTER_PID_ENV = "PRISMIQ_SERVE_MASTER_PID"
+
+_PROC = Path("/proc")
+# smaps_rollup field -> reported key (values are in kB)
+_ROLLUP = {"Rss": "rss_bytes", "Pss": "pss_bytes"}
+_SHARED = ("Shared_Clean", "Shared_Dirty")
+_PRIVATE = ("Private_Clean", "Private_Dirty")
+
+def memory(pid: int | str = "self") -> Dict[str, int]:
+    """rss_bytes, plus pss_bytes, shared_bytes and private_bytes where the kernel reports them.
+
+    RSS counts pages shared with the master (model weights, the catalog) in full for every worker;
+    PSS divides each shared page among the processes mapping it, so PSS summed over the group is
+    what the host actually spends. Empty if the process is gone or /proc is unavailable.
+    """
+    fields: Dict[str, int] = {}
+    try:
+        with open(_PROC / str(pid) / "smaps_rollup", encoding="ascii") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                parts = rest.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    fields[key] = int(parts[0]) * 1024
+    except OSError:
+        # Kernels before 4.14 have no smaps_rollup; VmRSS is still there
+        try:
+            with open(_PROC / str(pid) / "status", encoding="ascii") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return {"rss_bytes": int(line.split()[1]) * 1024}
+        except OSError:
+            pass
+        return {}
+    out = {name: fields[key] for key, name in _ROLLUP.items() if key in fields}
+    out["shared_bytes"] = sum(fields.get(k, 0) for k in _SHARED)
+    out["private_bytes"] = sum(fields.get(k, 0) for k in _PRIVATE)
+    return out
+
+def _children(ppid: int) -> List[int]:
+    pids = []
+    for entry in _PROC.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            # The command name in field 2 may contain spaces; fields after the closing paren are fixed
+            stat = (entry / "stat").read_text(encoding="ascii", errors="replace")
+            if int(stat.rpartition(")")[2].split()[1]) == ppid:
+                pids.append(int(entry.name))
+        except (OSError, ValueError, IndexError):
+            continue
+    return sorted(pids)
+
+def process_group() -> List[Dict[str, Any]]:
+    """One entry per process serving the app: the pre-fork master and its workers when running
+    under app/serve.py, else just this process."""
+    me = os.getpid()
+    master = int(os.getenv(MASTER_PID_ENV, "0") or 0)
+    if not master or not _PROC.exists():
+        return [{"pid": me, "role": "single", "current": True, **memory()}]
+    group = [{"pid": master, "role": "master", "current": False, **memory(master)}]
+    group += [{"pid": pid, "role": "worker", "current": pid == me, **memory(pid)} for pid in _children(master)]
+    # Workers hold a resume ProcessPoolExecutor of their own; those grandchildren are not listed
+    return [p for p in group if "rss_bytes" in p]
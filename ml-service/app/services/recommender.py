@@ -1,35 +1,33 @@
 """Simple recommender: embed profile text -> cosine sim to seed careers -> top3 with calibrated confidence"""
 from __future__ import annotations
-import json
-import numpy as np
+import os
 from pathlib import Path
-from sklearn.metrics.pairwise import cosine_similarity
 from .embeddings import embed_text
+from .catalog import CatalogManager
+from .metrics import stage
 
-DATA = json.loads(Path(__file__).resolve().parents[2].joinpath('data/careers.json').read_text())
-CAREER_TEXTS = [f"{c['title']} {c['description']} {' '.join(c.get('skills', []))}" for c in DATA]
-CAREER_EMB = None
+DATA_PATH = Path(__file__).resolve().parents[2].joinpath('data/careers.json')
+# Built offline by `python -m scripts.build_career_embeddings`; a sidecar .meta.json records model and checksum
+EMB_PATH = Path(os.getenv('CAREER_EMB_PATH', str(DATA_PATH.with_suffix('.emb.npy'))))
 
-def _ensure_seed_embeddings():
-    global CAREER_EMB
-    if CAREER_EMB is not None:
-        return
-    vecs = [embed_text(t) for t in CAREER_TEXTS]
-    CAREER_EMB = np.vstack(vecs)
+catalog = CatalogManager(DATA_PATH, EMB_PATH)
+
+def build_career_embeddings() -> dict:
+    return catalog.build_embeddings_file()
 
 
 def recommend_careers(profile: dict) -> list[dict]:
-    _ensure_seed_embeddings()
+    snap = catalog.snapshot()  # one consistent catalog version for the whole request
     text = ' '.join(str(profile.get(k, '')) for k in ['summary','skills','education','projects'])
     q = embed_text(text)
-    sims = cosine_similarity([q], CAREER_EMB)[0]
-    top_idx = sims.argsort()[::-1][:3]
+    with stage('search'):
+        top_idx, sims = snap.index.search(q, 3)
     recs = []
-    for i in top_idx:
-        conf = float(max(0.0, min(1.0, sims[i])))
+    for i, sim in zip(top_idx, sims):
+        conf = float(max(0.0, min(1.0, sim)))
         recs.append({
-            'career': DATA[i]['title'],
+            'career': snap.data[i]['title'],
             'confidence': round(conf, 4),
-            'tags': DATA[i].get('skills', [])[:5]
+            'tags': snap.data[i].get('skills', [])[:5]
         })
     return recs
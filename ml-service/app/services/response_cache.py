@@ -0,0 +1,181 @@
+"""LLM response cache: TTL + LRU keyed by normalized prompt hash, single-flight coalescing, optional shared backend"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_WS = re.compile(r"\s+")
+
+# Entries are held serialized and decoded per hit, so callers get their own objects
+def _encode(value: Any) -> bytes:
+    return orjson.dumps(value) if orjson is not None else json.dumps(value).encode("utf-8")
+
+def _decode(raw: bytes) -> Any:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+def prompt_key(namespace: str, prompt: str) -> str:
+    norm = _WS.sub(" ", prompt).strip()
+    return f"llm:{namespace}:" + hashlib.sha256(norm.encode("utf-8")).hexdigest()
+
+class RedisBackend:
+    """Shared cache tier so every worker (and replica) sees the same hits. Values are stored as JSON."""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Any:
+        raw = await self._client.get(key)
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self._client.set(key, json.dumps(value), ex=max(1, int(ttl)))
+
+class Uncached(NamedTuple):
+    """Return from `compute` to hand a value to its caller without caching it, e.g. an LLM answer
+    repaired from a truncated one. Coalesced followers do not get it either: they compute again."""
+    value: Any
+
+# Leader result telling coalesced followers to compute for themselves
+_RETRY = object()
+
+class ResponseCache:
+    """In-process TTL+LRU in front of an optional shared backend.
+
+    Concurrent misses for the same key are coalesced: the first caller computes, the rest await its
+    result, so N identical in-flight requests make exactly one upstream call. Exceptions are never
+    cached. Values must be JSON-serializable: they are stored encoded and every hit or coalesced
+    follower decodes its own copy, so a handler mutating its result cannot change anyone else's.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 3600.0, backend: Any = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backend = backend
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _get_local(self, key: str) -> Optional[Tuple[Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return (_decode(value),)
+
+    def _set_local(self, key: str, value: bytes) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_compute(self, namespace: str, prompt: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        key = prompt_key(namespace, prompt)
+        while True:
+            hit = self._get_local(key)
+            if hit is not None:
+                self.hits += 1
+                return hit[0]
+            leader = self._inflight.get(key)
+            if leader is None:
+                break
+            self.coalesced += 1
+            try:
+                result = await asyncio.shield(leader)
+                if result is not _RETRY:
+                    return _decode(result)
+                continue
+            except asyncio.CancelledError:
+                # The leader's client went away; retry unless we were the ones cancelled
+                if not leader.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            value = await self._backend_get(key)
+            if value is not None:
+                self.shared_hits += 1
+            else:
+                self.misses += 1
+                value = await compute()
+                if isinstance(value, Uncached):
+                    fut.set_result(_RETRY)
+                    return value.value
+                await self._backend_set(key, value)
+            encoded = _encode(value)
+            self._set_local(key, encoded)
+            fut.set_result(encoded)
+            return value
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved so an unawaited leader error is not logged twice
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _backend_get(self, key: str) -> Any:
+        if self.backend is None:
+            return None
+        try:
+            return await self.backend.get(key)
+        except Exception as e:
+            print(f"Shared response cache read failed: {e}")
+            return None
+
+    async def _backend_set(self, key: str, value: Any) -> None:
+        if self.backend is None:
+            return
+        try:
+            await self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            print(f"Shared response cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+            "backend": type(self.backend).__name__ if self.backend is not None else None,
+        }
+
+def _shared_backend() -> Any:
+    url = os.getenv("RESPONSE_CACHE_REDIS_URL")
+    if not url:
+        return None
+    try:
+        return RedisBackend(url)
+    except Exception as e:
+        print(f"Shared response cache unavailable, using in-process cache only: {e}")
+        return None
+
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048")),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+    backend=_shared_backend(),
+)
@@ -0,0 +1,58 @@
+"""Deterministic resume analysis (skills, level, score) shared by the mock adapter, bulk ingestion and streamed uploads"""
+from __future__ import annotations
+import asyncio
+import codecs
+import os
+from typing import Any, AsyncIterator, Dict, List
+from .skill_extractor import skill_extractor
+
+# Largest streamed upload accepted; memory per upload is one body chunk plus a short carry-over
+UPLOAD_MAX_BYTES = int(os.getenv("RESUME_UPLOAD_MAX_BYTES", str(64 * 1024 * 1024)))
+
+class UploadTooLarge(ValueError):
+    pass
+
+def analyze_resume(resume_text: str) -> Dict[str, Any]:
+    return build_analysis(skill_extractor().skills(resume_text), len(resume_text))
+
+def build_analysis(found_skills: List[str], text_length: int) -> Dict[str, Any]:
+    """Analysis from the skills found and the resume length in characters (for streamed uploads)."""
+    # Default skills if none found
+    if not found_skills:
+        found_skills = ['Communication', 'Problem Solving', 'Teamwork']
+    
+    # Calculate score based on resume length and skills
+    score = min(90, max(50, text_length // 20 + len(found_skills) * 5))
+    
+    return {
+        "skills": found_skills[:8],
+        "experience_years": 3,
+        "education_level": "Bachelor's Degree",
+        "key_strengths": found_skills[:3] if found_skills else ["Communication"],
+        "improvement_areas": ["Portfolio development", "Industry certifications"],
+        "career_level": "mid" if len(found_skills) > 5 else "entry",
+        "industries": ["Technology", "Software Development"],
+        "score": score
+    }
+
+async def analyze_upload(chunks: AsyncIterator[bytes], max_bytes: int = UPLOAD_MAX_BYTES) -> Dict[str, Any]:
+    """Same result as `analyze_resume` on the decoded text, without ever holding the whole document.
+
+    UTF-8 is decoded incrementally (a character split between chunks is kept for the next one) and
+    each chunk is scanned as it arrives; raises UploadTooLarge past `max_bytes`.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    scanner = skill_extractor().scanner()
+    found: Dict[str, None] = {}
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLarge(f"upload exceeds {max_bytes} bytes")
+        text = decoder.decode(chunk)
+        if text:
+            for m in await asyncio.to_thread(scanner.feed, text):
+                found.setdefault(m.skill)
+    for m in scanner.feed(decoder.decode(b"", final=True)) + scanner.close():
+        found.setdefault(m.skill)
+    return build_analysis(list(found), scanner.chars)
@@ -0,0 +1,154 @@
+"""Bulk resume ingestion: NDJSON lines in, NDJSON results out, extraction and scoring on a process pool"""
+from __future__ import annotations
+import asyncio
+import json
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+from .resume_analysis import analyze_resume
+from .skill_extractor import skill_extractor
+
+# Longest accepted input line; longer lines are skipped (reported as an error) without being buffered
+MAX_LINE_BYTES = int(os.getenv("RESUME_BATCH_MAX_LINE_BYTES", str(1024 * 1024)))
+# Resumes per pool task: amortizes pickling/IPC without delaying the first results much
+CHUNK_LINES = int(os.getenv("RESUME_BATCH_CHUNK", "16"))
+POOL_WORKERS = int(os.getenv("RESUME_POOL_WORKERS", "0")) or os.cpu_count() or 1
+# Tasks in flight per request; once reached, the request body is not read until the oldest finishes
+WINDOW = int(os.getenv("RESUME_BATCH_WINDOW", "0")) or 2 * POOL_WORKERS
+
+Line = Tuple[int, Optional[bytes]]
+
+def _analyze_line(index: int, raw: Optional[bytes]) -> Dict[str, Any]:
+    if raw is None:
+        return {"index": index, "error": f"line exceeds {MAX_LINE_BYTES} bytes"}
+    try:
+        item = json.loads(raw)
+    except ValueError as e:
+        return {"index": index, "error": f"invalid JSON: {e}"}
+    if not isinstance(item, dict) or not isinstance(item.get("resume_text"), str) or not isinstance(item.get("user_id"), str):
+        return {"index": index, "error": "expected an object with string resume_text and user_id"}
+    analysis = analyze_resume(item["resume_text"])
+    return {"index": index, "user_id": item["user_id"], "skills": analysis.get("skills", []), "analysis": analysis}
+
+def analyze_lines(lines: List[Line]) -> bytes:
+    """Pool task: parse, analyze and serialize a chunk of input lines into NDJSON."""
+    return "".join(json.dumps(_analyze_line(i, raw)) + "\n" for i, raw in lines).encode("utf-8")
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[Line]:
+    """Split a byte stream into numbered non-empty lines, holding at most `max_line_bytes` at once.
+
+    A line that grows past the cap is dropped as it streams in and yielded as (index, None).
+    """
+    buf = bytearray()
+    overflow = False
+    index = 0
+    async for chunk in chunks:
+        start = 0
+        while True:
+            nl = chunk.find(b"\n", start)
+            piece = chunk[start:] if nl < 0 else chunk[start:nl]
+            if not overflow:
+                if len(buf) + len(piece) > max_line_bytes:
+                    overflow = True
+                    buf.clear()
+                else:
+                    buf += piece
+            if nl < 0:
+                break
+            start = nl + 1
+            if overflow or buf.strip():
+                yield index, None if overflow else bytes(buf)
+                index += 1
+            buf.clear()
+            overflow = False
+    if overflow or buf.strip():
+        yield index, None if overflow else bytes(buf)
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+def _init_worker() -> None:
+    skill_extractor()
+
+def resume_pool() -> ProcessPoolExecutor:
+    """Process-wide pool, started on first bulk request. Spawned rather than forked so workers do not
+    inherit the server's threads and event loop; each compiles the skill taxonomy once."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=POOL_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+    return _pool
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+def _discard_pool(broken: ProcessPoolExecutor) -> None:
+    """Forget a pool whose worker died (OOM kill, native crash) so the next request starts a new one.
+    Only if it is still the current pool: another request may already have replaced it."""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+def _submit(loop: asyncio.AbstractEventLoop, lines: List[Line]) -> Tuple[List[int], ProcessPoolExecutor, asyncio.Future]:
+    pool = resume_pool()
+    try:
+        fut = loop.run_in_executor(pool, analyze_lines, lines)
+    except BrokenProcessPool:
+        # Broken by an earlier task; nothing of this chunk ran yet, so it can go to a fresh pool
+        _discard_pool(pool)
+        pool = resume_pool()
+        fut = loop.run_in_executor(pool, analyze_lines, lines)
+    return [i for i, _ in lines], pool, fut
+
+async def _result(task: Tuple[List[int], ProcessPoolExecutor, asyncio.Future]) -> bytes:
+    indices, pool, fut = task
+    try:
+        return await fut
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        error = "resume worker process died; resubmit this line"
+        return "".join(json.dumps({"index": i, "error": error}) + "\n" for i in indices).encode("utf-8")
+
+async def process_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """NDJSON results for an NDJSON body, in input order, as soon as each chunk of lines is done.
+
+    At most WINDOW chunks of CHUNK_LINES lines are queued or running per request, so memory stays
+    bounded however long the upload is, and a slow reader stalls the upload instead of growing buffers.
+    If a pool worker dies, the lines of the chunks it took down get error records and the rest of
+    the stream continues on a new pool.
+    """
+    loop = asyncio.get_running_loop()
+    pending: Deque[Tuple[List[int], ProcessPoolExecutor, asyncio.Future]] = deque()
+    batch: List[Line] = []
+    try:
+        async for line in iter_lines(chunks):
+            batch.append(line)
+            if len(batch) < CHUNK_LINES:
+                continue
+            pending.append(_submit(loop, batch))
+            batch = []
+            while len(pending) >= WINDOW or (pending and pending[0][2].done()):
+                yield await _result(pending.popleft())
+        if batch:
+            pending.append(_submit(loop, batch))
+        while pending:
+            yield await _result(pending.popleft())
+    finally:
+        # Client went away (or the upload failed): drop work that has not started yet
+        for _, _, fut in pending:
+            fut.cancel()
@@ -0,0 +1,99 @@
+"""Roadmap templates from data/roadmaps.json: loaded once, matched through a keyword index, served as pre-encoded JSON"""
+from __future__ import annotations
+import json
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Tuple
+from .text_index import tokenize
+
+ROADMAPS_PATH = Path(os.getenv('ROADMAPS_PATH', str(Path(__file__).resolve().parents[2].joinpath('data/roadmaps.json'))))
+# Distinct careers whose serialized response is kept
+CACHE_SIZE = int(os.getenv('ROADMAP_CACHE_SIZE', '4096'))
+
+def _dumps(obj: Any) -> str:
+    # Same encoding as Starlette's JSONResponse
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+
+def _freeze(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(v) for v in obj)
+    return obj
+
+class RoadmapTemplate(NamedTuple):
+    name: str
+    total_duration: str
+    phases: Tuple[Mapping[str, Any], ...]
+    phases_json: str
+
+class GeneratorPhase(NamedTuple):
+    name: str
+    skills: Tuple[str, ...]
+    courses: Tuple[str, ...]
+    projects: Tuple[str, ...]
+
+class RoadmapTemplates:
+    """Immutable templates plus a token -> template index built once from the data file.
+
+    A career picks the template of its highest-priority keyword (file order), e.g. 'Senior Data
+    Developer' -> software. Titles and keywords are tokenized like the career search index, so
+    plurals match ('Web Developers' -> software). The JSON for each template's phases is encoded at load time, so a
+    response is one lookup in a per-(template, career) LRU of finished bodies.
+    """
+
+    def __init__(self, spec: Mapping[str, Any], cache_size: int = CACHE_SIZE):
+        self.templates: Dict[str, RoadmapTemplate] = {}
+        for name, t in spec['templates'].items():
+            self.templates[name] = RoadmapTemplate(name, t['total_duration'], _freeze(t['phases']), _dumps(t['phases']))
+        self.default = spec['default']
+        self._index: Dict[str, Tuple[int, str]] = {
+            tok: (priority, template) for priority, (keyword, template) in enumerate(spec['keywords'].items()) for tok in tokenize(keyword)
+        }
+        courses = spec['generator']['courses']
+        self.generator_phases = tuple(
+            GeneratorPhase(p['name'], tuple(p['skills']), tuple(c for s in p['skills'] for c in courses.get(s, [])), tuple(p['projects']))
+            for p in spec['generator']['phases']
+        )
+        self._body = lru_cache(maxsize=cache_size)(self._encode_body)
+
+    @classmethod
+    def from_file(cls, path: Path | str) -> 'RoadmapTemplates':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def match(self, career: str) -> str:
+        hits = [self._index[tok] for tok in tokenize(career) if tok in self._index]
+        return min(hits)[1] if hits else self.default
+
+    def _encode_body(self, template: str, career: str) -> bytes:
+        t = self.templates[template]
+        roadmap = f'{{"career":{_dumps(career)},"total_duration":{_dumps(t.total_duration)},"phases":{t.phases_json}}}'
+        return f'{{"roadmap":{roadmap},"phases":{t.phases_json}}}'.encode('utf-8')
+
+    def response_body(self, career: str) -> bytes:
+        """Serialized `{"roadmap": ..., "phases": ...}` for the /roadmap endpoint."""
+        return self._body(self.match(career), career)
+
+    def roadmap(self, career: str) -> Dict[str, Any]:
+        """A fresh, mutable roadmap dict for callers that need one."""
+        t = self.templates[self.match(career)]
+        return {"career": career, "total_duration": t.total_duration, "phases": json.loads(t.phases_json)}
+
+    def cache_info(self) -> Any:
+        return self._body.cache_info()
+
+_templates: RoadmapTemplates | None = None
+_lock = threading.Lock()
+
+def roadmap_templates() -> RoadmapTemplates:
+    """Process-wide templates over ROADMAPS_PATH, loaded on first use."""
+    global _templates
+    if _templates is None:
+        with _lock:
+            if _templates is None:
+                _templates = RoadmapTemplates.from_file(ROADMAPS_PATH)
+    return _templates
@@ -0,0 +1,172 @@
+"""Skill extraction: the whole taxonomy (skills and aliases) compiled into one regex, matched in a single pass"""
+from __future__ import annotations
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Tuple
+
+SKILLS_PATH = Path(os.getenv('SKILLS_PATH', str(Path(__file__).resolve().parents[2].joinpath('data/skills.json'))))
+
+# A mention must not be glued to a word on either side: 'java' does not match in 'javascript' and
+# 'git' not in 'digital'. '+' and '#' count as word characters so 'c' does not match in 'c++'/'c#'.
+_BEFORE = r'(?<![\w.+#])'
+_AFTER = r'(?![\w+#])'
+
+class SkillMatch(NamedTuple):
+    skill: str   # canonical name from the taxonomy
+    text: str    # the text as written in the document
+    start: int
+    end: int
+
+def _normalize(alias: str) -> str:
+    return ' '.join(alias.casefold().split())
+
+def _trie_pattern(words: Iterable[str]) -> Tuple[str, List[int]]:
+    """Regex for a set of literals, factored by common prefix.
+
+    `re` tries alternatives one by one, so a flat `a|b|c` over thousands of aliases costs work per
+    alias at every position; the prefix tree rejects a position after the first few characters.
+    Longer alternatives come first, so the longest alias wins ('node.js' over 'node').
+
+    Every word ends in an empty capturing group, so a match tells which word it was without looking
+    the (case- and whitespace-varying) matched text up again. Returns the pattern and, per group in
+    pattern order, the index of its word: group `m.lastindex` is word `order[m.lastindex - 1]`.
+    """
+    trie: Dict[str, Any] = {}
+    for i, word in enumerate(words):
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = i
+    order: List[int] = []
+
+    def emit(node: Dict[str, Any]) -> str:
+        branches = []
+        for ch in sorted(k for k in node if k):
+            atom = r'\s+' if ch == ' ' else re.escape(ch)
+            branches.append(atom + emit(node[ch]))
+        if '' in node:
+            # Children are emitted first, so appending here follows the groups' order in the pattern
+            order.append(node[''])
+            branches.append('()')
+        return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+
+    return emit(trie), order
+
+class SkillExtractor:
+    """Finds every taxonomy skill mentioned in a text, by canonical name or alias, with positions.
+
+    `taxonomy` maps a canonical skill name to its aliases. Only the aliases are matched, so a name
+    that is also an ordinary word ('Go', 'Spring') is left out of its own list. Matching is case-insensitive and whitespace inside multi-word aliases may be any run of
+    whitespace (e.g. a line break in 'machine\\nlearning').
+    """
+
+    def __init__(self, taxonomy: Mapping[str, Iterable[str]]):
+        self.aliases: Dict[str, str] = {}
+        for skill, aliases in taxonomy.items():
+            for alias in aliases:
+                # First definition wins if two skills claim the same alias
+                self.aliases.setdefault(_normalize(alias), skill)
+        self.skill_count = len(taxonomy)
+        self.max_alias_len = max((len(a) for a in self.aliases), default=0)
+        trie, order = _trie_pattern(self.aliases)
+        skills = list(self.aliases.values())
+        self._group_skill = [''] + [skills[i] for i in order]
+        self._pattern = re.compile(_BEFORE + trie + _AFTER, re.IGNORECASE)
+
+    @classmethod
+    def from_file(cls, path: Path | str) -> 'SkillExtractor':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def finditer(self, text: str) -> Iterator[SkillMatch]:
+        for m in self._pattern.finditer(text):
+            yield SkillMatch(self._group_skill[m.lastindex], m.group(), m.start(), m.end())
+
+    def extract(self, text: str) -> List[SkillMatch]:
+        """Every non-overlapping mention, in document order."""
+        return list(self.finditer(text))
+
+    def skills(self, text: str) -> List[str]:
+        """Distinct canonical skills, ordered by first mention."""
+        return list(dict.fromkeys(m.skill for m in self.finditer(text)))
+
+    def scanner(self) -> 'SkillScanner':
+        return SkillScanner(self)
+
+class SkillScanner:
+    """Incremental SkillExtractor over a text that arrives in chunks.
+
+    `feed()` returns the matches that later text can no longer change; `close()` returns the rest.
+    Together they give exactly `extract()` on the joined text (absolute positions included) while
+    holding only the current chunk plus a short carry-over, so a mention split across chunks (or an
+    alias spanning them) is still found once.
+    """
+
+    def __init__(self, extractor: SkillExtractor, max_carry: int = 64 * 1024):
+        self._ex = extractor
+        # A match plus its lookahead character spans at most this many characters, counting a
+        # whitespace run inside a multi-word alias as one
+        self._reach = extractor.max_alias_len + 1
+        self._max_carry = max_carry
+        self._buf = ''
+        self._base = 0   # absolute offset of _buf[0]
+        self._pos = 0    # index in _buf where matching resumes
+        self.chars = 0
+
+    def _settled(self) -> int:
+        """Index before which every match attempt is decided by the text buffered so far."""
+        buf = self._buf
+        floor = max(0, len(buf) - self._max_carry)
+        i = len(buf)
+        # A trailing whitespace run may continue in the next chunk, so it counts for nothing
+        while i > floor and buf[i - 1].isspace():
+            i -= 1
+        need = self._reach
+        while i > floor and need > 0:
+            i -= 1
+            if buf[i].isspace():
+                while i > floor and buf[i - 1].isspace():
+                    i -= 1
+            need -= 1
+        # At the carry cap the oldest text is settled regardless (only a >max_carry whitespace run
+        # inside a multi-word alias could then be missed)
+        return i if need == 0 else floor
+
+    def _scan(self, settled: int) -> List[SkillMatch]:
+        out = []
+        for m in self._ex._pattern.finditer(self._buf, self._pos):
+            if m.start() >= settled:
+                break
+            out.append(SkillMatch(self._ex._group_skill[m.lastindex], m.group(),
+                                  self._base + m.start(), self._base + m.end()))
+            self._pos = m.end()
+        resume = max(self._pos, settled)
+        # Keep one character before the resume point for the leading word-boundary check
+        keep = max(0, resume - 1)
+        self._buf = self._buf[keep:]
+        self._base += keep
+        self._pos = resume - keep
+        return out
+
+    def feed(self, chunk: str) -> List[SkillMatch]:
+        self.chars += len(chunk)
+        self._buf += chunk
+        return self._scan(self._settled())
+
+    def close(self) -> List[SkillMatch]:
+        return self._scan(len(self._buf))
+
+_extractor: SkillExtractor | None = None
+_lock = threading.Lock()
+
+def skill_extractor() -> SkillExtractor:
+    """Process-wide extractor over SKILLS_PATH, compiled on first use."""
+    global _extractor
+    if _extractor is None:
+        with _lock:
+            if _extractor is None:
+                _extractor = SkillExtractor.from_file(SKILLS_PATH)
+    return _extractor
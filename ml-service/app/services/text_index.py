@@ -0,0 +1,108 @@
+"""Inverted index over short documents (careers, courses): tokenized once, ranked multi-term lookup with NumPy postings"""
+from __future__ import annotations
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can do for from have how i in is it like me my of on or should "
+    "so that the to want what which with would you your".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords; a trailing plural 's' is dropped ('engineers' -> 'engineer')."""
+    out = []
+    for tok in _TOKEN.findall(text.lower()):
+        if tok in _STOPWORDS:
+            continue
+        if len(tok) > 3 and tok.endswith('s') and not tok.endswith('ss'):
+            tok = tok[:-1]
+        out.append(tok)
+    return out
+
+class InvertedIndex:
+    """token -> postings built once from weighted text fields.
+
+    A document's weight for a token is the summed weight of the fields containing it, times the
+    token's idf, so rare words (a skill) outrank common ones ('engineer'). Postings are sparse
+    (doc ids, weights) arrays, or a dense weight vector for tokens in at least 1/`dense_ratio` of
+    the documents, where one contiguous add beats scattering that many ids. A query adds up its
+    distinct tokens' postings; when the top-k can only come from documents holding a sparse
+    (rarer) token, just those are ranked, so cost follows the postings read, not the corpus size.
+    """
+
+    def __init__(self, docs: Sequence[Mapping[str, Iterable[str]]], field_weights: Mapping[str, float],
+                 dense_ratio: int = 8):
+        self.size = len(docs)
+        raw: Dict[str, Dict[int, float]] = defaultdict(dict)
+        for doc_id, doc in enumerate(docs):
+            for field, weight in field_weights.items():
+                for tok in set(t for text in doc.get(field, ()) for t in tokenize(text)):
+                    raw[tok][doc_id] = raw[tok].get(doc_id, 0.0) + weight
+        self._sparse: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._dense: Dict[str, Tuple[np.ndarray, float]] = {}
+        for tok, entries in raw.items():
+            idf = math.log(1.0 + self.size / len(entries))
+            ids = np.fromiter(entries.keys(), dtype=np.int32, count=len(entries))
+            weights = np.fromiter(entries.values(), dtype=np.float32, count=len(entries)) * np.float32(idf)
+            if len(entries) * dense_ratio >= self.size and self.size >= 1024:
+                vec = np.zeros(self.size, dtype=np.float32)
+                vec[ids] = weights
+                self._dense[tok] = (vec, float(weights.max()))
+            else:
+                self._sparse[tok] = (ids, weights)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self._sparse or token in self._dense
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """Top-k (doc id, score), best first; documents sharing no token with the query are never returned."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        sparse = [self._sparse[t] for t in tokens if t in self._sparse]
+        dense = [self._dense[t] for t in tokens if t in self._dense]
+        if (not sparse and not dense) or k <= 0:
+            return []
+        if not dense:
+            if len(sparse) == 1:
+                return self._rank(*sparse[0], len(sparse), k)
+            scores = np.zeros(self.size, dtype=np.float32)
+        else:
+            scores = dense[0][0].copy()
+            for vec, _ in dense[1:]:
+                scores += vec
+        for ids, weights in sparse:
+            scores[ids] += weights
+        if sparse:
+            cand = np.concatenate([ids for ids, _ in sparse])
+            top = self._rank(cand, scores[cand], len(sparse), k)
+            # Documents without any sparse token score at most the dense tokens' combined maximum
+            if len(top) == k and top[-1][1] > sum(best for _, best in dense):
+                return top
+        return self._rank_all(scores, k)
+
+    @staticmethod
+    def _rank(cand: np.ndarray, vals: np.ndarray, n_terms: int, k: int) -> List[Tuple[int, float]]:
+        # A document occurs at most once per term in `cand`, so the best k * n_terms slots hold k distinct docs
+        take = min(len(cand), k * n_terms)
+        top = np.argpartition(-vals, take - 1)[:take] if take < len(cand) else np.arange(len(cand))
+        best: Dict[int, float] = {}
+        for i in top[np.argsort(-vals[top], kind='stable')]:
+            best.setdefault(int(cand[i]), float(vals[i]))
+            if len(best) == k:
+                break
+        return list(best.items())
+
+    @staticmethod
+    def _rank_all(scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        # k argmax passes over a contiguous vector are cheaper than a partition for the small k used here
+        out = []
+        for _ in range(min(k, len(scores))):
+            i = int(scores.argmax())
+            if scores[i] <= 0:
+                break
+            out.append((i, float(scores[i])))
+            scores[i] = -1.0
+        return out
@@ -0,0 +1,194 @@
+"""Vector indexes for cosine top-k retrieval: exact (argpartition), IVF approximate search and compressed (int8/PCA) search"""
+from __future__ import annotations
+import mmap
+import os
+from typing import Tuple
+import numpy as np
+
+# Kinds whose float rows are only read for re-ranking, so they need not be held in RAM
+COMPRESSED_KINDS = ('int8', 'pca', 'pca_int8')
+
+def index_kind() -> str:
+    return os.getenv('CAREER_INDEX', 'exact').lower()
+
+def file_backed(mat: np.ndarray) -> bool:
+    """True if `mat` is a view of a memory-mapped file rather than heap memory."""
+    while mat is not None:
+        if isinstance(mat, (np.memmap, mmap.mmap)):
+            return True
+        mat = getattr(mat, 'base', None)
+    return False
+
+def normalize_rows(mat: np.ndarray) -> np.ndarray:
+    """Return L2-normalized float32 rows, reusing `mat` (and its mmap pages) when it already is."""
+    mat = np.asanyarray(mat)
+    norms = np.linalg.norm(mat, axis=1) if mat.size else np.zeros(0)
+    if mat.dtype == np.float32 and np.allclose(norms[norms > 0], 1.0, atol=1e-3):
+        return mat
+    norms[norms == 0] = 1.0
+    return (mat / norms[:, None]).astype(np.float32)
+
+def _unit(q: np.ndarray) -> np.ndarray:
+    q = np.asarray(q, dtype=np.float32).ravel()
+    n = np.linalg.norm(q)
+    return q / n if n > 0 else q
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    part = np.argpartition(-scores, k - 1)[:k] if k < scores.shape[0] else np.arange(scores.shape[0])
+    return part[np.argsort(-scores[part], kind='stable')]
+
+class ExactIndex:
+    """Brute-force inner product on pre-normalized rows with an O(n) argpartition top-k."""
+
+    def __init__(self, mat: np.ndarray):
+        self.vectors = normalize_rows(mat)
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def search(self, q: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self.vectors @ _unit(q)
+        idx = _top_k(scores, k)
+        return idx, scores[idx]
+
+class IVFIndex:
+    """Inverted-file index: spherical k-means coarse quantizer, exact scoring inside the probed lists.
+
+    `n_lists` trades build time and memory for finer partitions; `n_probe` trades latency for recall
+    (n_probe == n_lists is exact search).
+    """
+
+    def __init__(self, mat: np.ndarray, n_lists: int | None = None, n_probe: int = 8, iters: int = 10, seed: int = 0):
+        self.vectors = normalize_rows(mat)
+        n = self.vectors.shape[0]
+        self.n_lists = max(1, min(n, n_lists or int(np.sqrt(n)) or 1))
+        self.n_probe = n_probe
+        self.centroids = self._train(iters, seed)
+        assign = np.argmax(self.vectors @ self.centroids.T, axis=1) if n else np.zeros(0, dtype=np.int64)
+        order = np.argsort(assign, kind='stable')
+        bounds = np.searchsorted(assign[order], np.arange(self.n_lists + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(self.n_lists)]
+
+    def _train(self, iters: int, seed: int) -> np.ndarray:
+        rng = np.random.default_rng(seed)
+        n = self.vectors.shape[0]
+        if n == 0:
+            return np.zeros((1, self.vectors.shape[1]), dtype=np.float32)
+        # Train on a sample; 256 points per list is plenty for a coarse quantizer
+        sample = self.vectors[rng.choice(n, size=min(n, self.n_lists * 256), replace=False)]
+        cent = sample[rng.choice(sample.shape[0], size=self.n_lists, replace=False)].copy()
+        for _ in range(iters):
+            assign = np.argmax(sample @ cent.T, axis=1)
+            sums = np.zeros_like(cent)
+            np.add.at(sums, assign, sample)
+            empty = ~np.bincount(assign, minlength=self.n_lists).astype(bool)
+            sums[empty] = cent[empty]
+            cent = normalize_rows(sums)
+        return cent
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def search(self, q: np.ndarray, k: int, n_probe: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
+        q = _unit(q)
+        probe = _top_k(self.centroids @ q, n_probe or self.n_probe)
+        cand = np.concatenate([self.lists[i] for i in probe]) if len(probe) else np.zeros(0, dtype=np.int64)
+        scores = self.vectors[cand] @ q
+        top = _top_k(scores, k)
+        return cand[top], scores[top]
+
+class CompressedIndex:
+    """Search on a compact copy of the rows, then re-rank the best candidates with the float rows.
+
+    `dims` projects rows onto their top principal components (PCA fitted on a sample); `int8`
+    scalar-quantizes each (projected) dimension symmetrically. Only the codes are scanned per query,
+    in blocks, so the float matrix is read for `rerank` candidate rows alone. That only saves memory
+    when the float rows are memory-mapped (the catalog maps them from disk, see
+    embeddings.memory_map); rows passed in from the heap stay there and `nbytes` counts them. Ranking by
+    z . (P^T q) is enough for PCA because the mean's contribution is the same for every row.
+    """
+
+    BLOCK = 8192
+
+    def __init__(self, mat: np.ndarray, dims: int | None = None, int8: bool = True, rerank: int = 16, seed: int = 0):
+        self.vectors = normalize_rows(mat)
+        n, d = self.vectors.shape
+        self.rerank = rerank
+        self.components: np.ndarray | None = None
+        if dims and dims < d:
+            rng = np.random.default_rng(seed)
+            sample = np.asarray(self.vectors[np.sort(rng.choice(n, size=min(n, 20000), replace=False))]) if n else np.zeros((0, d), np.float32)
+            centered = sample - sample.mean(axis=0)
+            # Rows of vt are the principal directions, strongest first
+            _, _, vt = np.linalg.svd(centered, full_matrices=False)
+            self.components = np.ascontiguousarray(vt[:dims].T, dtype=np.float32)
+        reduced = self._project_rows()
+        self.scales: np.ndarray | None = None
+        if int8:
+            self.scales = np.maximum(np.abs(reduced).max(axis=0) if n else np.ones(reduced.shape[1]), 1e-12).astype(np.float32) / 127.0
+            self.codes = np.clip(np.rint(reduced / self.scales), -127, 127).astype(np.int8)
+        else:
+            self.codes = reduced
+
+    def _project_rows(self) -> np.ndarray:
+        if self.components is None:
+            return np.asarray(self.vectors, dtype=np.float32)
+        out = np.empty((self.vectors.shape[0], self.components.shape[1]), dtype=np.float32)
+        for s in range(0, self.vectors.shape[0], self.BLOCK):
+            out[s:s + self.BLOCK] = np.asarray(self.vectors[s:s + self.BLOCK]) @ self.components
+        return out
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    @property
+    def compact_nbytes(self) -> int:
+        """Bytes of the compact form (codes, scales, PCA basis)."""
+        extra = (self.scales.nbytes if self.scales is not None else 0) + (self.components.nbytes if self.components is not None else 0)
+        return self.codes.nbytes + extra
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held on the heap: the compact form, plus the float rows unless they are memory-mapped."""
+        return self.compact_nbytes + (0 if file_backed(self.vectors) else self.vectors.nbytes)
+
+    def approx_scores(self, q: np.ndarray) -> np.ndarray:
+        qv = _unit(q)
+        if self.components is not None:
+            qv = qv @ self.components
+        if self.scales is None:
+            return self.codes @ qv
+        # Per-dimension scales fold into the query: (codes * scales) . q == codes . (scales * q)
+        qv = qv * self.scales
+        out = np.empty(self.codes.shape[0], dtype=np.float32)
+        for s in range(0, self.codes.shape[0], self.BLOCK):
+            out[s:s + self.BLOCK] = self.codes[s:s + self.BLOCK].astype(np.float32) @ qv
+        return out
+
+    def search(self, q: np.ndarray, k: int, rerank: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
+        cand = _top_k(self.approx_scores(q), max(k, k * (rerank or self.rerank)))
+        # Float re-ranking; sorted ids keep mmap reads sequential
+        cand = np.sort(cand)
+        scores = np.asarray(self.vectors[cand]) @ _unit(q)
+        top = _top_k(scores, k)
+        return cand[top], scores[top]
+
+def build_index(mat: np.ndarray, kind: str | None = None):
+    """Index factory; CAREER_INDEX=exact|ivf|int8|pca|pca_int8.
+
+    IVF knobs via CAREER_IVF_LISTS / CAREER_IVF_PROBE; compressed kinds via CAREER_PCA_DIMS (default
+    128) and CAREER_RERANK (float re-ranked candidates per result, default 16).
+    """
+    kind = (kind or index_kind()).lower()
+    if kind == 'ivf':
+        lists = int(os.getenv('CAREER_IVF_LISTS', '0')) or None
+        return IVFIndex(mat, n_lists=lists, n_probe=int(os.getenv('CAREER_IVF_PROBE', '8')))
+    if kind in COMPRESSED_KINDS:
+        dims = int(os.getenv('CAREER_PCA_DIMS', '128')) if kind.startswith('pca') else None
+        return CompressedIndex(mat, dims=dims, int8=kind != 'pca', rerank=int(os.getenv('CAREER_RERANK', '16')))
+    if kind != 'exact':
+        raise ValueError(f"Unknown vector index kind: {kind}")
+    return ExactIndex(mat)
@@ -0,0 +1,70 @@
+"""Startup warmup: load heavy dependencies eagerly, in the background, or lazily on first use"""
+from __future__ import annotations
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+from .embeddings import load_backend, embed_text
+from .recommender import catalog
+from .llm import llm_gateway
+from .roadmap_templates import roadmap_templates
+from .skill_extractor import skill_extractor
+
+# STARTUP_MODE=background (default) warms up after the port is bound, eager blocks startup until
+# ready, lazy skips warmup and lets each dependency load on its first request.
+STARTUP_MODE = os.getenv("STARTUP_MODE", "background").lower()
+
+def _build_llm_client():
+    if llm_gateway.available:
+        llm_gateway.client()
+
+STEPS: List[Tuple[str, Callable[[], Any]]] = [
+    ("embedding_model", load_backend),
+    ("embedding_first_call", lambda: embed_text("warmup")),
+    ("career_catalog", catalog.snapshot),
+    ("skill_extractor", skill_extractor),
+    ("roadmap_templates", roadmap_templates),
+    ("gemini_client", _build_llm_client),
+]
+
+# Steps a pre-fork master (app/serve.py) may run before forking workers: they only load data and
+# models. Anything that opens a gRPC channel, starts threads or runs torch inference (which spins
+# up its OpenMP pool) has to happen in each worker after the fork.
+PRELOAD_STEPS = ("embedding_model", "career_catalog", "skill_extractor", "roadmap_templates")
+
+class WarmupState:
+    def __init__(self):
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        # In lazy mode every dependency loads on demand, so the process is ready as soon as it is live
+        return STARTUP_MODE == "lazy" or self.finished_at is not None
+
+    def run(self, only: Tuple[str, ...] | None = None) -> None:
+        """Run every warmup step, or just `only` (the process is not marked ready then).
+        Steps that already succeeded, e.g. in a pre-fork master, are not repeated."""
+        with self._lock:
+            if self.finished_at is not None:
+                return
+            self.started_at = self.started_at or time.time()
+            for name, step in STEPS:
+                if (only is not None and name not in only) or self.steps.get(name, {}).get("ok"):
+                    continue
+                t0 = time.perf_counter()
+                try:
+                    step()
+                    self.steps[name] = {"ok": True, "seconds": round(time.perf_counter() - t0, 3)}
+                except Exception as e:
+                    print(f"Warmup step {name} failed: {e}")
+                    self.steps[name] = {"ok": False, "seconds": round(time.perf_counter() - t0, 3), "error": str(e)}
+            if only is None:
+                self.finished_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"mode": STARTUP_MODE, "ready": self.ready, "steps": dict(self.steps)}
+
+warmup_state = WarmupState()
@@ -9,7 +9,7 @@ def test_embed():
   assert 'embedding' in r.json()
 
 def test_recommend():
-  r = client.post('/recommend', json={'profile': {'summary':'I love python and machine learning'}})
+  r = client.post('/recommend', json={'user_profile': {'summary':'I love python and machine learning'}, 'user_id': 'test-user'})
   assert r.status_code == 200
   js = r.json()
   assert 'recommendations' in js and len(js['recommendations']) >= 1
@@ -18,3 +18,114 @@ def test_roadmap():
   r = client.get('/roadmap', params={'career':'Data Scientist'})
   assert r.status_code == 200
   assert 'roadmap' in r.json()
+
+def test_embed_batch():
+  r = client.post('/embed/batch', json={'texts':['hello world', 'data science']})
+  assert r.status_code == 200
+  js = r.json()
+  assert len(js['embeddings']) == 2
+  single = client.post('/embed', json={'text':'hello world'}).json()['embedding']
+  assert js['embeddings'][0] == single
+
+def test_admin_catalog_reload(monkeypatch):
+  monkeypatch.delenv('ADMIN_TOKEN', raising=False)
+  assert client.post('/admin/catalog/reload').status_code == 503  # no token configured: closed
+  monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+  assert client.post('/admin/catalog/reload').status_code == 401
+  assert client.get('/admin/workers', headers={'x-admin-token': 'wrong'}).status_code == 401
+  r = client.post('/admin/catalog/reload', params={'force': 'true'}, headers={'x-admin-token': 'secret'})
+  assert r.status_code == 200
+  assert r.json()['changed'] is True
+
+def test_liveness_and_readiness():
+  from app.services.warmup import warmup_state
+  assert client.get('/health').status_code == 200
+  warmup_state.run()
+  r = client.get('/health/ready')
+  assert r.status_code == 200
+  assert r.json()['ready'] is True
+  assert r.json()['steps']['embedding_model']['ok'] is True
+
+def test_chat_stream_sse():
+  body = {'message': 'How do I prepare for an interview?', 'user_id': 'u1', 'user_profile': {'name': 'Ada'}}
+  with client.stream('POST', '/chat/stream', json=body) as r:
+    assert r.status_code == 200
+    assert r.headers['content-type'].startswith('text/event-stream')
+    events = [e for e in r.read().decode().split('\n\n') if e]
+  import json
+  deltas = [json.loads(e[len('data: '):])['delta'] for e in events if e.startswith('data: ')]
+  assert len(deltas) > 1
+  assert ''.join(deltas) == client.post('/chat', json=body).json()['reply']
+  assert events[-1].startswith('event: done')
+  assert json.loads(events[-1].split('data: ', 1)[1])['session_id']
+
+def test_process_resume_batch_ndjson():
+  import json
+  lines = [json.dumps({'resume_text': f'Python and Docker engineer #{i}', 'user_id': f'u{i}'}) for i in range(40)]
+  lines.insert(3, 'not json')
+  body = ('\n'.join(lines) + '\n').encode()
+  r = client.post('/process_resume/batch', content=body, headers={'content-type': 'application/x-ndjson'})
+  assert r.status_code == 200
+  out = [json.loads(line) for line in r.text.splitlines()]
+  assert [o['index'] for o in out] == list(range(41))
+  assert 'error' in out[3]
+  assert out[0]['skills'] == ['Python', 'Docker'] and out[40]['user_id'] == 'u39'
+
+def test_process_resume_upload_matches_json_path():
+  text = 'Senior engineer. ' * 5000 + 'Python, Kubernetes and machine\nlearning; digital Java work.'
+  r = client.post('/process_resume/upload', params={'user_id': 'u1'}, content=text.encode(), headers={'content-type': 'text/plain'})
+  assert r.status_code == 200
+  expected = client.post('/process_resume', json={'resume_text': text, 'user_id': 'u1'}).json()
+  assert r.json() == expected
+  assert r.json()['skills'] == ['Python', 'Kubernetes', 'Machine Learning', 'Java']
+
+def test_chat_keeps_session_profile():
+  first = client.post('/chat', json={'message': 'hi', 'user_id': 'session-user', 'user_profile': {'name': 'Grace'}})
+  session_id = first.json()['session_id']
+  r = client.post('/chat', json={'message': 'What about interview prep?', 'user_id': 'session-user', 'session_id': session_id})
+  assert 'Grace' in r.json()['reply'] and r.json()['session_id'] == session_id
+  # The user_id alone, or the session id under another user_id, does not reach the session
+  assert 'Grace' not in client.post('/chat', json={'message': 'interview?', 'user_id': 'session-user'}).json()['reply']
+  assert 'Grace' not in client.post('/chat', json={'message': 'interview?', 'user_id': 'intruder', 'session_id': session_id}).json()['reply']
+  # An empty profile clears it
+  r = client.post('/chat', json={'message': 'interview?', 'user_id': 'session-user', 'session_id': session_id, 'user_profile': {}})
+  assert 'Grace' not in r.json()['reply']
+
+def test_embed_compact_encodings():
+  import base64
+  import numpy as np
+  ref = np.array(client.post('/embed', json={'text': 'hello world'}).json()['embedding'], dtype=np.float32)
+  r = client.post('/embed', json={'text': 'hello world'}, headers={'accept': 'application/octet-stream'})
+  assert r.headers['content-type'] == 'application/octet-stream'
+  assert np.array_equal(np.frombuffer(r.content, dtype='<f4'), ref)
+  js = client.post('/embed', json={'text': 'hello world', 'encoding': 'base64'}).json()
+  assert np.array_equal(np.frombuffer(base64.b64decode(js['embedding']), dtype='<f4'), ref)
+  js = client.post('/embed/batch', json={'texts': ['hello world', 'data'], 'dtype': 'int8'}).json()
+  approx = np.array(js['embeddings'][0]) * js['scales'][0]
+  assert np.abs(approx - ref).max() <= js['scales'][0] / 2 + 1e-6
+  r = client.post('/embed/batch', json={'texts': ['hello world', 'data'], 'dtype': 'float16'}, headers={'accept': 'application/octet-stream'})
+  assert r.headers['x-embedding-count'] == '2'
+  assert np.allclose(np.frombuffer(r.content, dtype='<f2').reshape(2, -1)[0], ref, atol=1e-3)
+  # int8: the per-row scales lead the body instead of riding in a header
+  texts = [f'text {i}' for i in range(200)]
+  r = client.post('/embed/batch', json={'texts': texts, 'dtype': 'int8'}, headers={'accept': 'application/octet-stream'})
+  n, dim = int(r.headers['x-embedding-count']), int(r.headers['x-embedding-dim'])
+  assert 'x-embedding-scales' not in r.headers and len(r.content) == n * 4 + n * dim
+  scales = np.frombuffer(r.content[:n * 4], dtype='<f4')
+  rows = np.frombuffer(r.content[n * 4:], dtype=np.int8).reshape(n, dim)
+  js = client.post('/embed/batch', json={'texts': texts, 'dtype': 'int8'}).json()
+  assert np.allclose(scales, js['scales']) and np.array_equal(rows, np.array(js['embeddings']))
+
+def test_metrics_exposition():
+  client.get('/roadmap', params={'career': 'Data Scientist'})
+  client.post('/embed', json={'text': 'metrics probe'})
+  r = client.get('/metrics')
+  assert r.status_code == 200 and r.headers['content-type'].startswith('text/plain; version=0.0.4')
+  text = r.text
+  assert 'prismiq_http_request_duration_seconds_count{method="GET",route="/roadmap",status="200"}' in text
+  assert 'prismiq_stage_duration_seconds_count{stage="embedding"}' in text
+  assert 'prismiq_stage_duration_seconds_count{stage="serialization"}' in text
+  assert 'prismiq_llm_answers_total{endpoint="roadmap",source="mock"}' in text
+  assert 'prismiq_cache_requests_total{cache="roadmap",result="hit"}' in text
+  samples = dict(line.rsplit(' ', 1) for line in text.splitlines() if line and not line.startswith('#'))
+  assert float(samples['prismiq_http_requests_in_flight']) >= 1  # at least the scrape itself
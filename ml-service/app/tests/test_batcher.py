@@ -0,0 +1,44 @@
+import asyncio
+from app.services.batcher import MicroBatcher
+
+def test_concurrent_submits_share_one_batch():
+  calls = []
+  def double(items):
+    calls.append(list(items))
+    return [i * 2 for i in items]
+
+  batcher = MicroBatcher(double, max_batch=8, max_wait_ms=20)
+
+  async def main():
+    return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+  assert asyncio.run(main()) == [0, 2, 4, 6, 8]
+  assert calls == [[0, 1, 2, 3, 4]]
+  snap = batcher.snapshot()
+  assert snap['batches'] == 1 and snap['items'] == 5 and snap['queue_depth'] == 0
+
+def test_max_batch_splits_and_errors_propagate():
+  def fail_on_three(items):
+    if 3 in items:
+      raise ValueError('boom')
+    return items
+
+  batcher = MicroBatcher(fail_on_three, max_batch=2, max_wait_ms=20)
+
+  async def main():
+    return await asyncio.gather(*(batcher.submit(i) for i in range(4)), return_exceptions=True)
+
+  results = asyncio.run(main())
+  assert results[:2] == [0, 1]
+  assert all(isinstance(r, ValueError) for r in results[2:])
+  assert batcher.snapshot()['errors'] == 1
+
+def test_short_result_fails_every_future():
+  batcher = MicroBatcher(lambda items: items[:-1], max_batch=4, max_wait_ms=20)
+
+  async def main():
+    return await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True), 2)
+
+  results = asyncio.run(main())
+  assert all(isinstance(r, RuntimeError) for r in results)
+  assert batcher.snapshot()['errors'] == 1
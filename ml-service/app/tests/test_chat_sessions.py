@@ -0,0 +1,83 @@
+import asyncio
+from app.api.chat import GeminiAdapter
+from app.services.chat_sessions import ChatSession, SessionStore, profile_context
+
+def test_window_is_token_bounded_with_summary():
+  s = ChatSession('u1', history_tokens=50, max_summary_tokens=30)
+  for i in range(200):
+    s.add('user', f'Question number {i}. With some more detail that is not needed.')
+  assert s.window_tokens <= 50 and s.summary_tokens <= 30
+  assert 'Question number 199' in s.history()
+  assert s.summary[-1].startswith('user: Question number') and 'detail' not in s.summary[-1]
+
+def test_prompt_size_stays_flat():
+  s = ChatSession('u1', history_tokens=200, max_summary_tokens=60)
+  gemini = GeminiAdapter()
+  sizes = []
+  for i in range(100):
+    s.add('user', f'Tell me about data careers, take {i}.')
+    s.add('assistant', 'Data careers include analyst, engineer and scientist roles. ' * 3)
+    sizes.append(len(gemini._build_prompt('next?', {'name': 'Ada'}, 'en', s.history())))
+  assert max(sizes[20:]) - min(sizes[20:]) < 200
+
+def test_profile_context_rendered_once():
+  a = profile_context({'name': 'Ada', 'interests': ['ml']})
+  assert profile_context({'interests': ['ml'], 'name': 'Ada'}) is a
+  assert profile_context({}) == ''
+
+def test_store_round_trips_through_backend():
+  class DictBackend:
+    def __init__(self):
+      self.data = {}
+    async def get(self, key):
+      return self.data.get(key)
+    async def set(self, key, value, ttl):
+      self.data[key] = value
+
+  backend = DictBackend()
+
+  async def main():
+    first = SessionStore(backend=backend)
+    s = await first.load(None, 'u1')
+    s.profile = {'name': 'Ada'}
+    s.add('user', 'hi')
+    await first.save(s)
+    # Another worker resumes the same conversation, but only for the id and user it was issued to
+    other = SessionStore(backend=backend)
+    return s.session_id, await other.load(s.session_id, 'u1'), await other.load(s.session_id, 'u2')
+
+  session_id, resumed, stranger = asyncio.run(main())
+  assert resumed.session_id == session_id
+  assert resumed.profile == {'name': 'Ada'} and [t.text for t in resumed.turns] == ['hi']
+  assert stranger.session_id != session_id and not stranger.turns
+
+def test_sessions_are_not_reachable_by_user_id_alone():
+  async def main():
+    store = SessionStore()
+    s = await store.load(None, 'u1')
+    s.add('user', 'private')
+    await store.save(s)
+    return s, await store.load('u1', 'u1'), await store.load(s.session_id, 'u2'), await store.load(s.session_id, 'u1')
+
+  s, by_user_id, other_user, owner = asyncio.run(main())
+  assert len(s.session_id) >= 32
+  assert not by_user_id.turns and not other_user.turns and owner is s
+
+def test_concurrent_turns_of_a_session_do_not_interleave():
+  store = SessionStore()
+
+  async def turn(session_id, i):
+    async with store.lock(session_id):
+      session = await store.load(session_id, 'u1')
+      session.add('user', f'q{i}')
+      await asyncio.sleep(0)  # the reply is awaited here
+      session.add('assistant', f'a{i}')
+      await store.save(session)
+
+  async def main():
+    session = await store.load(None, 'u1')
+    await asyncio.gather(*(turn(session.session_id, i) for i in range(5)))
+    return session
+
+  texts = [t.text for t in asyncio.run(main()).turns]
+  assert texts == [x for i in range(5) for x in (f'q{i}', f'a{i}')]
@@ -0,0 +1,84 @@
+import asyncio
+import time
+import pytest
+from app.services.circuit_breaker import CLOSED, OPEN, CircuitBreaker, CircuitOpenError
+from app.services.llm import LatencyBudgetExceeded, LLMGateway, latency_budget
+
+class Response:
+  def __init__(self, text):
+    self.text = text
+
+def test_trips_on_failure_rate_and_recovers_via_half_open_trial():
+  cb = CircuitBreaker('t', window=4, min_calls=4, failure_rate=0.5, open_seconds=0.01)
+  for ok in (True, False, True, False):
+    assert cb.allow()
+    cb.record(ok, 0.0)
+  assert cb.state == OPEN and not cb.allow()
+  time.sleep(0.02)
+  assert cb.allow()       # single trial call
+  assert not cb.allow()   # everyone else still short-circuits
+  cb.record(True, 0.0)
+  assert cb.state == CLOSED and cb.snapshot()['trips'] == 1
+
+def test_slow_calls_count_as_failures():
+  cb = CircuitBreaker('t', window=3, min_calls=3, failure_rate=0.6, slow_call_seconds=0.5)
+  for _ in range(3):
+    cb.record(True, 1.0)
+  assert cb.state == OPEN
+
+def test_background_probe_closes_breaker():
+  probes = []
+  async def probe():
+    probes.append(1)
+
+  async def main():
+    cb = CircuitBreaker('t', window=2, min_calls=2, open_seconds=0, probe=probe)
+    cb.record(False, 0.0)
+    cb.record(False, 0.0)
+    assert cb.state == OPEN
+    assert not cb.allow()   # starts the probe instead of sending real traffic
+    await cb._probe_task
+    return cb
+
+  cb = asyncio.run(main())
+  assert probes == [1] and cb.state == CLOSED and cb.allow()
+
+def test_gateway_short_circuits_when_open():
+  class DownModel:
+    calls = 0
+    async def generate_content_async(self, prompt, request_options=None):
+      DownModel.calls += 1
+      raise ConnectionError('down')
+
+  gw = LLMGateway(timeout=5.0, retries=0, backoff=0)
+  gw._model = DownModel()
+  gw.breaker = CircuitBreaker('gemini', window=2, min_calls=2, open_seconds=60)
+
+  async def main():
+    for _ in range(2):
+      with pytest.raises(ConnectionError):
+        await gw.generate('hi')
+    with pytest.raises(CircuitOpenError):
+      await gw.generate('hi')
+
+  asyncio.run(main())
+  assert DownModel.calls == 2 and gw.stats()['breaker']['short_circuited'] == 1
+
+def test_latency_budget_cuts_off_slow_upstream():
+  class SlowModel:
+    async def generate_content_async(self, prompt, request_options=None):
+      await asyncio.sleep(1)
+      return Response(prompt)
+
+  gw = LLMGateway(timeout=5.0, retries=2, backoff=0)
+  gw._model = SlowModel()
+
+  async def main():
+    with latency_budget(0.05):
+      await gw.generate('hi')
+
+  start = time.monotonic()
+  with pytest.raises(LatencyBudgetExceeded):
+    asyncio.run(main())
+  assert time.monotonic() - start < 0.5
+  assert gw.stats()['calls'] == 1  # no retries once the budget is spent
@@ -0,0 +1,24 @@
+import numpy as np
+from app.services.embedding_cache import EmbeddingCache, cache_key
+
+def test_key_normalizes_whitespace_and_includes_model():
+  assert cache_key('m', ' hello   world\n') == cache_key('m', 'hello world')
+  assert cache_key('m', 'hello world') != cache_key('other', 'hello world')
+
+def test_lru_evicts_by_bytes():
+  cache = EmbeddingCache('m', 4, max_bytes=32)  # room for two 4-d float32 vectors
+  cache.put('a', np.ones(4))
+  cache.put('b', np.ones(4) * 2)
+  assert cache.get('a') is not None  # 'a' becomes most recent
+  cache.put('c', np.ones(4) * 3)
+  assert cache.get('b') is None
+  stats = cache.stats()
+  assert stats['bytes'] <= 32 and stats['evictions'] == 1
+  assert stats['hits'] == 1 and stats['misses'] == 1
+
+def test_disk_tier_survives_restart(tmp_path):
+  cache = EmbeddingCache('m', 4, max_bytes=1024, disk_dir=str(tmp_path), disk_max_bytes=1024)
+  cache.put('persist me', np.arange(4))
+  reopened = EmbeddingCache('m', 4, max_bytes=1024, disk_dir=str(tmp_path), disk_max_bytes=1024)
+  np.testing.assert_array_equal(reopened.get('persist me'), np.arange(4, dtype=np.float32))
+  assert reopened.stats()['disk_hits'] == 1
@@ -0,0 +1,34 @@
+import json
+from fastapi.testclient import TestClient
+from benchmarks.fake_gemini import FakeConfig, create_app
+from benchmarks.loadgen import parse_mix, percentile
+
+def _client(**kw):
+  return TestClient(create_app(FakeConfig(latency_ms=0, jitter=0, tokens_per_second=0, seed=1, **kw)))
+
+def _body(prompt):
+  return {'contents': [{'role': 'user', 'parts': [{'text': prompt}]}]}
+
+def test_generate_content_matches_adapter_prompts():
+  client = _client()
+  r = client.post('/v1beta/models/gemini-pro:generateContent', json=_body('Create a detailed learning roadmap for becoming a Data Scientist. More'))
+  text = r.json()['candidates'][0]['content']['parts'][0]['text']
+  assert json.loads(text)['career'] == 'Data Scientist'
+  r = client.post('/v1beta/models/gemini-pro:countTokens', json=_body('one two three'))
+  assert r.json() == {'totalTokens': 3}
+
+def test_stream_is_a_json_array_of_chunks():
+  client = _client(chunk_tokens=4)
+  r = client.post('/v1beta/models/gemini-pro:streamGenerateContent', json=_body('hello there'))
+  chunks = json.loads(r.text)
+  assert len(chunks) > 1 and chunks[-1]['candidates'][0]['finishReason'] == 'STOP'
+  assert all(len(c['candidates'][0]['content']['parts'][0]['text'].split()) <= 4 for c in chunks)
+
+def test_injected_errors_use_google_error_shape():
+  r = _client(error_rate=1.0).post('/v1beta/models/gemini-pro:generateContent', json=_body('hi'))
+  assert r.status_code == 503 and r.json()['error']['status'] == 'UNAVAILABLE'
+
+def test_loadgen_helpers():
+  assert parse_mix('chat=3,embed') == {'chat': 3.0, 'embed': 1.0}
+  values = [i / 100 for i in range(1, 101)]
+  assert (percentile(values, 50), percentile(values, 99)) == (0.5, 0.99)
@@ -0,0 +1,54 @@
+import json
+import random
+import pytest
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from app.services.json_extract import JSONExtractionError, JSONObjectScanner, extract_json, parse_object
+
+class Item(BaseModel):
+  model_config = ConfigDict(extra='allow')
+  title: str
+
+class Out(BaseModel):
+  model_config = ConfigDict(extra='allow')
+  items: List[Item] = Field(min_length=1)
+  note: Optional[str] = None
+
+DOC = {'items': [{'title': 'A {b}', 'tags': ['x', 'y']}, {'title': 'C "quoted" \\ d'}], 'note': 'ok'}
+
+def test_skips_prose_fences_and_trailing_braces():
+  text = 'Here you go:\n```json\n' + json.dumps(DOC, indent=2) + '\n```\nUse {curly} braces wisely }'
+  assert extract_json(text, Out) == (DOC, True)
+
+def test_completion_detected_across_any_chunking():
+  text = 'prefix ' + json.dumps(DOC) + ' trailing {"x": 1}'
+  rng = random.Random(0)
+  for _ in range(50):
+    scanner, pos, done_at = JSONObjectScanner(), 0, None
+    while pos < len(text):
+      step = rng.randint(1, 7)
+      if scanner.feed(text[pos:pos + step]) and done_at is None:
+        done_at = pos + step
+      pos += step
+    assert scanner.text() == json.dumps(DOC)
+    assert done_at is not None and done_at >= text.index(json.dumps(DOC)) + len(json.dumps(DOC))
+
+def test_truncated_object_keeps_only_fully_received_items():
+  full = json.dumps(DOC)
+  first_item_end = full.index(']}') + 2
+  for cut in range(first_item_end, full.index('"note"')):
+    scanner = JSONObjectScanner()
+    scanner.feed(full[:cut])
+    result, complete = parse_object(scanner, Out)
+    assert not complete
+    assert result['items'][0] == DOC['items'][0]
+    assert len(result['items']) == 1 or result['items'][1] == DOC['items'][1]
+
+def test_items_failing_validation_are_dropped():
+  assert extract_json('{"items": [{"title": "A"}, {"name": "no title"}]}', Out).data['items'] == [{'title': 'A'}]
+
+def test_no_usable_object_raises():
+  with pytest.raises(JSONExtractionError):
+    extract_json('no json here', Out)
+  with pytest.raises(JSONExtractionError):
+    extract_json('{"items": [{"tit', Out)
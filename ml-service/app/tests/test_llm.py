@@ -0,0 +1,132 @@
+import asyncio
+import pytest
+from typing import List
+from pydantic import BaseModel, ConfigDict
+from app.services.json_extract import JSONExtractionError
+from app.services.llm import LLMGateway
+
+class ServiceUnavailable(Exception):
+  pass
+
+class FakeModel:
+  def __init__(self, failures):
+    self.failures = failures
+    self.calls = 0
+
+  async def generate_content_async(self, prompt, request_options=None):
+    self.calls += 1
+    assert request_options == {'timeout': 5.0, 'retry': None}  # the gateway owns retries
+    if self.calls <= self.failures:
+      raise ServiceUnavailable('try again')
+    return type('Response', (), {'text': f'echo: {prompt}'})()
+
+def _gateway(model, retries):
+  gw = LLMGateway(max_concurrency=2, timeout=5.0, retries=retries, backoff=0)
+  gw._model = model
+  return gw
+
+def test_retries_transient_errors_then_succeeds():
+  gw = _gateway(FakeModel(failures=2), retries=2)
+  assert asyncio.run(gw.generate('hi')) == 'echo: hi'
+  assert gw.stats()['retried'] == 2 and gw.stats()['in_flight'] == 0
+
+def test_gives_up_after_last_retry():
+  gw = _gateway(FakeModel(failures=5), retries=1)
+  with pytest.raises(ServiceUnavailable):
+    asyncio.run(gw.generate('hi'))
+  assert gw.stats()['calls'] == 2 and gw.stats()['failures'] == 1
+
+def test_concurrency_is_capped():
+  peak = 0
+  class SlowModel:
+    active = 0
+    async def generate_content_async(self, prompt, request_options=None):
+      nonlocal peak
+      SlowModel.active += 1
+      peak = max(peak, SlowModel.active)
+      await asyncio.sleep(0.01)
+      SlowModel.active -= 1
+      return type('Response', (), {'text': prompt})()
+
+  gw = _gateway(SlowModel(), retries=0)
+
+  async def main():
+    return await asyncio.gather(*(gw.generate(str(i)) for i in range(10)))
+
+  assert asyncio.run(main()) == [str(i) for i in range(10)]
+  assert peak == 2
+
+def test_closing_stream_early_cancels_upstream():
+  class Upstream:
+    cancelled = False
+    def cancel(self):
+      Upstream.cancelled = True
+
+  class StreamingResponse:
+    _iterator = Upstream()
+    def __aiter__(self):
+      return self._chunks()
+    async def _chunks(self):
+      for word in ['a', 'b', 'c']:
+        yield type('Chunk', (), {'text': word})()
+
+  class StreamingModel:
+    async def generate_content_async(self, prompt, stream=False, request_options=None):
+      assert stream
+      return StreamingResponse()
+
+  gw = _gateway(StreamingModel(), retries=0)
+
+  async def main():
+    chunks = gw.stream('hi')
+    first = await chunks.__anext__()
+    await chunks.aclose()  # consumer went away
+    return first
+
+  assert asyncio.run(main()) == 'a'
+  assert Upstream.cancelled and gw.stats()['in_flight'] == 0
+
+class Out(BaseModel):
+  model_config = ConfigDict(extra='allow')
+  items: List[int]
+
+def _json_stream_model(pieces, sent):
+  class Upstream:
+    cancelled = False
+    def cancel(self):
+      Upstream.cancelled = True
+
+  class StreamingResponse:
+    _iterator = Upstream()
+    def __aiter__(self):
+      return self._chunks()
+    async def _chunks(self):
+      for piece in pieces:
+        sent.append(piece)
+        yield type('Chunk', (), {'text': piece})()
+
+  class StreamingModel:
+    async def generate_content_async(self, prompt, stream=False, request_options=None):
+      assert stream and request_options == {'timeout': 5.0, 'retry': None}
+      return StreamingResponse()
+
+  return StreamingModel(), Upstream
+
+def test_generate_json_stops_once_object_closes():
+  sent = []
+  model, upstream = _json_stream_model(['Sure:\n```json\n{"items": [1,', ' 2]', '}\n```', ' Anything else?', ' More prose.'], sent)
+  gw = _gateway(model, retries=0)
+  assert asyncio.run(gw.generate_json('hi', Out)) == ({'items': [1, 2]}, True)
+  assert len(sent) == 3 and upstream.cancelled and gw.stats()['in_flight'] == 0
+
+def test_generate_json_recovers_truncated_object():
+  model, _ = _json_stream_model(['{"items": [1, 2, 3', '4'], [])
+  gw = _gateway(model, retries=0)
+  assert asyncio.run(gw.generate_json('hi', Out)) == ({'items': [1, 2]}, False)
+
+def test_generate_json_without_object_raises_and_keeps_breaker_closed():
+  model, _ = _json_stream_model(['I cannot help with that.'], [])
+  gw = _gateway(model, retries=0)
+  with pytest.raises(JSONExtractionError):
+    asyncio.run(gw.generate_json('hi', Out))
+  assert gw.stats()['failures'] == 0
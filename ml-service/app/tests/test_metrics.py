@@ -0,0 +1,33 @@
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.metrics import Registry, fallback_reason
+
+def test_histogram_buckets_are_cumulative():
+  reg = Registry()
+  h = reg.histogram('t_seconds', 'test', ('stage',), buckets=(0.1, 1))
+  for v in (0.05, 0.5, 0.5, 5):
+    h.observe(v, 'llm')
+  lines = reg.render().splitlines()
+  assert lines[:2] == ['# HELP t_seconds test', '# TYPE t_seconds histogram']
+  assert 't_seconds_bucket{stage="llm",le="0.1"} 1' in lines
+  assert 't_seconds_bucket{stage="llm",le="1.0"} 3' in lines
+  assert 't_seconds_bucket{stage="llm",le="+Inf"} 4' in lines
+  assert 't_seconds_count{stage="llm"} 4' in lines and 't_seconds_sum{stage="llm"} 6.05' in lines
+
+def test_counters_gauges_and_collectors():
+  reg = Registry()
+  c = reg.counter('answers_total', 'test', ('source',))
+  c.inc('gemini')
+  c.inc('mock', amount=2)
+  g = reg.gauge('in_flight', 'test')
+  with g.track():
+    assert g.value() == 1
+  reg.register_collector(lambda: [('hits_total', 'counter', 'test', ('cache',), [(('a"b',), 3)])])
+  text = reg.render()
+  assert 'answers_total{source="gemini"} 1.0' in text and 'answers_total{source="mock"} 2.0' in text
+  assert '# TYPE in_flight gauge' in text and 'in_flight 0.0' in text
+  assert 'hits_total{cache="a\\"b"} 3.0' in text
+
+def test_fallback_reasons():
+  assert fallback_reason(CircuitOpenError()) == 'circuit_open'
+  assert fallback_reason(TimeoutError()) == 'timeout'
+  assert fallback_reason(ValueError()) == 'error'
@@ -0,0 +1,89 @@
+import json
+import numpy as np
+from app.services import recommender
+from app.services.catalog import CatalogManager
+
+CAREERS = [
+  {"title": "Data Scientist", "description": "Analyze data and build predictive models", "skills": ["python", "ml", "sql"]},
+  {"title": "Data Analyst", "description": "BI dashboards and insights", "skills": ["sql", "excel", "tableau"]},
+]
+
+def _write(path, careers):
+  path.write_text(json.dumps(careers))
+
+def test_precomputed_matrix_is_memory_mapped(tmp_path):
+  data = tmp_path / 'careers.json'
+  _write(data, CAREERS)
+  meta = CatalogManager(data).build_embeddings_file()
+  assert meta['count'] == 2
+  snap = CatalogManager(data).snapshot()
+  assert isinstance(snap.emb, np.memmap)
+  assert snap.index.vectors is snap.emb  # no per-worker normalized copy
+
+def test_stale_matrix_is_ignored(tmp_path):
+  data = tmp_path / 'careers.json'
+  _write(data, CAREERS)
+  manager = CatalogManager(data)
+  manager.build_embeddings_file()
+  _write(data, CAREERS[:1])
+  snap = CatalogManager(data).snapshot()
+  assert not isinstance(snap.emb, np.memmap) and len(snap.data) == 1
+
+def test_reload_embeds_only_changed_entries(tmp_path):
+  data = tmp_path / 'careers.json'
+  _write(data, CAREERS)
+  manager = CatalogManager(data)
+  first = manager.snapshot()
+  _write(data, CAREERS + [{"title": "Data Engineer", "description": "Build data pipelines", "skills": ["spark"]}])
+  stats = manager.reload(force=True)
+  assert stats['embedded'] == 1 and stats['reused'] == 2
+  second = manager.snapshot()
+  assert second.version == first.version + 1 and len(first.data) == 2  # old snapshot untouched
+  np.testing.assert_array_equal(second.emb[:2], first.emb)
+
+def test_compressed_index_reranks_from_mapped_rows_after_reload(tmp_path, monkeypatch):
+  monkeypatch.setenv('CAREER_INDEX', 'int8')
+  data = tmp_path / 'careers.json'
+  _write(data, CAREERS)
+  manager = CatalogManager(data)
+  manager.snapshot()
+  _write(data, CAREERS[:1])
+  manager.reload(force=True)
+  snap = manager.snapshot()
+  assert isinstance(snap.emb, np.memmap) and snap.index.vectors is snap.emb
+  assert snap.index.nbytes == snap.index.compact_nbytes  # float rows live in the page cache
+  assert list(tmp_path.iterdir()) == [data]  # the backing file is unlinked once mapped
+
+def test_recommend_careers_uses_catalog():
+  recs = recommender.recommend_careers({'summary': 'python machine learning sql'})
+  assert recs[0]['career'] == 'Data Scientist'
+
+def test_exact_and_ivf_indexes_agree_with_brute_force():
+  from app.services.vector_index import ExactIndex, IVFIndex
+  rng = np.random.default_rng(1)
+  mat = rng.normal(size=(2000, 32)).astype(np.float32)
+  q = rng.normal(size=32).astype(np.float32)
+  unit = mat / np.linalg.norm(mat, axis=1, keepdims=True)
+  expected = np.argsort(-(unit @ (q / np.linalg.norm(q))))[:10]
+  idx, scores = ExactIndex(mat).search(q, 10)
+  assert list(idx) == list(expected)
+  assert np.all(np.diff(scores) <= 0)
+  ivf = IVFIndex(mat, n_lists=16, n_probe=4)
+  assert list(ivf.search(q, 10, n_probe=16)[0]) == list(expected)  # probing every list is exact
+
+def test_compressed_indexes_rerank_with_float_scores():
+  from app.services.vector_index import CompressedIndex, ExactIndex, build_index
+  rng = np.random.default_rng(2)
+  mat = rng.normal(size=(3000, 48)).astype(np.float32)
+  q = rng.normal(size=48).astype(np.float32)
+  exact_ids, exact_scores = ExactIndex(mat).search(q, 5)
+  int8 = build_index(mat, 'int8')
+  assert isinstance(int8, CompressedIndex) and int8.compact_nbytes < mat.nbytes / 3
+  assert int8.nbytes == int8.compact_nbytes + mat.nbytes  # heap float rows are counted
+  ids, scores = int8.search(q, 5)
+  assert list(ids) == list(exact_ids)
+  np.testing.assert_allclose(scores, exact_scores, rtol=1e-5)  # returned scores are the float ones
+  pca = CompressedIndex(mat, dims=48, int8=False)
+  assert list(pca.search(q, 5, rerank=len(mat))[0]) == list(exact_ids)  # re-ranking every row is exact
+  small = CompressedIndex(mat, dims=8)
+  assert small.codes.shape == (3000, 8) and small.codes.dtype == np.int8
@@ -0,0 +1,77 @@
+import asyncio
+import pytest
+from app.services.response_cache import ResponseCache, Uncached
+
+def test_identical_concurrent_requests_make_one_call():
+  cache = ResponseCache(max_entries=8, ttl=60)
+  calls = 0
+
+  async def compute():
+    nonlocal calls
+    calls += 1
+    await asyncio.sleep(0.01)
+    return {'career': 'Data Scientist'}
+
+  async def main():
+    results = await asyncio.gather(*(cache.get_or_compute('roadmap', 'prompt  for\nData Scientist', compute) for _ in range(10)))
+    again = await cache.get_or_compute('roadmap', 'prompt for Data Scientist', compute)  # whitespace-normalized hit
+    return results, again
+
+  results, again = asyncio.run(main())
+  assert calls == 1
+  assert all(r == {'career': 'Data Scientist'} for r in results) and again == results[0]
+  stats = cache.stats()
+  assert stats['misses'] == 1 and stats['coalesced'] == 9 and stats['hits'] == 1
+
+def test_errors_are_not_cached_and_ttl_expires():
+  cache = ResponseCache(max_entries=8, ttl=0)
+  attempts = []
+
+  async def flaky():
+    attempts.append(1)
+    if len(attempts) == 1:
+      raise ValueError('no JSON')
+    return 'ok'
+
+  async def main():
+    with pytest.raises(ValueError):
+      await cache.get_or_compute('recommend', 'p', flaky)
+    assert await cache.get_or_compute('recommend', 'p', flaky) == 'ok'
+    assert await cache.get_or_compute('recommend', 'p', flaky) == 'ok'  # ttl=0: already expired
+
+  asyncio.run(main())
+  assert len(attempts) == 3
+
+def test_uncached_values_reach_only_their_caller():
+  cache = ResponseCache(max_entries=8, ttl=60)
+  calls = 0
+
+  async def compute():
+    nonlocal calls
+    calls += 1
+    await asyncio.sleep(0.01)
+    return Uncached({'phases': ['one']}) if calls == 1 else {'phases': ['one', 'two']}
+
+  async def main():
+    return await asyncio.gather(*(cache.get_or_compute('roadmap', 'p', compute) for _ in range(3)))
+
+  partial, *rest = asyncio.run(main())
+  assert partial == {'phases': ['one']}
+  # Followers computed again instead of taking the partial answer, which was not stored
+  assert rest == [{'phases': ['one', 'two']}] * 2 and calls == 2
+  assert asyncio.run(cache.get_or_compute('roadmap', 'p', compute)) == {'phases': ['one', 'two']} and calls == 2
+
+def test_callers_get_independent_copies():
+  cache = ResponseCache(max_entries=8, ttl=60)
+
+  async def compute():
+    await asyncio.sleep(0.01)
+    return {'phases': [{'title': 'Foundation'}]}
+
+  async def main():
+    first, follower = await asyncio.gather(*(cache.get_or_compute('roadmap', 'p', compute) for _ in range(2)))
+    first['phases'].clear()
+    follower['phases'][0]['title'] = 'changed'
+    return await cache.get_or_compute('roadmap', 'p', compute)
+
+  assert asyncio.run(main()) == {'phases': [{'title': 'Foundation'}]}
@@ -0,0 +1,54 @@
+import asyncio
+import json
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from app.services import resume_batch
+from app.services.resume_batch import iter_lines, process_stream
+
+async def _chunks(parts):
+  for p in parts:
+    yield p
+
+def _lines(parts, max_line_bytes):
+  async def main():
+    return [line async for line in iter_lines(_chunks(parts), max_line_bytes)]
+  return asyncio.run(main())
+
+def test_lines_split_across_chunks():
+  assert _lines([b'{"a"', b':1}\n\n{"b":2', b'}\r\n', b'{"c":3}'], 64) == [
+    (0, b'{"a":1}'), (1, b'{"b":2}\r'), (2, b'{"c":3}')]
+
+def test_oversized_line_is_dropped_not_buffered():
+  assert _lines([b'short\n', b'x' * 10, b'x' * 10, b'\nok\n'], 16) == [(0, b'short'), (1, None), (2, b'ok')]
+
+class _DeadPool(Executor):
+  """Behaves like a ProcessPoolExecutor whose worker was killed after the first task was queued"""
+  def __init__(self):
+    self.submitted = 0
+
+  def submit(self, fn, *args):
+    self.submitted += 1
+    if self.submitted > 1:
+      raise BrokenProcessPool('A child process terminated abruptly')
+    fut = Future()
+    fut.set_exception(BrokenProcessPool('A child process terminated abruptly'))
+    return fut
+
+def test_dead_worker_fails_its_lines_and_the_pool_is_replaced(monkeypatch):
+  dead = _DeadPool()
+  monkeypatch.setattr(resume_batch, 'ProcessPoolExecutor', lambda max_workers, **kw: ThreadPoolExecutor(max_workers))
+  monkeypatch.setattr(resume_batch, 'CHUNK_LINES', 2)
+  monkeypatch.setattr(resume_batch, '_pool', dead)
+  body = b''.join(json.dumps({'resume_text': f'python {i}', 'user_id': f'u{i}'}).encode() + b'\n' for i in range(5))
+
+  async def main():
+    return b''.join([out async for out in process_stream(_chunks([body]))])
+
+  try:
+    records = [json.loads(line) for line in asyncio.run(main()).splitlines()]
+    assert [r['index'] for r in records] == [0, 1, 2, 3, 4]
+    assert all('died' in r['error'] for r in records[:2])
+    assert all(r['skills'] == ['Python'] for r in records[2:])
+    assert resume_batch.resume_pool() is not dead
+  finally:
+    resume_batch.shutdown_pool()
@@ -0,0 +1,29 @@
+import json
+from app.services.roadmap_generator import generate_roadmap
+from app.services.roadmap_templates import roadmap_templates
+
+def test_keyword_index_priority():
+  t = roadmap_templates()
+  assert t.match('Senior Data Developer') == 'software'
+  assert t.match('Business Analyst') == 'data'
+  assert t.match('Nurse') == 'generic'
+
+def test_plural_titles_match_like_singular():
+  t = roadmap_templates()
+  assert t.match('Web Developers') == t.match('Developers') == 'software'
+  assert t.match('Analysts') == t.match('Business Analysts') == 'data'
+  assert t.match('Software Engineers') == 'software'
+
+def test_response_body_is_cached_and_matches_dict():
+  t = roadmap_templates()
+  body = t.response_body('Data Scientist')
+  assert t.response_body('Data Scientist') is body
+  roadmap = t.roadmap('Data Scientist')
+  assert json.loads(body) == {'roadmap': roadmap, 'phases': roadmap['phases']}
+  roadmap['phases'].clear()  # callers get their own copy
+  assert json.loads(t.response_body('Data Scientist'))['phases']
+
+def test_generator_precomputes_courses():
+  phases = generate_roadmap('Data Scientist')
+  assert phases[0]['phase'] == 'Data Scientist: Foundations'
+  assert phases[0]['courses'] == ['Automate the Boring Stuff', 'Khan Academy Stats']
@@ -0,0 +1,69 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+import pytest
+from app.services.warmup import PRELOAD_STEPS, WarmupState
+
+def test_preloaded_steps_are_not_repeated(monkeypatch):
+  calls = []
+  monkeypatch.setattr('app.services.warmup.STEPS', [(n, lambda n=n: calls.append(n)) for n in ('embedding_model', 'embedding_first_call', 'career_catalog')])
+  state = WarmupState()
+  state.run(only=PRELOAD_STEPS)
+  assert calls == ['embedding_model', 'career_catalog'] and state.finished_at is None
+  state.run()
+  assert calls == ['embedding_model', 'career_catalog', 'embedding_first_call'] and state.finished_at is not None
+
+def _free_port():
+  with socket.socket() as s:
+    s.bind(('127.0.0.1', 0))
+    return s.getsockname()[1]
+
+def _admin(port, path, method='GET'):
+  return urllib.request.Request(f'http://127.0.0.1:{port}/admin/{path}', method=method, headers={'X-Admin-Token': 'secret'})
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/smaps_rollup') or not hasattr(os, 'fork'), reason='needs Linux /proc')
+def test_prefork_workers_share_memory_and_report_it():
+  port = _free_port()
+  env = {**os.environ, 'EMBED_BACKEND': 'hashing', 'STARTUP_MODE': 'eager', 'ADMIN_TOKEN': 'secret'}
+  proc = subprocess.Popen([sys.executable, '-m', 'app.serve', '--port', str(port), '--workers', '2', '--log-level', 'warning'],
+                          env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+  try:
+    deadline = time.monotonic() + 60
+    while True:
+      try:
+        with urllib.request.urlopen(_admin(port, 'workers'), timeout=2) as r:
+          report = json.load(r)
+        if len(report['processes']) == 3:
+          break
+      except OSError:
+        pass
+      assert time.monotonic() < deadline, 'server did not start'
+      time.sleep(0.2)
+    roles = sorted(p['role'] for p in report['processes'])
+    assert roles == ['master', 'worker', 'worker']
+    assert report['processes'][0]['pid'] == proc.pid
+    # Pages loaded before the fork are shared, so the group costs less than the sum of its RSS
+    assert report['total_pss_bytes'] < report['total_rss_bytes']
+
+    # A reload goes through the master: every worker is replaced by one serving the new version
+    old_workers = {p['pid'] for p in report['processes'] if p['role'] == 'worker'}
+    with urllib.request.urlopen(_admin(port, 'catalog/reload', 'POST'), timeout=5) as r:
+      assert json.load(r) == {'scheduled': True, 'master': proc.pid}
+    while True:
+      with urllib.request.urlopen(_admin(port, 'workers'), timeout=5) as r:
+        workers = {p['pid'] for p in json.load(r)['processes'] if p['role'] == 'worker'}
+      if len(workers) == 2 and not workers & old_workers:
+        break
+      assert time.monotonic() < deadline, 'workers were not replaced'
+      time.sleep(0.2)
+    for _ in range(4):
+      with urllib.request.urlopen(_admin(port, 'catalog'), timeout=5) as r:
+        assert json.load(r)['version'] == 2
+  finally:
+    proc.send_signal(signal.SIGTERM)
+    assert proc.wait(timeout=30) == 0
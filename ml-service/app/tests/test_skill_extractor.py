@@ -0,0 +1,42 @@
+from app.api.process_resume import MockAdapter
+from app.services.skill_extractor import SkillExtractor, skill_extractor
+
+def test_whole_word_matches_only():
+  ex = SkillExtractor({'Java': ['java'], 'JavaScript': ['javascript', 'js'], 'Git': ['git']})
+  assert ex.skills('Digital marketing, JavaScript and JS tooling') == ['JavaScript']
+  assert ex.skills('Java 17, git') == ['Java', 'Git']
+
+def test_aliases_positions_and_longest_match():
+  ex = SkillExtractor({'Node.js': ['node', 'node.js'], 'C': ['c'], 'C++': ['c++', 'cpp'], 'Machine Learning': ['machine learning', 'ml']})
+  text = 'Node.js and C++ / C, machine\nlearning (ML)'
+  found = ex.extract(text)
+  assert [m.skill for m in found] == ['Node.js', 'C++', 'C', 'Machine Learning', 'Machine Learning']
+  assert all(text[m.start:m.end] == m.text for m in found)
+
+def test_default_taxonomy_in_mock_adapter():
+  analysis = MockAdapter().process_resume('Python developer with Docker, K8s and digital design work', 'u1')
+  assert analysis['skills'] == ['Python', 'Docker', 'Kubernetes']
+  assert 'Git' not in skill_extractor().skills('digital')
+
+def test_scanner_matches_across_chunk_boundaries():
+  ex = skill_extractor()
+  text = ('Node.js, C++ and machine \n\n learning; javascript/digital git. ' * 40) + 'Power   BI'
+  for size in (1, 3, 7, 64):
+    scanner = ex.scanner()
+    found = []
+    for i in range(0, len(text), size):
+      found += scanner.feed(text[i:i + size])
+    found += scanner.close()
+    assert found == ex.extract(text)
+    assert len(scanner._buf) < 100
+
+def test_only_listed_aliases_match():
+  ex = skill_extractor()
+  assert ex.skills('In spring 2021 I will go to the office and express my swift ideas about rust. Section C of the R&D report.') == []
+  assert ex.skills('Spring Boot, golang, Express.js, RStudio') == ['Spring', 'Go', 'Express', 'R']
+
+def test_match_maps_to_skill_without_relookup():
+  ex = skill_extractor()
+  # IGNORECASE matches 'ſ' as 's' and 'ı' as 'i', which lower()/casefold() do not both undo
+  assert ex.skills('I know ſql and lınux') == ['SQL', 'Linux']
+  assert [m.skill for m in ex.extract('GitHub  Actions, github')] == ['CI/CD', 'Git']
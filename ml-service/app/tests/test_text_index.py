@@ -0,0 +1,20 @@
+from app.agents.langchain_agent import career_search, chat_reply, course_lookup
+from app.services.text_index import InvertedIndex, tokenize
+
+def test_tokenize_drops_stopwords_and_plurals():
+  assert tokenize('I want to work with Pipelines in C++') == ['work', 'pipeline', 'c++']
+
+def test_ranked_multi_term_lookup():
+  docs = [{'title': ['Data Engineer'], 'skills': ['spark', 'sql']},
+          {'title': ['Data Analyst'], 'skills': ['sql', 'excel']},
+          {'title': ['Nurse'], 'skills': ['care']}]
+  index = InvertedIndex(docs, {'title': 3.0, 'skills': 2.0})
+  assert [i for i, _ in index.search('which job uses spark and sql?', 3)] == [0, 1]
+  assert index.search('astronaut') == []
+
+def test_agent_tools_match_sentences():
+  hits = career_search('I love python and machine learning, what should I study?')
+  assert hits and hits[0]['title'] == 'Data Scientist'
+  assert course_lookup('mlops') == ['MLOps Basics']
+  reply, sources = chat_reply('Which careers use pytorch?')
+  assert 'ML Engineer' in reply and sources
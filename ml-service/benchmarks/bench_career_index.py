@@ -0,0 +1,69 @@
+"""Lookup latency of the chat agent's inverted index against the old linear scan.
+
+Run from ml-service/: python -m benchmarks.bench_career_index [--careers 100000]
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+import numpy as np
+from app.agents.langchain_agent import AgentIndex
+
+_ROLES = "engineer analyst scientist developer manager designer consultant specialist architect researcher".split()
+_SKILLS = ("python sql java javascript react docker kubernetes aws azure spark airflow tableau excel pandas "
+           "pytorch tensorflow mlops statistics figma linux security networking terraform go rust").split()
+
+def _zipf_choice(rng: random.Random, items: list[str]) -> str:
+    # Skill popularity is long-tailed: a few skills appear in many careers, most in few
+    return items[min(int(rng.paretovariate(1.0)) - 1, len(items) - 1)]
+
+def synthetic_careers(n: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    vocab = [f"domain{i}" for i in range(2000)]
+    skill_pool = _SKILLS + [f"skill{i}" for i in range(2000)]
+    careers = []
+    for i in range(n):
+        skills = list(dict.fromkeys(_zipf_choice(rng, skill_pool) for _ in range(4))) + [rng.choice(vocab)]
+        careers.append({
+            'title': f"{rng.choice(vocab).title()} {rng.choice(_ROLES).title()} {i}",
+            'description': ' '.join(rng.sample(vocab, 6)),
+            'skills': skills,
+            'courses': [f"{skills[0]} course {i % 5000}"],
+        })
+    return careers
+
+def linear_search(careers: list[dict], query: str) -> list[dict]:
+    """The previous career_search: the whole query as one substring."""
+    q = query.lower()
+    return [c for c in careers if q in c['title'].lower() or any(q in s for s in c['skills'])]
+
+def _latencies(fn, queries) -> np.ndarray:
+    out = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        out.append((time.perf_counter() - start) * 1000.0)
+    return np.array(out)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument('--careers', type=int, default=100_000)
+    ap.add_argument('--queries', type=int, default=500)
+    args = ap.parse_args()
+    careers = synthetic_careers(args.careers)
+    start = time.perf_counter()
+    index = AgentIndex(careers)
+    print(f"build: {time.perf_counter() - start:.2f}s for {len(index.careers)} careers, {len(index.courses)} courses")
+    rng = random.Random(1)
+    queries = [f"I want to become a {rng.choice(_ROLES)} who uses {rng.choice(_SKILLS)} and {rng.choice(_SKILLS)}"
+               for _ in range(args.queries)]
+    for name, fn in [
+        ('linear scan', lambda q: linear_search(careers, q)),
+        ('career_search', lambda q: index.search_careers(q, 5)),
+        ('course_lookup', lambda q: index.search_courses(q.split()[-1], 5)),
+    ]:
+        lat = _latencies(fn, queries[:50] if name == 'linear scan' else queries)
+        print(f"{name:<14} mean={lat.mean():8.3f} ms  p50={np.percentile(lat, 50):8.3f} ms  p99={np.percentile(lat, 99):8.3f} ms")
+
+if __name__ == '__main__':
+    main()
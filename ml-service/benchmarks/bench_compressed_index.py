@@ -0,0 +1,53 @@
+"""Memory saved vs recall lost for the compressed career indexes (int8, PCA, PCA + int8) against ExactIndex.
+
+Run from ml-service/: python -m benchmarks.bench_compressed_index [--n 100000] [--dim 384] [--pca 64 128]
+"""
+from __future__ import annotations
+import argparse
+import time
+import numpy as np
+from app.services.embeddings import memory_map
+from app.services.vector_index import CompressedIndex, ExactIndex
+from benchmarks.bench_vector_index import synthetic_catalog, _time_queries
+
+def run(n: int, dim: int, k: int, n_queries: int, pca_dims: list[int], reranks: list[int]) -> list[dict]:
+    mat = synthetic_catalog(n, dim)
+    queries = synthetic_catalog(n_queries, dim, seed=1)
+    exact = ExactIndex(mat)
+    truth, exact_ms = _time_queries(lambda q: exact.search(q, k)[0], queries)
+    float_bytes = exact.vectors.nbytes
+    rows = [{'index': 'exact float32', 'mb': float_bytes / 2**20, 'saved': 0.0, 'ms_per_query': exact_ms, 'recall': 1.0}]
+
+    def recall(results) -> float:
+        return float(np.mean([len(set(r) & set(t)) / k for r, t in zip(results, truth)]))
+
+    configs = [('int8', None, True)] + [(f'pca{d}', d, False) for d in pca_dims] + [(f'pca{d}+int8', d, True) for d in pca_dims]
+    for name, dims, int8 in configs:
+        start = time.perf_counter()
+        # Float rows memory-mapped as the catalog holds them, so nbytes is what stays on the heap
+        index = CompressedIndex(memory_map(exact.vectors), dims=dims, int8=int8)
+        build_s = time.perf_counter() - start
+        for rerank in reranks:
+            res, ms = _time_queries(lambda q: index.search(q, k, rerank=rerank)[0], queries)
+            rows.append({
+                'index': f'{name} rerank={rerank}', 'mb': index.nbytes / 2**20, 'saved': 1.0 - index.nbytes / float_bytes,
+                'ms_per_query': ms, 'recall': recall(res), 'build_s': build_s,
+            })
+    return rows
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument('--n', type=int, default=100_000)
+    ap.add_argument('--dim', type=int, default=384)
+    ap.add_argument('--k', type=int, default=3)
+    ap.add_argument('--queries', type=int, default=200)
+    ap.add_argument('--pca', type=int, nargs='+', default=[64, 128])
+    ap.add_argument('--rerank', type=int, nargs='+', default=[4, 16, 64])
+    args = ap.parse_args()
+    print(f"{'index':<24} {'resident':>10} {'saved':>7} {'latency':>14}  recall@{args.k}")
+    for row in run(args.n, args.dim, args.k, args.queries, args.pca, args.rerank):
+        extra = f"  build={row['build_s']:.2f}s" if 'build_s' in row else ''
+        print(f"{row['index']:<24} {row['mb']:7.1f} MB {row['saved']:6.1%} {row['ms_per_query']:8.3f} ms/q  {row['recall']:.3f}{extra}")
+
+if __name__ == '__main__':
+    main()
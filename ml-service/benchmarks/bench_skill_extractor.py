@@ -0,0 +1,73 @@
+"""Compare the per-skill substring scan with the compiled SkillExtractor on large resumes.
+
+Run from ml-service/: python -m benchmarks.bench_skill_extractor [--skills 5000] [--resume-kb 64]
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import time
+from app.services.skill_extractor import SKILLS_PATH, SkillExtractor
+
+_FILLER = ("led a team delivering digital products for enterprise clients and improved reporting "
+           "latency across regions while mentoring engineers on design reviews and code quality").split()
+
+def synthetic_taxonomy(n_skills: int, seed: int = 0) -> dict[str, list[str]]:
+    """The real taxonomy padded with generated skills (two aliases each) up to n_skills."""
+    with open(SKILLS_PATH, 'r', encoding='utf-8') as f:
+        taxonomy = json.load(f)
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    while len(taxonomy) < n_skills:
+        name = ''.join(rng.choice(letters) for _ in range(rng.randint(4, 10)))
+        taxonomy.setdefault(name.title(), [name, f'{name} framework'])
+    return taxonomy
+
+def synthetic_resume(taxonomy: dict[str, list[str]], size_kb: int, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    aliases = [a for aliases in taxonomy.values() for a in aliases]
+    words, size = [], 0
+    while size < size_kb * 1024:
+        word = rng.choice(aliases) if rng.random() < 0.05 else rng.choice(_FILLER)
+        words.append(word)
+        size += len(word) + 1
+    return ' '.join(words)
+
+def naive_skills(taxonomy: dict[str, list[str]], text: str) -> list[str]:
+    """The previous approach: one `alias in text` scan per alias."""
+    text_lower = text.lower()
+    return [skill for skill, aliases in taxonomy.items() if any(a in text_lower for a in [skill.lower(), *aliases])]
+
+def _time(fn, repeat: int) -> tuple[object, float]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) * 1000.0 / repeat
+
+def run(n_skills: int, resume_kb: int, repeat: int) -> list[dict]:
+    taxonomy = synthetic_taxonomy(n_skills)
+    resume = synthetic_resume(taxonomy, resume_kb)
+    start = time.perf_counter()
+    extractor = SkillExtractor(taxonomy)
+    compile_ms = (time.perf_counter() - start) * 1000.0
+    naive, naive_ms = _time(lambda: naive_skills(taxonomy, resume), repeat)
+    compiled, compiled_ms = _time(lambda: extractor.skills(resume), repeat)
+    return [
+        {'method': 'substring scan per alias', 'ms_per_resume': naive_ms, 'skills': len(naive)},
+        {'method': 'compiled extractor', 'ms_per_resume': compiled_ms, 'skills': len(compiled),
+         'compile_ms': compile_ms, 'mentions': len(extractor.extract(resume))},
+    ]
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument('--skills', type=int, default=5000)
+    ap.add_argument('--resume-kb', type=int, default=64)
+    ap.add_argument('--repeat', type=int, default=5)
+    args = ap.parse_args()
+    print(f"taxonomy={args.skills} skills  resume={args.resume_kb} KiB")
+    for row in run(args.skills, args.resume_kb, args.repeat):
+        extra = f"  compile={row['compile_ms']:.0f}ms  mentions={row['mentions']}" if 'compile_ms' in row else ''
+        print(f"{row['method']:<26} {row['ms_per_resume']:9.2f} ms/resume  skills={row['skills']}{extra}")
+
+if __name__ == '__main__':
+    main()
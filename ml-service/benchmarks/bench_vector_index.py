@@ -0,0 +1,58 @@
+"""Compare brute-force cosine search with ExactIndex and IVFIndex (recall@k and latency).
+
+Run from ml-service/: python -m benchmarks.bench_vector_index [--n 50000] [--dim 384]
+"""
+from __future__ import annotations
+import argparse
+import time
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+from app.services.vector_index import ExactIndex, IVFIndex
+
+def synthetic_catalog(n: int, dim: int, clusters: int = 64, seed: int = 0) -> np.ndarray:
+    """Clustered vectors, closer to real occupation embeddings than isotropic noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    mat = centers[rng.integers(0, clusters, size=n)] + 0.6 * rng.normal(size=(n, dim))
+    return mat.astype(np.float32)
+
+def _time_queries(fn, queries) -> tuple[list, float]:
+    start = time.perf_counter()
+    results = [fn(q) for q in queries]
+    return results, (time.perf_counter() - start) * 1000.0 / len(queries)
+
+def run(n: int, dim: int, k: int, n_queries: int, probes: list[int]) -> list[dict]:
+    mat = synthetic_catalog(n, dim)
+    queries = synthetic_catalog(n_queries, dim, seed=1)
+    truth, brute_ms = _time_queries(lambda q: cosine_similarity([q], mat)[0].argsort()[::-1][:k], queries)
+    rows = [{'index': 'brute (sklearn + argsort)', 'ms_per_query': brute_ms, 'recall': 1.0}]
+
+    def recall(results) -> float:
+        return float(np.mean([len(set(r) & set(t)) / k for r, t in zip(results, truth)]))
+
+    exact = ExactIndex(mat)
+    res, ms = _time_queries(lambda q: exact.search(q, k)[0], queries)
+    rows.append({'index': 'exact (argpartition)', 'ms_per_query': ms, 'recall': recall(res)})
+
+    start = time.perf_counter()
+    ivf = IVFIndex(mat)
+    build_s = time.perf_counter() - start
+    for p in probes:
+        res, ms = _time_queries(lambda q: ivf.search(q, k, n_probe=p)[0], queries)
+        rows.append({'index': f'ivf lists={ivf.n_lists} probe={p}', 'ms_per_query': ms, 'recall': recall(res), 'build_s': build_s})
+    return rows
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument('--n', type=int, default=50_000)
+    ap.add_argument('--dim', type=int, default=384)
+    ap.add_argument('--k', type=int, default=3)
+    ap.add_argument('--queries', type=int, default=200)
+    ap.add_argument('--probes', type=int, nargs='+', default=[1, 4, 8, 16, 32])
+    args = ap.parse_args()
+    for row in run(args.n, args.dim, args.k, args.queries, args.probes):
+        extra = f"  build={row['build_s']:.2f}s" if 'build_s' in row else ''
+        print(f"{row['index']:<32} {row['ms_per_query']:8.3f} ms/query  recall@{args.k}={row['recall']:.3f}{extra}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""Local stand-in for the Gemini REST API so the LLM paths can be load-tested without calling Google.
+
+Run from ml-service/:
+  python -m benchmarks.fake_gemini --port 8090 --latency-ms 800 --jitter 0.5 --error-rate 0.02 --tokens-per-second 80
+then point the service at it (the REST transport is required; gRPC cannot be redirected to plain HTTP):
+  GEMINI_API_KEY=fake GEMINI_TRANSPORT=rest GEMINI_API_ENDPOINT=http://127.0.0.1:8090 uvicorn app.main:app
+
+Implements generateContent, streamGenerateContent (a streamed JSON array, as the SDK's REST
+transport expects) and countTokens. Latency is log-normal around --latency-ms (time to first
+token) plus one token per 1/--tokens-per-second; --error-rate of the calls fail with
+--error-status. Replies are shaped after the prompt: recommendation, roadmap and resume prompts
+get the JSON those adapters parse, anything else a plain chat answer.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_STATUS_NAMES = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE", 504: "DEADLINE_EXCEEDED"}
+
+@dataclass
+class FakeConfig:
+    latency_ms: float = 800.0  # median time to first token
+    jitter: float = 0.5  # sigma of the log-normal around latency_ms; 0 = fixed latency
+    tokens_per_second: float = 80.0  # 0 = whole reply at once
+    chunk_tokens: int = 8  # tokens per streamed chunk
+    error_rate: float = 0.0
+    error_status: int = 503
+    seed: int | None = None
+    stats: Dict[str, int] = field(default_factory=lambda: {"generate": 0, "stream": 0, "count_tokens": 0, "errors": 0})
+
+    def __post_init__(self):
+        self.rng = random.Random(self.seed)
+
+    def first_token_delay(self) -> float:
+        return self.latency_ms / 1000.0 * math.exp(self.jitter * self.rng.gauss(0.0, 1.0))
+
+    def token_delay(self, tokens: int) -> float:
+        return tokens / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+def _reply_for(prompt: str, rng: random.Random) -> str:
+    lowered = prompt.lower()
+    if "recommend 5 career paths" in lowered:
+        titles = ["Data Scientist", "ML Engineer", "Backend Developer", "Product Analyst", "Cloud Architect"]
+        recs = [{
+            "title": t, "match_percentage": rng.randint(60, 95), "description": f"Work as a {t}",
+            "required_skills": ["Python", "SQL", "Communication"], "salary_range": "$70k-130k",
+            "growth_outlook": "High", "next_steps": ["Build projects", "Take a course"],
+        } for t in titles]
+        return "Here are your recommendations:\n```json\n" + json.dumps({"recommendations": recs}, indent=2) + "\n```"
+    if "learning roadmap" in lowered:
+        career = prompt.split("becoming a", 1)[-1].split(".", 1)[0].strip() or "Professional"
+        phases = [{
+            "phase": i + 1, "title": title, "duration": "2-3 months", "skills": ["skill a", "skill b"],
+            "projects": ["project a"], "resources": ["course a"],
+        } for i, title in enumerate(["Foundation", "Core", "Advanced"])]
+        return json.dumps({"career": career, "total_duration": "6-9 months", "phases": phases}, indent=2)
+    if "analyze this resume" in lowered:
+        return json.dumps({
+            "skills": ["Python", "SQL", "Docker"], "experience_years": rng.randint(0, 12), "education_level": "Bachelor's",
+            "key_strengths": ["Python"], "improvement_areas": ["Cloud"], "career_level": "mid",
+            "industries": ["Technology"], "score": rng.randint(50, 95),
+        }, indent=2)
+    words = ("Focus on building a portfolio of practical projects and keep learning the fundamentals. "
+             "Networking with people in the field and asking for feedback will speed things up.").split()
+    return " ".join(rng.choice(words) for _ in range(rng.randint(40, 120)))
+
+def _prompt_text(body: Dict[str, Any]) -> str:
+    return " ".join(p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", []))
+
+def _response(text: str, finished: bool = True) -> Dict[str, Any]:
+    candidate: Dict[str, Any] = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+    if finished:
+        candidate["finishReason"] = "STOP"
+    return {"candidates": [candidate]}
+
+def _chunks(text: str, size: int) -> List[str]:
+    words = text.split(" ")
+    return [" ".join(words[i:i + size]) + (" " if i + size < len(words) else "") for i in range(0, len(words), size)]
+
+def create_app(config: FakeConfig) -> FastAPI:
+    app = FastAPI(title="Fake Gemini")
+
+    def _error() -> JSONResponse:
+        config.stats["errors"] += 1
+        status = config.error_status
+        return JSONResponse(status_code=status, content={"error": {
+            "code": status, "message": "Injected failure from fake Gemini", "status": _STATUS_NAMES.get(status, "UNKNOWN")}})
+
+    @app.post("/v1beta/models/{target}")
+    async def model_call(target: str, request: Request):
+        _, _, method = target.partition(":")
+        body = await request.json()
+        prompt = _prompt_text(body)
+        if method == "countTokens":
+            config.stats["count_tokens"] += 1
+            return {"totalTokens": len(prompt.split())}
+        if method not in ("generateContent", "streamGenerateContent"):
+            return JSONResponse(status_code=404, content={"error": {"code": 404, "message": f"Unknown method {method}", "status": "NOT_FOUND"}})
+        if config.rng.random() < config.error_rate:
+            await asyncio.sleep(config.first_token_delay())
+            return _error()
+        text = _reply_for(prompt, config.rng)
+        if method == "generateContent":
+            config.stats["generate"] += 1
+            await asyncio.sleep(config.first_token_delay() + config.token_delay(len(text.split(" "))))
+            return _response(text)
+
+        config.stats["stream"] += 1
+        chunks = _chunks(text, config.chunk_tokens)
+
+        async def stream() -> AsyncIterator[bytes]:
+            await asyncio.sleep(config.first_token_delay())
+            yield b"["
+            for i, chunk in enumerate(chunks):
+                if i:
+                    await asyncio.sleep(config.token_delay(config.chunk_tokens))
+                    yield b",\n"
+                yield json.dumps(_response(chunk, finished=i == len(chunks) - 1)).encode("utf-8")
+            yield b"]"
+
+        return StreamingResponse(stream(), media_type="application/json")
+
+    @app.get("/fake/stats")
+    def stats():
+        return config.stats
+
+    return app
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8090)
+    ap.add_argument("--latency-ms", type=float, default=800.0)
+    ap.add_argument("--jitter", type=float, default=0.5)
+    ap.add_argument("--tokens-per-second", type=float, default=80.0)
+    ap.add_argument("--chunk-tokens", type=int, default=8)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--error-status", type=int, default=503, choices=sorted(_STATUS_NAMES))
+    ap.add_argument("--seed", type=int)
+    args = ap.parse_args()
+    import uvicorn
+    config = FakeConfig(args.latency_ms, args.jitter, args.tokens_per_second, args.chunk_tokens,
+                        args.error_rate, args.error_status, args.seed)
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Replay a weighted mix of /chat, /recommend, /roadmap, /process_resume and /embed traffic against a running
+service and report throughput and p50/p95/p99 latency per endpoint.
+
+Run from ml-service/ (the service on :8000, optionally backed by benchmarks/fake_gemini.py):
+  python -m benchmarks.loadgen --duration 60 --concurrency 32
+  python -m benchmarks.loadgen --rate 50 --mix chat=40,embed=60 --output load.json
+
+--concurrency runs a closed loop (each worker sends its next request when the last one finishes).
+--rate switches to an open loop with Poisson arrivals; latency is then measured from the scheduled
+send time, so a stalled server shows up as queueing delay instead of being hidden.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Tuple
+import httpx
+
+DEFAULT_MIX = "chat=30,recommend=15,roadmap=20,process_resume=10,embed=25"
+
+_CAREERS = ["Data Scientist", "ML Engineer", "Frontend Developer", "Product Manager", "UX Designer",
+            "Cloud Architect", "Security Analyst", "Data Engineer", "DevOps Engineer", "Business Analyst"]
+_INTERESTS = ["AI/ML", "Data Science", "Web Development", "Design", "Security", "Cloud", "Finance"]
+_MESSAGES = ["What career suits me?", "Which skills should I learn next for a data job?",
+             "How do I prepare for a backend interview?", "Can you review my resume strategy?",
+             "How should I negotiate my first salary?", "Is a masters degree worth it for ML?"]
+_RESUME_WORDS = ("python sql docker kubernetes react javascript aws machine learning pandas led team built "
+                 "services improved latency delivered projects mentored engineers analytics dashboards").split()
+
+def _profile(rng: random.Random) -> Dict[str, Any]:
+    return {"name": rng.choice(["Ada", "Lin", "Sam", "Ravi", "Mia"]), "age": rng.randint(18, 45),
+            "degree": rng.choice(["Computer Science", "Statistics", "Design", "Economics"]),
+            "interests": rng.sample(_INTERESTS, 2), "summary": " ".join(rng.sample(_RESUME_WORDS, 8))}
+
+# endpoint -> builder returning (method, path, request kwargs)
+def _chat(rng: random.Random) -> Tuple[str, str, Dict[str, Any]]:
+    return "POST", "/chat", {"json": {"message": rng.choice(_MESSAGES), "user_profile": _profile(rng), "user_id": f"load-{rng.randint(0, 500)}"}}
+
+def _recommend(rng: random.Random) -> Tuple[str, str, Dict[str, Any]]:
+    return "POST", "/recommend", {"json": {"user_profile": _profile(rng), "user_id": f"load-{rng.randint(0, 500)}"}}
+
+def _roadmap(rng: random.Random) -> Tuple[str, str, Dict[str, Any]]:
+    return "POST", "/roadmap", {"json": {"career_name": rng.choice(_CAREERS), "user_id": f"load-{rng.randint(0, 500)}"}}
+
+def _process_resume(rng: random.Random) -> Tuple[str, str, Dict[str, Any]]:
+    text = " ".join(rng.choice(_RESUME_WORDS) for _ in range(rng.randint(150, 900)))
+    return "POST", "/process_resume", {"json": {"resume_text": text, "user_id": f"load-{rng.randint(0, 500)}"}}
+
+def _embed(rng: random.Random) -> Tuple[str, str, Dict[str, Any]]:
+    return "POST", "/embed", {"json": {"text": " ".join(rng.sample(_RESUME_WORDS, 10))}}
+
+BUILDERS: Dict[str, Callable[[random.Random], Tuple[str, str, Dict[str, Any]]]] = {
+    "chat": _chat, "recommend": _recommend, "roadmap": _roadmap, "process_resume": _process_resume, "embed": _embed,
+}
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in BUILDERS:
+            raise SystemExit(f"Unknown endpoint in --mix: {name} (choose from {', '.join(BUILDERS)})")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest rank
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(q / 100.0 * len(sorted_values)) - 1))]
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.recording = False
+
+    def record(self, endpoint: str, seconds: float, status: str) -> None:
+        if self.recording:
+            self.latencies[endpoint].append(seconds)
+            self.statuses[endpoint][status] += 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        out = {}
+        for endpoint in sorted(self.statuses):
+            lat = sorted(self.latencies[endpoint])
+            statuses = dict(self.statuses[endpoint])
+            errors = sum(n for s, n in statuses.items() if not s.startswith("2"))
+            out[endpoint] = {
+                "requests": len(lat), "rps": round(len(lat) / elapsed, 2), "errors": errors, "statuses": statuses,
+                "p50_ms": round(percentile(lat, 50) * 1000, 2), "p95_ms": round(percentile(lat, 95) * 1000, 2),
+                "p99_ms": round(percentile(lat, 99) * 1000, 2), "max_ms": round(lat[-1] * 1000, 2) if lat else 0.0,
+            }
+        return out
+
+async def _send(client: httpx.AsyncClient, endpoint: str, rng: random.Random, recorder: Recorder, started: float) -> None:
+    method, path, kwargs = BUILDERS[endpoint](rng)
+    try:
+        response = await client.request(method, path, **kwargs)
+        status = str(response.status_code)
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    recorder.record(endpoint, time.perf_counter() - started, status)
+
+async def run(url: str, mix: Dict[str, float], duration: float, warmup: float, concurrency: int,
+              rate: float | None, timeout: float, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    recorder = Recorder()
+    # Open loop: no client-side pool cap, or arrivals would queue in httpx instead of at the server
+    limits = httpx.Limits(max_connections=None if rate else concurrency * 2, max_keepalive_connections=concurrency * 2)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        measure_from = start + warmup
+        stop = measure_from + duration
+
+        async def flip_recording():
+            await asyncio.sleep(warmup)
+            recorder.recording = True
+
+        flipper = asyncio.create_task(flip_recording())
+        if rate:
+            pending = set()
+            next_at = start
+            while next_at < stop:
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                task = asyncio.create_task(_send(client, rng.choices(names, weights)[0], rng, recorder, next_at))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                next_at += rng.expovariate(rate)
+            await asyncio.gather(*pending)
+        else:
+            async def worker(wrng: random.Random):
+                while time.perf_counter() < stop:
+                    await _send(client, wrng.choices(names, weights)[0], wrng, recorder, time.perf_counter())
+
+            await asyncio.gather(*(worker(random.Random(rng.random())) for _ in range(concurrency)))
+        flipper.cancel()
+        elapsed = min(time.perf_counter(), stop) - measure_from
+    return {
+        "config": {"url": url, "mix": mix, "duration": duration, "warmup": warmup,
+                   "concurrency": None if rate else concurrency, "rate": rate},
+        "elapsed_s": round(elapsed, 2),
+        "endpoints": recorder.report(max(elapsed, 1e-9)),
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", default="http://127.0.0.1:8000")
+    ap.add_argument("--mix", default=DEFAULT_MIX, help="endpoint=weight,... (default %(default)s)")
+    ap.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    ap.add_argument("--warmup", type=float, default=5.0, help="seconds of traffic before measuring")
+    ap.add_argument("--concurrency", type=int, default=16, help="closed-loop workers")
+    ap.add_argument("--rate", type=float, help="open-loop requests per second (overrides --concurrency)")
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--output", help="write the report as JSON")
+    args = ap.parse_args()
+
+    report = asyncio.run(run(args.url, parse_mix(args.mix), args.duration, args.warmup,
+                             args.concurrency, args.rate, args.timeout, args.seed))
+    total = sum(e["requests"] for e in report["endpoints"].values())
+    print(f"{total} requests in {report['elapsed_s']}s ({total / max(report['elapsed_s'], 1e-9):.1f} req/s)")
+    print(f"{'endpoint':<16} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    for name, e in report["endpoints"].items():
+        print(f"{name:<16} {e['rps']:8.2f} {e['p50_ms']:9.2f} {e['p95_ms']:9.2f} {e['p99_ms']:9.2f} {e['max_ms']:9.2f} {e['errors']:7d}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Offline microbenchmark suite for the embedding, recommender and resume hot paths, compared against a stored baseline.
+
+Run from ml-service/:
+  python -m benchmarks.suite                        # full run, compared with benchmarks/baseline.json
+  python -m benchmarks.suite --quick --output out.json --fail-on-regression
+  python -m benchmarks.suite --save-baseline        # record a new baseline on this machine
+
+Every group runs in a freshly spawned process with its own environment (embedding backend pinned,
+embedding cache off), so module-level state such as the loaded model never leaks between cases.
+HF_HUB_OFFLINE=1 is set unless already defined: the sentence-transformers cases run only when the
+model is in the local cache and are reported as skipped otherwise. Baselines are machine-specific;
+compare runs from the same host.
+"""
+from __future__ import annotations
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+
+RECOMMEND_SIZES = [10, 1_000, 10_000, 100_000]
+RESUME_KB = [1, 16, 256, 1024]
+QUICK_RECOMMEND_SIZES = [10, 1_000]
+QUICK_RESUME_KB = [1, 16]
+EMBED_BATCH = 64
+
+_WORDS = ("data analysis python machine learning cloud infrastructure design product research security "
+          "frontend backend mobile statistics modelling testing automation leadership strategy finance "
+          "marketing operations network database platform pipeline visualization support quality").split()
+
+def measure(fn: Callable[[], Any], budget_s: float, min_iters: int = 5, max_iters: int = 2000) -> Dict[str, Any]:
+    """Time `fn` after one warmup call until `budget_s` is spent (at least `min_iters` runs)."""
+    fn()
+    samples: List[float] = []
+    deadline = time.perf_counter() + budget_s
+    while len(samples) < max_iters and (len(samples) < min_iters or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    samples.sort()
+    return {
+        'median_ms': round(statistics.median(samples), 4),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        'mean_ms': round(statistics.fmean(samples), 4),
+        'iterations': len(samples),
+    }
+
+def _sentences(n: int, seed: int, length: int = 12) -> List[str]:
+    rng = random.Random(seed)
+    return [' '.join(rng.choice(_WORDS) for _ in range(length)) + f' #{i}' for i in range(n)]
+
+def _bench_embed(backend: str, budget_s: float) -> Dict[str, Any]:
+    from app.services import embeddings
+    try:
+        name = embeddings.load_backend()
+    except Exception as e:
+        return {'skipped': f'{backend} backend unavailable: {e}'}
+    texts = _sentences(512, seed=0)
+    cursor = iter(range(10 ** 9))
+    single = measure(lambda: embeddings.embed_text(texts[next(cursor) % len(texts)]), budget_s)
+    batch = measure(lambda: embeddings.embed_texts(texts[:EMBED_BATCH]), budget_s)
+    batch['per_item_ms'] = round(batch['median_ms'] / EMBED_BATCH, 4)
+    return {'model': name, 'results': {f'embed.{backend}.single': single, f'embed.{backend}.batch{EMBED_BATCH}': batch}}
+
+def _synthetic_careers(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [{
+        'title': f"{rng.choice(_WORDS).title()} {rng.choice(_WORDS).title()} Specialist {i}",
+        'description': ' '.join(rng.choice(_WORDS) for _ in range(20)),
+        'skills': rng.sample(_WORDS, 5),
+    } for i in range(n)]
+
+def _bench_recommend(sizes: List[int], budget_s: float) -> Dict[str, Any]:
+    from app.services import embeddings, recommender
+    from app.services.catalog import CatalogManager
+    profiles = [{'summary': s, 'skills': ' '.join(random.Random(i).sample(_WORDS, 4))} for i, s in enumerate(_sentences(64, seed=1))]
+    results, setup = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            path = Path(tmp, f'careers-{n}.json')
+            path.write_text(json.dumps(_synthetic_careers(n)))
+            recommender.catalog = CatalogManager(path)
+            start = time.perf_counter()
+            recommender.catalog.snapshot()
+            setup[f'recommend.n{n}'] = round(time.perf_counter() - start, 3)
+            cursor = iter(range(10 ** 9))
+            results[f'recommend.n{n}'] = measure(lambda: recommender.recommend_careers(profiles[next(cursor) % len(profiles)]), budget_s)
+    return {'model': embeddings.model_name(), 'results': results, 'setup_s': setup}
+
+def _bench_resume(sizes_kb: List[int], budget_s: float) -> Dict[str, Any]:
+    from app.services.skill_extractor import SKILLS_PATH, skill_extractor
+    from benchmarks.bench_skill_extractor import synthetic_resume
+    extractor = skill_extractor()
+    taxonomy = json.loads(Path(SKILLS_PATH).read_text(encoding='utf-8'))
+    results = {}
+    for kb in sizes_kb:
+        resume = synthetic_resume(taxonomy, kb)
+        results[f'resume.skills.{kb}kb'] = measure(lambda: extractor.skills(resume), budget_s)
+    return {'results': results}
+
+_GROUPS = {'embed': _bench_embed, 'recommend': _bench_recommend, 'resume': _bench_resume}
+
+def _run_group(group: str, env: Dict[str, str], *args: Any) -> Dict[str, Any]:
+    # Runs in a spawned child: the environment must be in place before app modules are imported
+    os.environ.update(env)
+    return _GROUPS[group](*args)
+
+def run(quick: bool, budget_s: float, only: List[str] | None = None) -> Dict[str, Any]:
+    base_env = {'EMBED_CACHE_MAX_BYTES': '0', 'EMBED_MICROBATCH': '0', 'HF_HUB_OFFLINE': os.environ.get('HF_HUB_OFFLINE', '1')}
+    plan = [
+        ('embed', {'EMBED_BACKEND': 'hashing'}, ('hashing', budget_s)),
+        ('embed', {'EMBED_BACKEND': 'sentence-transformers'}, ('sentence-transformers', budget_s)),
+        ('recommend', {'EMBED_BACKEND': 'hashing'}, (QUICK_RECOMMEND_SIZES if quick else RECOMMEND_SIZES, budget_s)),
+        ('resume', {}, (QUICK_RESUME_KB if quick else RESUME_KB, budget_s)),
+    ]
+    report: Dict[str, Any] = {'meta': _meta(quick, budget_s), 'results': {}, 'skipped': [], 'setup_s': {}}
+    ctx = multiprocessing.get_context('spawn')
+    for group, env, args in plan:
+        if only and group not in only:
+            continue
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            out = pool.submit(_run_group, group, {**base_env, **env}, *args).result()
+        if 'skipped' in out:
+            report['skipped'].append(out['skipped'])
+            continue
+        report['results'].update(out['results'])
+        report['setup_s'].update(out.get('setup_s', {}))
+        if 'model' in out:
+            report['meta'].setdefault('models', {})[env.get('EMBED_BACKEND', 'auto') + ':' + group] = out['model']
+    return report
+
+def _meta(quick: bool, budget_s: float) -> Dict[str, Any]:
+    import numpy
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'machine': f'{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)',
+        'processor': platform.processor(),
+        'quick': quick,
+        'budget_s': budget_s,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """One row per case present in both runs; a case regresses when its median exceeds baseline * (1 + tolerance)."""
+    rows = []
+    for case, cur in current['results'].items():
+        base = baseline['results'].get(case)
+        if base is None:
+            continue
+        ratio = cur['median_ms'] / base['median_ms'] if base['median_ms'] else float('inf')
+        status = 'REGRESSION' if ratio > 1 + tolerance else 'faster' if ratio < 1 - tolerance else 'ok'
+        rows.append({'case': case, 'baseline_ms': base['median_ms'], 'current_ms': cur['median_ms'], 'ratio': ratio, 'status': status})
+    return rows
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--quick', action='store_true', help='smaller catalogs and resumes')
+    ap.add_argument('--budget', type=float, default=1.0, help='seconds spent timing each case')
+    ap.add_argument('--only', nargs='+', choices=sorted(_GROUPS), help='run only these groups')
+    ap.add_argument('--output', type=Path, help='write results JSON here')
+    ap.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    ap.add_argument('--save-baseline', action='store_true', help='overwrite --baseline with this run')
+    ap.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown before a case counts as a regression')
+    ap.add_argument('--fail-on-regression', action='store_true', help='exit 1 when any case regressed')
+    args = ap.parse_args()
+
+    report = run(args.quick, args.budget, args.only)
+    for case, r in report['results'].items():
+        extra = f"  ({r['per_item_ms']:.4f} ms/item)" if 'per_item_ms' in r else ''
+        print(f"{case:<36} median {r['median_ms']:10.4f} ms  p95 {r['p95_ms']:10.4f} ms  n={r['iterations']}{extra}")
+    for reason in report['skipped']:
+        print(f"skipped: {reason}")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + '\n')
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + '\n')
+        print(f"baseline saved to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline['meta'].get('machine') != report['meta']['machine']:
+        print(f"warning: baseline was recorded on {baseline['meta'].get('machine')}, this is {report['meta']['machine']}")
+    rows = compare(report, baseline, args.tolerance)
+    print(f"\n{'case':<36} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for row in rows:
+        print(f"{row['case']:<36} {row['baseline_ms']:9.4f} ms {row['current_ms']:9.4f} ms {row['ratio']:6.2f}x  {row['status']}")
+    regressions = [r for r in rows if r['status'] == 'REGRESSION']
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+"""Precompute the career embedding matrix so workers mmap it instead of embedding at startup.
+
+Run from ml-service/: python -m scripts.build_career_embeddings
+"""
+from app.services.recommender import build_career_embeddings, EMB_PATH
+
+if __name__ == "__main__":
+    meta = build_career_embeddings()
+    print(f"Wrote {meta['count']}x{meta['dim']} matrix ({meta['model']}) to {EMB_PATH}")
@@ -0,0 +1,39 @@
+"""Report per-module import time for the service entrypoint (wraps `python -X importtime`).
+
+Run from ml-service/: python -m scripts.import_times [--module app.main] [--top 25]
+"""
+from __future__ import annotations
+import argparse
+import subprocess
+import sys
+
+def import_times(module: str) -> list[tuple[str, int, int]]:
+    """Return (module, self_us, cumulative_us) for every module imported by `import <module>`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--module", default="app.main")
+    ap.add_argument("--top", type=int, default=25)
+    args = ap.parse_args()
+    rows = import_times(args.module)
+    total = next((cum for name, _, cum in rows if name == args.module), sum(s for _, s, _ in rows))
+    print(f"import {args.module}: {total / 1e6:.3f}s total, {len(rows)} modules\n")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for name, self_us, cum_us in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{cum_us / 1e3:10.1f}ms {self_us / 1e3:8.1f}ms  {name}")
+
+if __name__ == "__main__":
+    main()
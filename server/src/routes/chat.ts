@@ -12,7 +12,8 @@ router.post('/chat', async (req: Request, res: Response) => {
       message: Joi.string().min(1).required(), 
       lang: Joi.string().default('en'),
       userId: Joi.string().required(),
-      userProfile: Joi.object().optional()
+      userProfile: Joi.object().optional(),
+      sessionId: Joi.string().optional()
     })
     const { error, value } = schema.validate(req.body)
     if (error) return res.status(400).json({ error: error.message })
@@ -31,9 +32,10 @@ router.post('/chat', async (req: Request, res: Response) => {
     // Call ML service for chat response
     const mlResponse = await callMLService('/chat', {
       message: value.message,
-      user_profile: value.userProfile || {},
+      user_profile: value.userProfile,
       lang: value.lang,
-      user_id: value.userId
+      user_id: value.userId,
+      session_id: value.sessionId
     })
     
     // Save assistant response to Firestore
@@ -50,7 +52,8 @@ router.post('/chat', async (req: Request, res: Response) => {
     
     return res.json({
       reply: mlResponse.reply || 'I apologize, but I encountered an error processing your request.',
-      sources: mlResponse.sources || []
+      sources: mlResponse.sources || [],
+      sessionId: mlResponse.session_id
     })
   } catch (error) {
     console.error('Chat error:', error)